@@ -0,0 +1,237 @@
+from __future__ import annotations
+import argparse, csv, json, multiprocessing as mp, os, time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, Set, Tuple
+from tqdm import tqdm
+
+import ranking_recommender as rr
+from catalogue import init_worker, shared_catalogue
+from filter_index import PrefilterIndex
+from poistore import PoiStore
+from service import RESULT_COLS, parse_group
+from taxonomy import load_taxonomy
+from userprof import Profile
+
+# ─────────────────────────────────────────────────────────────
+# Offline batch ranking
+#   Reads traveller groups from JSONL or CSV, runs `runRecommender` for
+#   each on a process pool and appends one JSON line per group to the
+#   output as soon as it finishes.  The shared catalogue is loaded once in
+#   the parent; on fork-capable platforms workers inherit it copy-on-write.
+#   With `--store` (built by poistore.py) workers rank with `rank_store`
+#   on the memory-mapped arrays instead: no frame per process, the OS
+#   page cache holds the catalogue once for all of them.
+#   Re-running with the same output skips groups already ranked, so a
+#   crashed run resumes where it stopped.  Failed groups are skipped too
+#   unless `--retry-failed` (the last line per id wins).
+#
+#   JSONL: {"id": "g1", "profiles": [{Profile fields}, …],
+#           "weights": [7 floats]?, "mode": "union"?}           (id optional)
+#   CSV:   one row per traveller – group_id, Profile fields, lat/lon for
+#          the location, `avoid` separated by ";"
+#
+#   python src/batch.py groups.jsonl results.jsonl --workers 8
+#   python src/batch.py groups.jsonl results.jsonl --store data/poi_store
+# ─────────────────────────────────────────────────────────────
+WORKERS   = os.cpu_count() or 2
+IN_FLIGHT = 4                # submitted groups per worker
+
+Group = Tuple[str, Dict[int, Profile], Tuple[float, ...] | None, str]
+
+
+# ── input ────────────────────────────────────────────────────
+def _group(gid: str, req: Dict[str, Any]) -> Group:
+    """Validated like an API request (`k` does not apply here)."""
+    profiles, weights, _, mode = parse_group(req)
+    return gid, profiles, weights, mode
+
+
+def read_jsonl(path: str) -> Iterator[Group | Tuple[str, Exception]]:
+    with open(path) as fh:
+        for n, line in enumerate(fh, 1):
+            if not line.strip():
+                continue
+            gid = str(n)
+            try:
+                obj = json.loads(line)
+                gid = str(obj.get("id", n))
+                yield _group(gid, obj)
+            except (ValueError, TypeError, AttributeError) as e:
+                yield gid, e
+
+
+def _csv_profile(row: Dict[str, str]) -> Dict[str, Any]:
+    p: Dict[str, Any] = {}
+    for k, v in row.items():
+        if k in ("group_id", "lat", "lon") or v in (None, ""):
+            continue
+        if k == "avoid":
+            p[k] = [a.strip() for a in v.split(";") if a.strip()]
+        elif k == "mobility_constr":
+            p[k] = v.strip().lower() in ("1", "true", "yes")
+        elif k == "name":
+            p[k] = v
+        else:
+            p[k] = float(v)
+    if row.get("lat") and row.get("lon"):
+        p["location"] = [float(row["lat"]), float(row["lon"])]
+    return p
+
+
+def read_csv(path: str) -> Iterator[Group | Tuple[str, Exception]]:
+    """Rows of one group need not be adjacent; the file is read whole."""
+    groups: Dict[str, list] = {}
+    with open(path, newline="") as fh:
+        reader = csv.DictReader(fh)
+        if "group_id" not in (reader.fieldnames or ()):
+            raise ValueError(f"{path}: no group_id column in the header")
+        for row in reader:
+            groups.setdefault(row["group_id"], []).append(row)
+    for gid, rows in groups.items():
+        try:
+            yield _group(gid, {"profiles": [_csv_profile(r) for r in rows]})
+        except (ValueError, TypeError) as e:
+            yield gid, e
+
+
+def read_groups(path: str):
+    return read_csv(path) if path.endswith(".csv") else read_jsonl(path)
+
+
+# ── output / resume ──────────────────────────────────────────
+def done_ids(out_path: str, retry_failed: bool = False) -> Set[str]:
+    """Ids to skip: every id in the output, or only those whose last line
+    is ok with `retry_failed`.  A torn last line (crash) is cut off."""
+    if not os.path.exists(out_path):
+        return set()
+    status: Dict[str, str] = {}
+    good = 0
+    with open(out_path, "rb") as fh:
+        for line in fh:
+            try:
+                rec = json.loads(line)
+                status[str(rec["id"])] = rec["status"]
+            except (ValueError, KeyError, TypeError):
+                break
+            good += len(line)
+    if good < os.path.getsize(out_path):
+        with open(out_path, "r+b") as fh:
+            fh.truncate(good)
+    return {gid for gid, s in status.items()
+            if s == "ok" or not retry_failed}
+
+
+# ── workers ──────────────────────────────────────────────────
+_store: Tuple[PoiStore, PrefilterIndex] | None = None
+
+
+def init_store_worker(store_path: str, data_dir: str = "data") -> None:
+    """Pool initializer for `--store`: map the store, index it once."""
+    global _store
+    store = PoiStore.open(store_path)
+    load_taxonomy(data_dir)
+    _store = store, PrefilterIndex.from_store(store)
+
+
+def rank_group(gid: str, profiles: Dict[int, Profile],
+               weights: Tuple[float, ...] | None, mode: str,
+               data_dir: str = "data") -> Dict[str, Any]:
+    cfg = rr.DEFAULT_CONFIG if weights is None else \
+        rr.DEFAULT_CONFIG.with_weights(weights)
+    t0 = time.perf_counter()
+    if _store is not None:
+        store, index = _store
+        kernel = rr.rank_store(store, profiles, index, mode, cfg,
+                               taxonomy=load_taxonomy(data_dir))["Group"]
+    else:
+        cat = shared_catalogue()
+        kernel = rr.runRecommender(cat.data, profiles, cat.filter_index,
+                                   mode, cfg)["Group"]
+    cols = [c for c in RESULT_COLS if c in kernel]
+    return {"id": gid, "status": "ok",
+            "elapsed_ms": (time.perf_counter() - t0) * 1e3,
+            "results": json.loads(kernel[cols].to_json(orient="records",
+                                                       double_precision=6))}
+
+
+def run(in_path: str, out_path: str, data_dir: str = "data",
+        workers: int = WORKERS, resume: bool = True,
+        store: str | None = None,
+        retry_failed: bool = False) -> Dict[str, Any]:
+    if not resume and os.path.exists(out_path):
+        os.remove(out_path)
+    done = done_ids(out_path, retry_failed)
+    if store is None:
+        shared_catalogue(data_dir)                   # inherited on fork
+        init, initargs = init_worker, (data_dir,)
+    else:
+        init, initargs = init_store_worker, (store, data_dir)
+    ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods()
+                         else None)
+
+    stats = dict(ok=0, failed=0, skipped=0)
+    t0 = time.perf_counter()
+    with open(out_path, "a") as out, \
+            ProcessPoolExecutor(workers, mp_context=ctx,
+                                initializer=init,
+                                initargs=initargs) as pool, \
+            tqdm(desc="groups", unit="grp") as bar:
+
+        def write(rec: Dict[str, Any]) -> None:
+            out.write(json.dumps(rec) + "\n")
+            out.flush()
+            stats["ok" if rec["status"] == "ok" else "failed"] += 1
+            bar.update()
+
+        def drain() -> None:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for f in finished:
+                gid = pending.pop(f)
+                try:
+                    write(f.result())
+                except Exception as e:
+                    write({"id": gid, "status": "error", "error": repr(e)})
+
+        pending: Dict[Any, str] = {}
+        for item in read_groups(in_path):
+            gid = item[0]
+            if gid in done:
+                stats["skipped"] += 1
+                continue
+            done.add(gid)                           # duplicate ids: first wins
+            if isinstance(item[1], Exception):
+                write({"id": gid, "status": "error", "error": str(item[1])})
+                continue
+            pending[pool.submit(rank_group, *item, data_dir)] = gid
+            while len(pending) >= workers * IN_FLIGHT:
+                drain()
+        while pending:
+            drain()
+
+    wall = time.perf_counter() - t0
+    ran = stats["ok"] + stats["failed"]
+    return dict(stats, wall_s=wall, groups_per_s=ran / wall if wall else 0.0)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(
+        description="Rank many traveller groups from a JSONL/CSV file")
+    ap.add_argument("input", help="groups (.jsonl or .csv)")
+    ap.add_argument("output", help="results, one JSON line per group")
+    ap.add_argument("--data", default="data")
+    ap.add_argument("--store", help="rank on a POI store (poistore.py) "
+                                    "instead of loading the CSVs per run")
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--no-resume", action="store_true",
+                    help="overwrite the output instead of resuming")
+    ap.add_argument("--retry-failed", action="store_true",
+                    help="when resuming, rank failed groups again")
+    a = ap.parse_args()
+    try:
+        rep = run(a.input, a.output, a.data, a.workers, not a.no_resume,
+                  a.store, a.retry_failed)
+    except ValueError as e:
+        ap.error(str(e))
+    print(f"{rep['ok']} ranked, {rep['failed']} failed, {rep['skipped']} "
+          f"already done – {rep['groups_per_s']:.1f} groups/s "
+          f"({rep['wall_s']:.1f} s)")
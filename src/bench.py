@@ -0,0 +1,190 @@
+from __future__ import annotations
+import argparse, json, os, platform, statistics, tempfile, time
+import numpy as np, pandas as pd
+from typing import Any, Callable, Dict, List
+
+from dataloader import readTourismData
+from filter_index import PrefilterIndex
+from spatial import PoiSpatialIndex
+from userprof import Profile
+import ranking_recommender as rr
+
+# ─────────────────────────────────────────────────────────────
+# Pipeline benchmark on synthetic catalogues
+#   Catalogues are bootstrapped from data/poi_*: real rows resampled
+#   (keeps the category mix and how z1…z6 go with each category), z
+#   jittered and re-rounded, scattered over synthetic towns of ~30 POIs
+#   across Catalonia.  Every stage of `runRecommender` is timed per
+#   (catalogue size × group size) and written as JSON.
+#
+#   python src/bench.py --sizes 100 1000 10000 --groups 1 5 50 --out bench.json
+# ─────────────────────────────────────────────────────────────
+SIZES        = [100, 1_000, 10_000, 100_000]
+GROUPS       = [1, 5, 50]
+REPEAT       = 3
+ELECTRE_MAX  = 4_000         # larger candidate sets: ELECTRE stages skipped
+Z_JITTER     = 0.05
+TOWN_SIZE    = 30
+LAT_RANGE    = (40.6, 42.8)  # Catalonia, roughly
+LON_RANGE    = (0.3, 3.3)
+Z_COLS       = [f"z{i}" for i in range(1, 7)]
+
+
+# ── synthetic data ────────────────────────────────────────────
+def synth_catalogue(n: int, seed: int = 0, data_dir: str = "data") -> pd.DataFrame:
+    """n POIs resampled from the real catalogue onto synthetic towns."""
+    rng = np.random.default_rng(seed)
+    real = readTourismData(data_dir, place_meta=False)
+    rows = real.iloc[rng.integers(0, len(real), n)].reset_index(drop=True)
+    for c in Z_COLS + ["sustainability", "popularity"]:
+        v = rows[c].to_numpy(float) + rng.normal(0, Z_JITTER, n)
+        rows[c] = np.clip(v, 0, 1).round(2).astype(np.float32)
+
+    n_towns = max(1, n // TOWN_SIZE)
+    town = rng.integers(0, n_towns, n)
+    c_lat = rng.uniform(*LAT_RANGE, n_towns)
+    c_lon = rng.uniform(*LON_RANGE, n_towns)
+    rows["municipality"] = pd.Categorical([f"town{t}" for t in town])
+    rows["lat"] = c_lat[town] + rng.normal(0, 0.01, n)
+    rows["lon"] = c_lon[town] + rng.normal(0, 0.012, n)
+    rows["name"] = [f"{c} {i}" for i, c in enumerate(rows["category"].astype(str))]
+    return rows
+
+
+def synth_group(size: int, cats: List[str], seed: int = 0) -> Dict[int, Profile]:
+    rng = np.random.default_rng(seed)
+    lat0, lon0 = rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)
+    group = {}
+    for i in range(1, size + 1):
+        n_avoid = rng.integers(0, 3)
+        group[i] = Profile(
+            name=f"p{i}",
+            mobility_constr=bool(rng.random() < .2),
+            location=(float(lat0 + rng.normal(0, .05)),
+                      float(lon0 + rng.normal(0, .05))),
+            max_disp=float(rng.uniform(60, 200)),
+            avoid=[str(c) for c in rng.choice(cats, n_avoid, replace=False)],
+            culture=float(rng.random()), nature=float(rng.random()),
+            nlife=float(rng.random()), local_imp=float(rng.random()),
+            co2=float(rng.random()))
+    return group
+
+
+def write_catalogue(df: pd.DataFrame, folder: str) -> None:
+    """Lay the catalogue out like data/: one enriched CSV per town."""
+    for muni, sub in df.groupby("municipality", observed=True):
+        sub.to_csv(os.path.join(folder, f"poi_{muni}_30_enriched.csv"),
+                   index=False)
+
+
+# ── timing ────────────────────────────────────────────────────
+def _time(fn: Callable[[], Any], repeat: int):
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return out, {"min_s": min(times), "median_s": statistics.median(times)}
+
+
+def bench_case(df: pd.DataFrame, group: Dict[int, Profile],
+               repeat: int = REPEAT) -> Dict[str, Any]:
+    """Time every pipeline stage for one catalogue × group."""
+    st: Dict[str, Any] = {}                     # stage → timings
+    members = list(group.values())
+    index, st["index"] = _time(lambda: PrefilterIndex(
+        df, PoiSpatialIndex.from_frame(df)), repeat)
+    base, st["prefilter"] = _time(
+        lambda: rr.group_prefilter(df, members, index), repeat)
+    _, st["prefilter_per_member"] = _time(
+        lambda: [rr._prefilter(df, p, index) for p in members], repeat)
+    Z, st["z7_individual"] = _time(lambda: rr.z7_batch(base, members), repeat)
+    _, st["z7_group"] = _time(lambda: rr.z7_group(Z, index=base.index), repeat)
+    case = {"n_candidates": len(base), "stages": st, "skipped": []}
+
+    if len(base) > ELECTRE_MAX:
+        case["skipped"].append(f"ELECTRE on {len(base)} > {ELECTRE_MAX} candidates")
+        return case
+    base = base.assign(z7=Z[0] if len(members) == 1
+                       else rr.z7_group(Z, index=base.index))
+    for z in rr.CRITERIA:
+        base[z] = base[z].fillna(.5)
+
+    # every stage but the last runs without the opt-in ELECTRE tensor
+    # cache, so each repeat is cold; "slider_rerank" is the weight-slider
+    # path with the tensors already cached for these candidates
+    _, st["electre"] = _time(lambda: rr._electre_rank(base), repeat)
+    _, st["rank_top_k"] = _time(
+        lambda: rr.rank_top_k(df, group, index=index), repeat)
+    ranked, st["compute_ranking"] = _time(
+        lambda: rr.compute_ranking(base), repeat)
+    rr.compute_ranking(base, reuse_partials=True)
+    slider = rr.DEFAULT_CONFIG.with_weights(rr.DEFAULT_CONFIG.W[::-1])
+    _, st["slider_rerank"] = _time(
+        lambda: rr.compute_ranking(base, cfg=slider, reuse_partials=True),
+        repeat)
+    rr._partials.clear()
+    kernel = rr._kernel_rows(ranked)
+    X = kernel[rr.CRITERIA].to_numpy(float)
+    _, st["lsp"] = _time(lambda: rr._lsp_utility(X, rr.DEFAULT_CONFIG), repeat)
+
+    def explain():
+        bd = rr.lsp_breakdown(kernel)
+        rows = [rr.explain_row(r, bd=bd) for _, r in kernel.iterrows()]
+        return rows, rr.global_summary(kernel), bd.pair_texts()
+    _, st["explain"] = _time(explain, repeat)
+    _, st["run_recommender"] = _time(
+        lambda: rr.runRecommender(df, group, index), repeat)
+    return case
+
+
+def bench_load(df: pd.DataFrame, repeat: int = REPEAT) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as folder:
+        write_catalogue(df, folder)
+        _, cold = _time(lambda: readTourismData(folder, cache=False), repeat)
+        readTourismData(folder)                 # build the NPZ cache
+        _, warm = _time(lambda: readTourismData(folder), repeat)
+    return {"load_csv": cold, "load_cached": warm}
+
+
+def run(sizes=SIZES, groups=GROUPS, repeat: int = REPEAT, seed: int = 0,
+        data_dir: str = "data") -> Dict[str, Any]:
+    results = []
+    for n in sizes:
+        df = synth_catalogue(n, seed, data_dir)
+        load = bench_load(df, repeat)
+        cats = sorted(df["category"].astype(str).unique())
+        for g in groups:
+            t0 = time.perf_counter()
+            case = bench_case(df, synth_group(g, cats, seed + g), repeat)
+            case["stages"].update(load)
+            results.append({"n_pois": n, "group_size": g, **case,
+                            "wall_s": time.perf_counter() - t0})
+            print(f"n={n:>6} group={g:>2} candidates={case['n_candidates']:>6} "
+                  + " ".join(f"{k}={v['median_s']:.4f}"
+                             for k, v in case["stages"].items())
+                  + ("  [" + "; ".join(case["skipped"]) + "]"
+                     if case["skipped"] else ""))
+    return {
+        "meta": {"time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "python": platform.python_version(),
+                 "numpy": np.__version__, "pandas": pd.__version__,
+                 "machine": platform.machine(), "repeat": repeat,
+                 "seed": seed, "electre_max": ELECTRE_MAX},
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark the recommender pipeline")
+    ap.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    ap.add_argument("--groups", type=int, nargs="+", default=GROUPS)
+    ap.add_argument("--repeat", type=int, default=REPEAT)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--data", default="data")
+    ap.add_argument("--out", default="bench_results.json")
+    a = ap.parse_args()
+    report = run(a.sizes, a.groups, a.repeat, a.seed, a.data)
+    with open(a.out, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"→ {a.out}")
@@ -0,0 +1,89 @@
+from __future__ import annotations
+import threading
+import pandas as pd
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from dataloader import data_signature, readTourismData
+from filter_index import PrefilterIndex
+from reccache import dataset_fingerprint
+from spatial import PoiSpatialIndex
+from taxonomy import TAXONOMY_FILE, CategoryTaxonomy, load_taxonomy
+
+# ─────────────────────────────────────────────────────────────
+# Process-wide, read-only POI catalogue
+#   One instance per (process, data dir) holds the annotated frame and
+#   everything derived from it – fingerprint, spatial and category
+#   indexes, city centroids, category list.  Streamlit sessions, API
+#   requests and batch workers all share it; nobody mutates `data` –
+#   callers that need to edit take `frame()`, a copy-on-write view.
+#   Forked workers inherit it without copying.  `stale()` tells when the
+#   files it was read from have changed since.
+# ─────────────────────────────────────────────────────────────
+DATA_DIR = "data"
+
+
+@dataclass(frozen=True, eq=False)
+class Catalogue:
+    data_dir: str
+    data: pd.DataFrame
+    fingerprint: str
+    signature: str                             # source files at load time
+    taxonomy: CategoryTaxonomy
+    poi_index: PoiSpatialIndex
+    filter_index: PrefilterIndex
+    city_locs: Dict[str, Dict[str, float]]     # municipality → POI centroid
+    categories: Tuple[str, ...]
+
+    @classmethod
+    def load(cls, data_dir: str = DATA_DIR) -> "Catalogue":
+        signature = data_signature(data_dir, [TAXONOMY_FILE])
+        taxonomy = load_taxonomy(data_dir, reload=True)
+        data = taxonomy.annotate(readTourismData(data_dir))
+        poi_index = PoiSpatialIndex.from_frame(data)
+        centroids = (data.groupby("municipality", observed=True)[["lat", "lon"]]
+                         .mean())
+        return cls(
+            data_dir=data_dir, data=data,
+            fingerprint=dataset_fingerprint(data), signature=signature,
+            taxonomy=taxonomy,
+            poi_index=poi_index, filter_index=PrefilterIndex(data, poi_index),
+            city_locs=centroids.to_dict("index"),
+            categories=tuple(str(c) for c in data["category"].cat.categories))
+
+    def stale(self) -> bool:
+        """Have the CSVs, place metadata or taxonomy changed on disk?"""
+        return data_signature(self.data_dir, [TAXONOMY_FILE]) != self.signature
+
+    def frame(self) -> pd.DataFrame:
+        """A private, copy-on-write view of `data` for callers that edit:
+        nothing is copied until they write, and writes never reach the
+        shared frame."""
+        return self.data.copy(deep=False)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+_shared: Dict[str, Catalogue] = {}
+_shared_lock = threading.Lock()
+_default_dir = DATA_DIR
+
+
+def shared_catalogue(data_dir: str | None = None,
+                     reload: bool = False) -> Catalogue:
+    """The process's catalogue for `data_dir` (default: the directory set by
+    `init_worker`, else "data"), loaded on first use or with `reload`."""
+    data_dir = data_dir or _default_dir
+    with _shared_lock:
+        if reload or data_dir not in _shared:
+            _shared[data_dir] = Catalogue.load(data_dir)
+        return _shared[data_dir]
+
+
+def init_worker(data_dir: str = DATA_DIR) -> None:
+    """Pool initializer: make `data_dir` the default and have it loaded –
+    a no-op beyond that when the catalogue came with the fork."""
+    global _default_dir
+    _default_dir = data_dir
+    shared_catalogue(data_dir)
@@ -1,13 +1,201 @@
-import pandas as pd
+from __future__ import annotations
+import json
 import os
+import re
+import numpy as np
+import pandas as pd
+from typing import Iterable, List, NamedTuple
+
+# ─────────────────────────────────────────────────────────────
+# POI loader
+#   data/ holds the raw `poi_<muni>_30.csv`, their enriched twins and
+#   the merged `poi_all_enriched.csv`, so the same POI shows up to three
+#   times.  We read every file once, keep the most-enriched row per
+#   (municipality, name) and cache the result next to the sources.
+# ─────────────────────────────────────────────────────────────
+CACHE_FILE = ".poi_cache.npz"
+CACHE_VERSION = 2
+
+Z_COLS = ["z1", "z2", "z3", "z4", "z5", "z6"]
+FLOAT_COLS = ["lat", "lon"]                          # keep full precision
+CRIT_COLS = ["sustainability", "popularity"] + Z_COLS
+CAT_COLS = ["category", "municipality"]
+
+# offline Google Places metadata (see place_meta.py), joined on load
+PLACE_META_FILE = "place_meta.csv"
+PLACE_COLS = ["place_id", "place_address", "place_rating", "place_reviews",
+              "place_maps_uri", "place_photo", "place_fetched"]
+
+_FILE_RX = re.compile(r"^poi_(?P<muni>[^_]+)(?:_\d+)?(?P<enr>_enriched)?\.csv$")
+
+
+class Source(NamedTuple):
+    path: str
+    municipality: str
+    enriched: bool
+    mtime_ns: int
+    size: int
+
+
+def source_manifest(folder_path: str = "data") -> List[Source]:
+    """Every `poi_*.csv` in `folder_path`, sorted by file name."""
+    out = []
+    for filename in sorted(os.listdir(folder_path)):
+        m = _FILE_RX.match(filename)
+        if not m:
+            continue
+        path = os.path.join(folder_path, filename)
+        st = os.stat(path)
+        out.append(Source(path, m["muni"], bool(m["enr"]),
+                          st.st_mtime_ns, st.st_size))
+    return out
+
+
+def _signature(manifest: List[Source]) -> str:
+    return json.dumps([CACHE_VERSION] + [
+        [os.path.basename(s.path), s.mtime_ns, s.size] for s in manifest
+    ])
+
+
+def data_signature(folder_path: str = "data",
+                   extra: Iterable[str] = ()) -> str:
+    """Changes whenever a source CSV, the place-metadata file or one of the
+    `extra` file names in `folder_path` is added, removed or rewritten."""
+    files = [PLACE_META_FILE, *extra]
+    stats = []
+    for name in files:
+        try:
+            st = os.stat(os.path.join(folder_path, name))
+            stats.append([name, st.st_mtime_ns, st.st_size])
+        except FileNotFoundError:
+            stats.append([name, None])
+    return _signature(source_manifest(folder_path)) + json.dumps(stats)
+
+
+def _read_source(src: Source, order: int) -> pd.DataFrame:
+    df = pd.read_csv(src.path)
+    # the merged file carries its own municipality column; per-city files
+    # (and blank cells) get theirs from the file name
+    if "municipality" not in df:
+        df["municipality"] = src.municipality
+    else:
+        df["municipality"] = df["municipality"].fillna(src.municipality)
+    df["_enriched"] = src.enriched
+    df["_order"] = order
+    return df
+
+
+def _merge(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    df = pd.concat(frames, ignore_index=True)
+    df = df.reindex(columns=list(dict.fromkeys(
+        ["name"] + CAT_COLS + FLOAT_COLS + CRIT_COLS + list(df.columns))))
+    df["_filled"] = df[Z_COLS].notna().sum(axis=1)
+    df["_row"] = np.arange(len(df))
+    # most z columns first, then enriched files, then first seen
+    best = (df.sort_values(["_filled", "_enriched", "_order", "_row"],
+                           ascending=[False, False, True, True], kind="stable")
+              .drop_duplicates(["municipality", "name"], keep="first")
+              .sort_values("_row"))
+    best = best.drop(columns=["_filled", "_enriched", "_order", "_row"])
+    return _with_dtypes(best.reset_index(drop=True))
+
+
+def _with_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    for c in CAT_COLS:
+        df[c] = df[c].astype("category")
+    for c in CRIT_COLS:
+        df[c] = df[c].astype(np.float32)
+    for c in FLOAT_COLS:
+        df[c] = df[c].astype(np.float64)
+    return df
+
+
+# ── NPZ cache (no pickle: strings are stored as unicode arrays) ─
+def _save_cache(df: pd.DataFrame, path: str, signature: str):
+    arrays = {"__signature": np.array(signature),
+              "__columns": np.array(list(df.columns), dtype=str)}
+    for i, c in enumerate(df.columns):
+        s = df[c]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            arrays[f"{i}.codes"] = s.cat.codes.to_numpy()
+            arrays[f"{i}.cats"] = np.array(s.cat.categories, dtype=str)
+        elif pd.api.types.is_numeric_dtype(s.dtype):
+            arrays[f"{i}.num"] = s.to_numpy()
+        else:
+            arrays[f"{i}.na"] = s.isna().to_numpy()
+            arrays[f"{i}.str"] = np.array(s.fillna("").astype(str), dtype=str)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        np.savez(fh, **arrays)
+    os.replace(tmp, path)
+
+
+def _load_cache(path: str, signature: str) -> pd.DataFrame | None:
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            if str(z["__signature"]) != signature:
+                return None
+            cols = {}
+            for i, c in enumerate(z["__columns"]):
+                if f"{i}.codes" in z:
+                    cols[c] = pd.Categorical.from_codes(z[f"{i}.codes"],
+                                                        z[f"{i}.cats"])
+                elif f"{i}.num" in z:
+                    cols[c] = z[f"{i}.num"]
+                else:
+                    s = pd.Series(z[f"{i}.str"])
+                    cols[c] = s.mask(z[f"{i}.na"])
+            return pd.DataFrame(cols)
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def join_place_meta(df: pd.DataFrame, folder_path: str = "data") -> pd.DataFrame:
+    """Attach the `place_*` columns of `<folder>/place_meta.csv` (if any)
+    by (municipality, name); POIs never resolved get NaN."""
+    path = os.path.join(folder_path, PLACE_META_FILE)
+    if not os.path.exists(path) or df.empty:
+        return df
+    side = (pd.read_csv(path)
+              .drop_duplicates(["municipality", "name"], keep="last")
+              .set_index(["municipality", "name"]))
+    key = pd.MultiIndex.from_arrays([df["municipality"].astype(str),
+                                     df["name"].astype(str)])
+    df = df.drop(columns=[c for c in PLACE_COLS if c in df])
+    for c in PLACE_COLS:
+        df[c] = side[c].reindex(key).to_numpy() if c in side else np.nan
+    return df
+
+
+def _read_merged(folder_path: str, cache: bool) -> pd.DataFrame:
+    manifest = source_manifest(folder_path)
+    signature = _signature(manifest)
+    path = os.path.join(folder_path, CACHE_FILE)
+    if cache:
+        df = _load_cache(path, signature)
+        if df is not None:
+            return df
+    if not manifest:
+        return _with_dtypes(pd.DataFrame(
+            columns=["name"] + CAT_COLS + FLOAT_COLS + CRIT_COLS))
+    df = _merge([_read_source(s, i) for i, s in enumerate(manifest)])
+    if cache:
+        try:
+            _save_cache(df, path, signature)
+        except OSError:
+            pass                            # read-only data dir: just skip
+    return df
+
+
+def readTourismData(folder_path: str = "data", cache: bool = True,
+                    place_meta: bool = True) -> pd.DataFrame:
+    """
+    One row per POI across every CSV in `folder_path`.
 
-def readTourismData(folder_path: str = "data") -> pd.DataFrame:
-    merged_df = pd.DataFrame()
-    for filename in os.listdir(folder_path):
-        if filename.endswith(".csv"):
-            municipality = filename.split("_")[1]
-            file_path = os.path.join(folder_path, filename)
-            temp_df = pd.read_csv(file_path)
-            temp_df['municipality'] = municipality
-            merged_df = pd.concat([merged_df, temp_df], ignore_index=True)
-    return merged_df
\ No newline at end of file
+    `category` / `municipality` are categorical, the criteria float32.
+    With `cache`, the merged frame is kept in `<folder>/.poi_cache.npz`
+    and reused while no source file changed (name, mtime or size).
+    With `place_meta`, the offline Google Places columns are joined in.
+    """
+    df = _read_merged(folder_path, cache)
+    return join_place_meta(df, folder_path) if place_meta else df
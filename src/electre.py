@@ -0,0 +1,266 @@
+from __future__ import annotations
+import numpy as np
+from typing import Iterator, List
+
+# ─────────────────────────────────────────────────────────────
+# NumPy ELECTRE III
+#   Same arithmetic (and tie-breaking) as pyDecision's `electre_iii`,
+#   but vectorised and returning integer ranks instead of "a12; a7"
+#   strings.  Pairwise work is done in row blocks of `chunk` rows so
+#   the temporaries stay O(chunk × n) – only the n × n credibility
+#   matrix itself is ever held in full.
+# ─────────────────────────────────────────────────────────────
+CHUNK = 512
+
+
+def _blocks(n: int, chunk: int) -> Iterator[slice]:
+    for r0 in range(0, n, max(1, chunk)):
+        yield slice(r0, min(r0 + chunk, n))
+
+
+# ─────────────────────────────────────────────────────────────
+# 1 ▸ Concordance / discordance / credibility
+# ─────────────────────────────────────────────────────────────
+def _c_k(xi: np.ndarray, xj: np.ndarray, q: float, p: float) -> np.ndarray:
+    """Partial concordance of one criterion (W-independent)."""
+    diff = xj - xi
+    part = (p - xj + xi) / (p - q)
+    return np.where(diff < q, 1.0,
+                    np.where((diff >= q) & (diff < p), part, 0.0))
+
+
+def _d_k(xi: np.ndarray, xj: np.ndarray, p: float, v: float) -> np.ndarray:
+    """Partial discordance of one criterion (W-independent)."""
+    diff = xj - xi
+    return np.where(diff >= v, 1.0,
+                    np.where((diff >= p) & (diff < v),
+                             (-p - xi + xj) / (v - p), 0.0))
+
+
+def _aggregate(c_parts, d_parts, W: np.ndarray, diag: slice) -> np.ndarray:
+    """Weighted concordance → credibility for one row block."""
+    C = np.zeros_like(c_parts[0])
+    for k, c_k in enumerate(c_parts):
+        C += W[k] * c_k
+    if np.sum(W) != 0:
+        C /= np.sum(W)
+    S = C.copy()
+    for d_k in d_parts:
+        hit = d_k > C
+        S[hit] *= (1 - d_k[hit]) / (1 - C[hit])
+    S[np.arange(S.shape[0]), np.arange(diag.start, diag.stop)] = 0
+    return S
+
+
+def _columns(M: np.ndarray, rows: slice):
+    for k in range(M.shape[1]):
+        yield k, M[rows, k][:, None], M[None, :, k]
+
+
+def _concordance_block(M: np.ndarray, rows: slice,
+                       Q: np.ndarray, P: np.ndarray,
+                       W: np.ndarray) -> np.ndarray:
+    C = np.zeros((rows.stop - rows.start, M.shape[0]))
+    for k, xi, xj in _columns(M, rows):
+        C += W[k] * _c_k(xi, xj, Q[k], P[k])
+    if np.sum(W) != 0:
+        C /= np.sum(W)
+    return C
+
+
+def concordance_matrix(M, Q, P, W, chunk: int = CHUNK) -> np.ndarray:
+    """Global concordance C[i, j] = "i is at least as good as j"."""
+    M = np.asarray(M, dtype=float)
+    Q, P, W = (np.asarray(a, dtype=float) for a in (Q, P, W))
+    out = np.empty((M.shape[0], M.shape[0]))
+    for rows in _blocks(M.shape[0], chunk):
+        out[rows] = _concordance_block(M, rows, Q, P, W)
+    return out
+
+
+def credibility_matrix(M, Q, P, V, W, chunk: int = CHUNK) -> np.ndarray:
+    """Credibility S = C discounted by every discordant criterion (diag = 0)."""
+    M = np.asarray(M, dtype=float)
+    Q, P, V, W = (np.asarray(a, dtype=float) for a in (Q, P, V, W))
+    out = np.empty((M.shape[0], M.shape[0]))
+    for rows in _blocks(M.shape[0], chunk):
+        c = [_c_k(xi, xj, Q[k], P[k]) for k, xi, xj in _columns(M, rows)]
+        d = [_d_k(xi, xj, P[k], V[k]) for k, xi, xj in _columns(M, rows)]
+        out[rows] = _aggregate(c, d, W, rows)
+    return out
+
+
+class ElectrePartials:
+    """
+    Per-criterion concordance / discordance tensors (m × n × n) of one
+    candidate set.  They only depend on M and the Q/P/V thresholds, so a
+    weight change re-runs just the weighted aggregation + distillation.
+    """
+
+    def __init__(self, M, Q, P, V, chunk: int = CHUNK):
+        M = np.asarray(M, dtype=float)
+        Q, P, V = (np.asarray(a, dtype=float) for a in (Q, P, V))
+        n, m = M.shape
+        self.chunk = chunk
+        self.c = np.empty((m, n, n))
+        self.d = np.empty((m, n, n))
+        for rows in _blocks(n, chunk):
+            for k, xi, xj in _columns(M, rows):
+                self.c[k, rows] = _c_k(xi, xj, Q[k], P[k])
+                self.d[k, rows] = _d_k(xi, xj, P[k], V[k])
+
+    @property
+    def nbytes(self) -> int:
+        return self.c.nbytes + self.d.nbytes
+
+    def credibility(self, W) -> np.ndarray:
+        W = np.asarray(W, dtype=float)
+        n = self.c.shape[1]
+        out = np.empty((n, n))
+        for rows in _blocks(n, self.chunk):
+            out[rows] = _aggregate(self.c[:, rows], self.d[:, rows], W, rows)
+        return out
+
+    def ranks(self, W, descending: bool = True, k: int | None = None,
+              groups=None) -> np.ndarray:
+        S = self.credibility(W)
+        return _to_ranks(distillation(S, descending, self.chunk, k, groups),
+                         S.shape[0])
+
+
+# ─────────────────────────────────────────────────────────────
+# 2 ▸ Distillation
+# ─────────────────────────────────────────────────────────────
+def _lambdas(S: np.ndarray):
+    lam_max = S.max()
+    lam_s = 0.30 - 0.15 * lam_max
+    below = S[S < (lam_max - lam_s)]
+    lam_L = below.max() if below.size else 0
+    return lam_max, lam_s, lam_L
+
+
+def qualification(S: np.ndarray, chunk: int = CHUNK) -> np.ndarray:
+    """Strength − weakness of every alternative at the current λ-cut."""
+    n = S.shape[0]
+    _, lam_s, lam_L = _lambdas(S)
+    strength = np.zeros(n)
+    weakness = np.zeros(n)
+    for rows in _blocks(n, chunk):
+        D = (S[rows] > lam_L) & (S[rows] > S[:, rows].T + lam_s)
+        D[np.arange(D.shape[0]), np.arange(rows.start, rows.stop)] = False
+        strength[rows] = D.sum(1)
+        weakness += D.sum(0)
+    return strength - weakness
+
+
+class _Distiller:
+    """
+    Qualification of the still-unranked alternatives, kept up to date
+    incrementally.  While λ_max survives a removal the outranking relation
+    among the rest is unchanged (no remaining entry lies between the old
+    and new λ_L), so only the removed rows/columns are subtracted – O(n)
+    per step instead of re-qualifying the whole O(n²) sub-matrix.
+    """
+
+    def __init__(self, S: np.ndarray, chunk: int):
+        self.S, self.chunk = S, chunk
+        self.alive = np.arange(S.shape[0])
+        self._rebuild()
+
+    def _rebuild(self):
+        sub = self.S[np.ix_(self.alive, self.alive)]
+        self.lam_max, self.lam_s, self.lam_L = _lambdas(sub)
+        self.n_max = np.count_nonzero(sub == self.lam_max)
+        self.qual = qualification(sub, self.chunk)
+
+    def remove(self, pos: np.ndarray):
+        keep = np.ones(self.alive.size, dtype=bool)
+        keep[pos] = False
+        R, a = self.alive[pos], self.alive[keep]
+        col = self.S[np.ix_(a, R)]              # S[i, r]
+        row = self.S[np.ix_(R, a)]              # S[r, j]
+        self.n_max -= (np.count_nonzero(col == self.lam_max)
+                       + np.count_nonzero(row == self.lam_max)
+                       + np.count_nonzero(self.S[np.ix_(R, R)] == self.lam_max))
+        self.alive = a
+        if not a.size:
+            return
+        if self.n_max == 0:                     # λ-cut moved → requalify
+            self._rebuild()
+            return
+        beats_r = (col > self.lam_L) & (col > row.T + self.lam_s)
+        r_beats = (row > self.lam_L) & (row > col.T + self.lam_s)
+        self.qual = self.qual[keep] - beats_r.sum(1) + r_beats.sum(0)
+
+
+def _pick(dist: _Distiller, best, chunk: int) -> np.ndarray:
+    """Positions (into dist.alive) of the next class: winner, or a tied block."""
+    qual = dist.qual
+    index = np.flatnonzero(qual == best(qual))
+    while index.size > 1:
+        ix = dist.alive[index]
+        sub = qualification(dist.S[np.ix_(ix, ix)], chunk)
+        top = np.flatnonzero(sub == best(sub))
+        if top.size == 1:
+            return index[top]
+        if top.size == index.size:
+            break
+        index = index[top]
+    return index
+
+
+def distillation(S: np.ndarray, descending: bool = True,
+                 chunk: int = CHUNK, k: int | None = None,
+                 groups=None) -> List[np.ndarray]:
+    """Classes of original positions, best first.  `descending=False` peels
+    off the worst alternatives first and reverses, like pyDecision.
+
+    With `k` (descending only) distillation stops as soon as the classes
+    found cover `k` alternatives – or `k` distinct `groups` labels – and
+    everything else is left out.
+    """
+    if k is not None and not descending:
+        raise ValueError("early stopping needs the descending distillation")
+    best = np.amax if descending else np.amin
+    classes: List[np.ndarray] = []
+    if not S.size:
+        return classes
+    seen: set = set()
+    covered = 0
+    dist = _Distiller(S, chunk)
+    while dist.alive.size:
+        pos = _pick(dist, best, chunk)
+        classes.append(dist.alive[pos])
+        if k is not None:
+            if groups is None:
+                covered += pos.size
+            else:
+                seen.update(np.asarray(groups)[classes[-1]].tolist())
+                covered = len(seen)
+            if covered >= k:
+                break
+        dist.remove(pos)
+    return classes if descending else classes[::-1]
+
+
+def _to_ranks(classes: List[np.ndarray], n: int) -> np.ndarray:
+    ranks = np.zeros(n, dtype=int)                  # 0 = not ranked
+    for pos, block in enumerate(classes, 1):
+        ranks[block] = pos
+    return ranks
+
+
+def electre_iii_ranks(M, P, Q, V, W, descending: bool = True,
+                      chunk: int = CHUNK, k: int | None = None,
+                      groups=None) -> np.ndarray:
+    """
+    ELECTRE III on a benefit-oriented (n × m) matrix.
+
+    Returns the 1-based class of every row in the descending (default) or
+    ascending distillation; tied rows share a class.  With `k`, only the
+    leading classes are distilled (see `distillation`) and the remaining
+    rows get 0.
+    """
+    S = credibility_matrix(M, Q, P, V, W, chunk)
+    return _to_ranks(distillation(S, descending, chunk, k, groups),
+                     S.shape[0])
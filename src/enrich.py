@@ -1,13 +1,20 @@
 
 from __future__ import annotations
-import os, json, time, pandas as pd
-from typing import Dict, Any
+import os, json, time, random, threading, pandas as pd
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, Iterator, Tuple
 from tqdm import tqdm
 
-from openai import OpenAI
 from dataloader import readTourismData
+from lazy import Lazy, lazy_module
+from metrics import timed
+from enrich_store import ResponseStore, response_key
 
-client = OpenAI()                       # relies on OPENAI_API_KEY env. var
+openai  = lazy_module("openai")         # ≈ 0.5 s – only when enriching
+_client = Lazy(lambda: openai.OpenAI())  # relies on OPENAI_API_KEY env. var
+MODEL  = "gpt-4o-mini"
+STORE_FILE = "enrich_cache.sqlite"      # per data dir, survives crashes
 SYSTEM_MSG: Dict[str, str] = {
     "role": "system",
     "content": "You are a strict JSON generator. Output only valid JSON."
@@ -33,52 +40,324 @@ Popularity score (0-1): {popularity}
 """.strip()
 
 
-def _gpt_enrich_row(row: pd.Series) -> Dict[str, Any]:
-    prompt = PROMPT_TEMPLATE.format(**row)
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
+BATCH_TEMPLATE = """
+You are a sustainability analyst.  For EACH Point-of-Interest in the JSON
+array below, estimate z1–z6 (floats 0–1).  Return ONLY a JSON object
+{{"results": [{{"id": <id>, "z1": …, "z6": …}}, …]}} with one entry per POI.
+
+Definitions (copy exactly):
+• z1 = estimated CO2-kg per individual visit (lower = greener).
+• z2 = current_visitors / carrying_capacity (lower = less crowded).
+• z3 = entropy-based seasonality balance (higher = steadier flow).
+• z4 = proportion of revenue retained locally (higher = better).
+• z5 = crowd-adjusted heritage fragility (lower = safer for culture).
+• z6 = overall physical & sensory accessibility (higher = inclusive).
+
+POIs:
+{pois}
+""".strip()
+BATCH_FIELDS = ["name", "category", "lat", "lon", "sustainability", "popularity"]
+_Z_KEYS = [f"z{i}" for i in range(1, 7)]
+
+
+# ── concurrency / rate-limit defaults ─────────────────────────────────
+CONCURRENCY  = 8          # requests in flight
+RATE_PER_S   = 5.0        # sustained request rate (token bucket refill)
+BURST        = 5          # bucket size
+MAX_RETRIES  = 4
+BACKOFF_S    = 1.0        # first retry delay, doubled each attempt
+BATCH_SIZE   = 1          # POIs per request; > 1 → JSON-array prompts
+
+
+class InvalidAnswer(ValueError):
+    """The model's answer lacks z1–z6 floats in [0, 1]."""
+
+
+def transient_errors() -> tuple:
+    """Exceptions worth a retry (resolving them imports openai); a
+    malformed answer is asked again too."""
+    return (openai.RateLimitError, openai.APITimeoutError,
+            openai.APIConnectionError, openai.InternalServerError,
+            TimeoutError, ConnectionError, InvalidAnswer)
+
+
+def __getattr__(name: str):
+    # `enrich.client` / `enrich.TRANSIENT` used to be built at import
+    if name == "client":
+        return _client.get()
+    if name == "TRANSIENT":
+        return transient_errors()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `acquire()` blocks until a token is free."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate, self.burst = rate, burst
+        self._tokens = float(burst)
+        self._t = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst,
+                                   self._tokens + (now - self._t) * self.rate)
+                self._t = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass
+class EnrichStats:
+    """Per-mode request/row/token counters – compare batch sizes with it."""
+    modes: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    wall_s: float = 0.0
+    answered: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, mode: str, rows: int, seconds: float, usage=None) -> None:
+        with self._lock:
+            m = self.modes.setdefault(mode, dict(requests=0, rows=0, busy_s=0.0,
+                                                 prompt_tokens=0,
+                                                 completion_tokens=0))
+            m["requests"] += 1
+            m["rows"] += rows
+            m["busy_s"] += seconds
+            m["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+            m["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """rows/s per request-second and tokens per row, for each mode."""
+        out = {}
+        for mode, m in self.modes.items():
+            rows = m["rows"] or 1
+            out[mode] = dict(m,
+                             rows_per_s=m["rows"] / m["busy_s"] if m["busy_s"] else 0.0,
+                             tokens_per_row=(m["prompt_tokens"]
+                                             + m["completion_tokens"]) / rows)
+        out["overall"] = dict(answered=self.answered, wall_s=self.wall_s,
+                              rows_per_s=(self.answered / self.wall_s
+                                          if self.wall_s else 0.0))
+        return out
+
+
+@timed("openai.chat")
+def _chat(client, prompt: str):
+    return (client or _client.get()).chat.completions.create(
+        model=MODEL,
         messages=[SYSTEM_MSG, {"role": "user", "content": prompt}],
         temperature=0.1,
         response_format={"type": "json_object"},
         timeout=30,
     )
-    return json.loads(resp.choices[0].message.content)
+
+
+def _valid_z(obj: Any) -> Dict[str, float] | None:
+    """z1–z6 as floats in [0, 1], or None if anything is off."""
+    try:
+        z = {k: float(obj[k]) for k in _Z_KEYS}
+    except (KeyError, TypeError, ValueError):
+        return None
+    return z if all(0 <= v <= 1 for v in z.values()) else None
+
+
+def _gpt_enrich_row(row: pd.Series, client=None,
+                    stats: EnrichStats | None = None) -> Dict[str, float]:
+    prompt = PROMPT_TEMPLATE.format(**row)
+    t0 = time.perf_counter()
+    resp = _chat(client, prompt)
+    if stats is not None:
+        stats.add("single", 1, time.perf_counter() - t0, resp.usage)
+    try:
+        z = _valid_z(json.loads(resp.choices[0].message.content))
+    except ValueError:
+        z = None
+    if z is None:
+        raise InvalidAnswer(f"no valid z1–z6 for {row.get('name')!r}")
+    return z
+
+
+def _gpt_enrich_batch(rows: pd.DataFrame, client=None,
+                      stats: EnrichStats | None = None) -> Dict[Any, Dict[str, float]]:
+    """One request for all `rows`; returns only the items that validate."""
+    ids = list(rows.index)
+    pois = [dict(id=i, **{f: r.get(f) for f in BATCH_FIELDS})
+            for i, (_, r) in enumerate(rows.iterrows())]
+    prompt = BATCH_TEMPLATE.format(pois=json.dumps(pois, ensure_ascii=False,
+                                                   default=str))
+    t0 = time.perf_counter()
+    resp = _chat(client, prompt)
+    if stats is not None:
+        stats.add("batch", len(ids), time.perf_counter() - t0, resp.usage)
+    try:
+        items = json.loads(resp.choices[0].message.content)["results"]
+    except (ValueError, KeyError, TypeError):
+        return {}
+    out = {}
+    for item in items if isinstance(items, list) else []:
+        z = _valid_z(item)
+        pos = item.get("id") if isinstance(item, dict) else None
+        if z is not None and isinstance(pos, int) and 0 <= pos < len(ids):
+            out[ids[pos]] = z
+    return out
+
+
+def _with_retry(fn: Callable[[], Any], bucket: TokenBucket,
+                retries: int = MAX_RETRIES, backoff: float = BACKOFF_S):
+    for attempt in range(retries + 1):
+        bucket.acquire()
+        try:
+            return fn()
+        except transient_errors():
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt * (1 + random.random() / 2))
+
+
+def enrich_rows(rows: pd.DataFrame, client=None,
+                concurrency: int = CONCURRENCY, rate_per_s: float = RATE_PER_S,
+                burst: int = BURST, retries: int = MAX_RETRIES,
+                backoff: float = BACKOFF_S, batch_size: int = BATCH_SIZE,
+                stats: EnrichStats | None = None) -> Iterator[Tuple[Any, Any, str]]:
+    """
+    Enrich `rows` on a bounded thread pool, rate-limited by a token bucket
+    and retrying transient API errors with exponential backoff.
+
+    With `batch_size > 1`, rows go out `batch_size` at a time as one
+    JSON-array prompt; only items that come back missing or invalid are
+    retried as single-row calls.
+
+    Yields `(index, z_dict | Exception, kind)` in completion order, so
+    callers can report progress (and write results) on their own thread;
+    `kind` ("single" / "batch") is the prompt that answered.
+    """
+    bucket = TokenBucket(rate_per_s, burst)
+    t0, answered = time.perf_counter(), 0
+
+    def single(idx):
+        return pool.submit(_with_retry,
+                           lambda r=rows.loc[idx]: _gpt_enrich_row(r, client, stats),
+                           bucket, retries, backoff)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futs: Dict[Any, Tuple[str, Any]] = {}
+        if batch_size > 1:
+            for i in range(0, len(rows), batch_size):
+                chunk = rows.iloc[i:i + batch_size]
+                fut = pool.submit(_with_retry,
+                                  lambda c=chunk: _gpt_enrich_batch(c, client, stats),
+                                  bucket, retries, backoff)
+                futs[fut] = ("batch", list(chunk.index))
+        else:
+            futs = {single(idx): ("single", idx) for idx in rows.index}
+
+        while futs:
+            done, _ = wait(futs, return_when=FIRST_COMPLETED)
+            for fut in done:
+                kind, what = futs.pop(fut)
+                try:
+                    res = fut.result()
+                except Exception as e:
+                    if kind == "single":
+                        yield what, e, kind
+                    else:                       # whole batch failed
+                        futs.update({single(i): ("single", i) for i in what})
+                    continue
+                if kind == "single":
+                    answered += 1
+                    yield what, res, kind
+                    continue
+                for idx in what:
+                    if idx in res:
+                        answered += 1
+                        yield idx, res[idx], kind
+                    else:
+                        futs[single(idx)] = ("single", idx)
+    if stats is not None:
+        stats.wall_s += time.perf_counter() - t0
+        stats.answered += answered
+
+
+def answer_key(kind: str, row: pd.Series) -> str:
+    """Response-store key of `row` under the prompt `kind` it went out in."""
+    if kind == "batch":
+        return response_key(BATCH_TEMPLATE, MODEL, row, BATCH_FIELDS)
+    return response_key(PROMPT_TEMPLATE, MODEL, row)
 
 
 # ── public helper – call from Streamlit ───────────────────────────────
 def enrich_dataset(data_dir: str = "./data",
-                   spinner_callback=None) -> pd.DataFrame:
+                   spinner_callback=None, client=None,
+                   concurrency: int = CONCURRENCY,
+                   rate_per_s: float = RATE_PER_S,
+                   store_path: str | None = None,
+                   batch_size: int = BATCH_SIZE,
+                   stats: EnrichStats | None = None) -> pd.DataFrame:
     """
     • Reads **all** CSVs in `data_dir`
-    • Calls GPT for each row that does **not** already have z1–z6
+    • Calls GPT (concurrently, rate-limited) for each row that does **not**
+      already have z1–z6; `client` defaults to a shared `OpenAI()`,
+      created on first use
+    • Every answer is checkpointed to a SQLite store (`store_path`,
+      default `<data_dir>/enrich_cache.sqlite`) under the prompt that
+      produced it, so a rerun after a crash or a small CSV edit – in
+      either mode – only asks for rows it has never seen
+    • `batch_size > 1` packs that many POIs per request; pass an
+      `EnrichStats` to read rows/s and tokens/row per mode afterwards
     • Writes:
         – `poi_all_enriched.csv`
         – `poi_<muni>_…_enriched.csv` (one per municipality)
     • Returns the enriched DataFrame
     """
-    df = readTourismData(data_dir)
-    need = df[[f"z{i}" for i in range(1, 7)]].isna().any(axis=1)
+    df = readTourismData(data_dir, place_meta=False)
+    need = df.reindex(columns=[f"z{i}" for i in range(1, 7)]).isna().any(axis=1)
 
     total = need.sum()
     if total == 0:
         return df      # nothing to do
 
+    store = ResponseStore(store_path or os.path.join(data_dir, STORE_FILE))
+    keys = {idx: {kind: answer_key(kind, row) for kind in ("single", "batch")}
+            for idx, row in df.loc[need].iterrows()}
+    cached = store.get_many({k for ks in keys.values() for k in ks.values()})
+    todo = []
+
+    def apply(idx, z_vals):
+        for k, v in z_vals.items():
+            df.at[idx, k] = v
+
+    for idx, ks in keys.items():
+        hit = next((k for k in ks.values() if k in cached), None)
+        if hit is None:
+            todo.append(idx)
+        else:
+            apply(idx, cached[hit])
+
     # Show progress if we’re inside Streamlit
-    pbar = tqdm(total=total, disable=spinner_callback is None)
+    pbar = tqdm(total=total, initial=total - len(todo),
+                disable=spinner_callback is None)
     if spinner_callback:
         spinner = spinner_callback("Calling GPT…")
 
     try:
-        for idx in df.index[need]:
-            try:
-                z_vals = _gpt_enrich_row(df.loc[idx])
-                for k, v in z_vals.items():
-                    df.at[idx, k] = v
-            except Exception as e:
-                print(f"⚠️ {df.at[idx, 'name']}: {e}")
-            finally:
-                pbar.update(1)
+        for idx, z_vals, kind in enrich_rows(df.loc[todo], client,
+                                             concurrency, rate_per_s,
+                                             batch_size=batch_size,
+                                             stats=stats):
+            if isinstance(z_vals, Exception):
+                print(f"⚠️ {df.at[idx, 'name']}: {z_vals}")
+            else:
+                apply(idx, z_vals)
+                store.put(keys[idx][kind], z_vals)
+            pbar.update(1)
     finally:
+        store.close()
         pbar.close()
         if spinner_callback:
             spinner.empty()       # remove spinner
@@ -87,7 +366,7 @@ def enrich_dataset(data_dir: str = "./data",
     master = os.path.join(data_dir, "poi_all_enriched.csv")
     df.to_csv(master, index=False)
 
-    for muni, sub in df.groupby("municipality"):
+    for muni, sub in df.groupby("municipality", observed=True):
         fname = os.path.join(data_dir, f"poi_{muni}_enriched.csv")
         sub.to_csv(fname, index=False)
 
@@ -0,0 +1,78 @@
+from __future__ import annotations
+import hashlib, json, sqlite3, string, threading, time
+from typing import Any, Dict, Iterable, Mapping
+
+# ─────────────────────────────────────────────────────────────
+# Persistent GPT response store (SQLite)
+#   key = sha256(prompt template, model, the row fields the template
+#   actually uses) → editing an unrelated column or another row never
+#   invalidates an answer.  Templates that take rows through one
+#   placeholder (batch prompts) name the row fields explicitly.
+# ─────────────────────────────────────────────────────────────
+FLUSH_EVERY = 20          # rows per checkpoint commit
+
+
+def template_fields(template: str) -> list[str]:
+    return sorted({f for _, f, _, _ in string.Formatter().parse(template) if f})
+
+
+def response_key(template: str, model: str, row: Mapping[str, Any],
+                 fields: Iterable[str] | None = None) -> str:
+    fields = {f: str(row[f]) for f in (template_fields(template)
+                                       if fields is None else sorted(fields))}
+    blob = json.dumps([template, model, fields], sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class ResponseStore:
+    """Append-mostly key → z-dict store, checkpointed every `flush_every` puts."""
+
+    def __init__(self, path: str, flush_every: int = FLUSH_EVERY):
+        self.path = path
+        self.flush_every = flush_every
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS responses ("
+                         "key TEXT PRIMARY KEY, z TEXT NOT NULL, ts REAL)")
+        self._db.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, dict]:
+        keys = list(keys)
+        out: Dict[str, dict] = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):      # SQLite variable limit
+                chunk = keys[i:i + 500]
+                q = ("SELECT key, z FROM responses WHERE key IN (%s)"
+                     % ",".join("?" * len(chunk)))
+                out.update((k, json.loads(z)) for k, z in self._db.execute(q, chunk))
+        return out
+
+    def put(self, key: str, z: dict) -> None:
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                             (key, json.dumps(z), time.time()))
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._db.commit()
+                self._pending = 0
+
+    def flush(self) -> None:
+        with self._lock:
+            self._db.commit()
+            self._pending = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
+
+    def __enter__(self) -> "ResponseStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
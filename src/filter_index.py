@@ -0,0 +1,102 @@
+from __future__ import annotations
+import numpy as np, pandas as pd
+from typing import Dict, Iterable, Tuple
+from poistore import PoiStore
+from spatial import PoiSpatialIndex
+from taxonomy import category_codes
+from userprof import Profile
+
+# ─────────────────────────────────────────────────────────────
+# Packed bitmask indexes for the (group) prefilter
+#   one bit per POI, 8 POIs per byte; every member constraint is a
+#   handful of bitwise ops on these, so group size barely matters.
+# ─────────────────────────────────────────────────────────────
+MODES = ("intersection", "union")
+
+
+def _pack(mask: np.ndarray) -> np.ndarray:
+    return np.packbits(mask)
+
+
+class PrefilterIndex:
+    """
+    Category, accessibility (`z6 >= .5`) and spatial indexes over one
+    dataset.  Built once; `mask()` answers a whole group in one pass.
+    """
+
+    def __init__(self, df: pd.DataFrame,
+                 spatial: PoiSpatialIndex | None = None):
+        codes, cats = category_codes(df)
+        z6 = df["z6"] if "z6" in df else pd.Series(np.nan, index=df.index)
+        self._build(df.index, codes, cats, z6.to_numpy(),
+                    spatial or PoiSpatialIndex.from_frame(df))
+
+    @classmethod
+    def from_store(cls, store: PoiStore,
+                   spatial: PoiSpatialIndex | None = None) -> "PrefilterIndex":
+        """Same index over a `PoiStore`; labels are store positions."""
+        self = cls.__new__(cls)
+        self._build(pd.RangeIndex(len(store)), store.category_codes,
+                    store.categories, store.Z[:, 5],
+                    spatial or PoiSpatialIndex(store.lat, store.lon))
+        return self
+
+    def _build(self, labels: pd.Index, codes: np.ndarray, cats,
+               z6: np.ndarray, spatial: PoiSpatialIndex):
+        self.labels = labels
+        self.n = len(labels)
+        self.categories: Dict[str, np.ndarray] = {
+            c: _pack(codes == i) for i, c in enumerate(cats)
+        }
+        self.accessible = _pack(z6 >= .5)
+        self.all = _pack(np.ones(self.n, dtype=bool))
+        self.none = _pack(np.zeros(self.n, dtype=bool))
+        self.spatial = spatial
+        self._pos = pd.Series(np.arange(self.n), index=self.labels)
+
+    def _within(self, p: Profile, exact: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """Packed radius mask + dense distance vector (NaN outside)."""
+        dist = self.spatial.query(*p.location, p.max_disp, exact=exact)
+        pos = self._pos.reindex(dist.index).to_numpy()
+        ok = ~np.isnan(pos)                 # spatial may cover a superset
+        pos = pos[ok].astype(int)
+        hit = np.zeros(self.n, dtype=bool)
+        hit[pos] = True
+        d = np.full(self.n, np.nan)
+        d[pos] = dist.to_numpy()[ok]
+        return _pack(hit), d
+
+    def member(self, p: Profile, exact: bool = True
+               ) -> Tuple[np.ndarray, np.ndarray | None]:
+        """Packed mask of POIs acceptable to one traveller (+ distances)."""
+        bits = self.all.copy()
+        for c in p.avoid:
+            if c in self.categories:
+                bits &= ~self.categories[c]
+        dist = None
+        if p.location and p.max_disp:
+            near, dist = self._within(p, exact)
+            bits &= near
+        if p.mobility_constr:
+            bits &= self.accessible
+        return bits, dist
+
+    def mask(self, profiles: Iterable[Profile], mode: str = "intersection",
+             exact: bool = True) -> Tuple[np.ndarray, np.ndarray | None]:
+        """
+        Boolean row mask for the group + farthest member distance (km).
+
+        `intersection` keeps POIs every member accepts; `union` keeps POIs
+        at least one member accepts.
+        """
+        if mode not in MODES:
+            raise ValueError(f"unknown group mode: {mode!r}")
+        inter = mode == "intersection"
+        bits = self.all.copy() if inter else self.none.copy()
+        far = None
+        for p in profiles:
+            m, d = self.member(p, exact)
+            bits = (bits & m) if inter else (bits | m)
+            if d is not None:
+                far = d if far is None else np.fmax(far, d)
+        return np.unpackbits(bits, count=self.n).astype(bool), far
@@ -1,53 +1,77 @@
 # MAI_AIS_Tourism_demo/src/google_photos.py
 from __future__ import annotations
-import os, googlemaps
-from functools import lru_cache
+import os
 from typing import Tuple, Optional
+from lazy import Lazy
+from metrics import count
+from placecache import place_cache
 
 _API_KEY = os.getenv("GOOGLE_MAPS_KEY")
-_client  = googlemaps.Client(_API_KEY) if _API_KEY else None
 
 
-@lru_cache(maxsize=2_000)
-def place_photo_url(name: str,
-                    coords: Tuple[float, float] | None = None,
-                    max_w: int = 500) -> Optional[str]:
-    """
-    Return a public URL of the first Google photo for *name*.
-    Falls back gracefully (returns None) if nothing is found or no API key.
-    """
-    if not _client:
-        return None
+def _make_client():
+    import googlemaps
+    return googlemaps.Client(_API_KEY)
+
 
+_client = Lazy(_make_client)             # built on the first photo lookup
+
+
+def _photo_ref(name: str,
+               coords: Tuple[float, float] | None) -> Optional[str]:
+    """photo_reference of the first Google photo for *name*, or None.
+    Raises the last API error when a lookup failed and nothing was found,
+    so the failure is not cached as "no photo"."""
+    failed: Exception | None = None
     # ---------- 1) try Nearby Search (precise & cheap) ----------
     if coords is not None:
+        count("google.api_calls", api="places_nearby")
         try:
-            nearby = _client.places_nearby(
+            nearby = _client.get().places_nearby(
                 location=coords, radius=80, keyword=name, rank_by="distance"
             )
             if nearby["results"]:
                 photos = nearby["results"][0].get("photos")
                 if photos:
-                    ref = photos[0]["photo_reference"]
-                    return (
-                        "https://maps.googleapis.com/maps/api/place/photo"
-                        f"?maxwidth={max_w}&photoreference={ref}&key={_API_KEY}"
-                    )
-        except Exception:
-            pass
+                    return photos[0]["photo_reference"]
+        except Exception as e:
+            failed = e
 
     # ---------- 2) text search fallback (name-only) -------------
+    count("google.api_calls", api="places")
     try:
-        search = _client.places(query=name)
+        search = _client.get().places(query=name)
         if search["results"]:
             photos = search["results"][0].get("photos")
             if photos:
-                ref = photos[0]["photo_reference"]
-                return (
-                    "https://maps.googleapis.com/maps/api/place/photo"
-                    f"?maxwidth={max_w}&photoreference={ref}&key={_API_KEY}"
-                )
-    except Exception:
-        pass
+                return photos[0]["photo_reference"]
+    except Exception as e:
+        failed = e
 
+    if failed is not None:
+        raise failed
     return None
+
+
+def place_photo_url(name: str,
+                    coords: Tuple[float, float] | None = None,
+                    max_w: int = 500) -> Optional[str]:
+    """
+    Return a public URL of the first Google photo for *name*.
+    Falls back gracefully (returns None) if nothing is found or no API key.
+    The photo reference (never the signed URL) lives in the shared
+    place cache, so every process and restart reuses it.
+    """
+    if not _API_KEY:
+        return None
+
+    key = name if coords is None else f"{name}|{coords[0]:.5f},{coords[1]:.5f}"
+    ref = place_cache().get_or_fetch("gm_photo", key,
+                                     lambda: _photo_ref(name, coords),
+                                     errors=(Exception,))
+    if ref is None:
+        return None
+    return (
+        "https://maps.googleapis.com/maps/api/place/photo"
+        f"?maxwidth={max_w}&photoreference={ref}&key={_API_KEY}"
+    )
@@ -0,0 +1,102 @@
+from __future__ import annotations
+import argparse, json, os, platform, subprocess, sys, time
+from typing import Any, Dict, List
+
+# ─────────────────────────────────────────────────────────────
+# Cold-start (import time) benchmark
+#   Imports each module in a fresh interpreter under `python -X importtime`
+#   and reports its cumulative import time, the process wall time and the
+#   heaviest direct imports.  `--baseline` compares against an earlier
+#   report and exits non-zero on regressions beyond `--tolerance`.
+#
+#   python src/importbench.py --out importtime.json
+#   python src/importbench.py --baseline importtime.json
+# ─────────────────────────────────────────────────────────────
+MODULES   = ["dataloader", "ranking_recommender", "introscreen", "service",
+             "batch", "enrich", "google_photos"]
+REPEAT    = 3
+TOP       = 5
+TOLERANCE = 0.25
+SRC       = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """`-X importtime` lines → [{name, level, self_us, cumulative_us}]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        rows.append({"name": name.strip(),
+                     "level": (len(name) - len(name.lstrip()) - 1) // 2,
+                     "self_us": int(self_us), "cumulative_us": int(cum_us)})
+    return rows
+
+
+def measure(module: str) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    p = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                        f"import {module}"], cwd=SRC, capture_output=True,
+                       text=True)
+    wall = time.perf_counter() - t0
+    if p.returncode:
+        return {"error": p.stderr.strip().splitlines()[-1]}
+    rows = parse_importtime(p.stderr)
+    own = next(r for r in reversed(rows) if r["name"] == module and r["level"] == 0)
+    heavy = sorted((r for r in rows if r["level"] == 1),
+                   key=lambda r: -r["cumulative_us"])[:TOP]
+    return {"import_s": own["cumulative_us"] / 1e6, "wall_s": wall,
+            "modules_loaded": len(rows),
+            "heaviest": [{"name": r["name"], "s": r["cumulative_us"] / 1e6}
+                         for r in heavy]}
+
+
+def run(modules=MODULES, repeat: int = REPEAT) -> Dict[str, Any]:
+    results = {}
+    for m in modules:
+        runs = [measure(m) for _ in range(repeat)]
+        ok = [r for r in runs if "error" not in r]
+        results[m] = (min(ok, key=lambda r: r["import_s"]) if ok
+                      else runs[0])                  # best of `repeat`
+    return {"meta": {"time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                     "python": platform.python_version(), "repeat": repeat},
+            "results": results}
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any],
+            tolerance: float = TOLERANCE) -> List[str]:
+    """Modules whose import got slower than baseline × (1 + tolerance)."""
+    slower = []
+    for m, r in report["results"].items():
+        b = baseline["results"].get(m, {})
+        if "import_s" in r and "import_s" in b \
+                and r["import_s"] > b["import_s"] * (1 + tolerance):
+            slower.append(f"{m}: {b['import_s']:.3f}s → {r['import_s']:.3f}s")
+    return slower
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Measure module import times")
+    ap.add_argument("modules", nargs="*", default=MODULES)
+    ap.add_argument("--repeat", type=int, default=REPEAT)
+    ap.add_argument("--out", help="write the report as JSON")
+    ap.add_argument("--baseline", help="earlier report to compare against")
+    ap.add_argument("--tolerance", type=float, default=TOLERANCE)
+    a = ap.parse_args()
+    report = run(a.modules, a.repeat)
+    for m, r in report["results"].items():
+        if "error" in r:
+            print(f"{m:<22} ERROR {r['error']}")
+            continue
+        heavy = ", ".join(f"{h['name']} {h['s']:.3f}" for h in r["heaviest"][:3])
+        print(f"{m:<22} import={r['import_s']:.3f}s wall={r['wall_s']:.3f}s "
+              f"modules={r['modules_loaded']:<5} {heavy}")
+    if a.out:
+        with open(a.out, "w") as fh:
+            json.dump(report, fh, indent=2)
+    if a.baseline:
+        with open(a.baseline) as fh:
+            slower = compare(report, json.load(fh), a.tolerance)
+        for s in slower:
+            print("SLOWER", s)
+        sys.exit(1 if slower else 0)
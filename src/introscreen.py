@@ -3,7 +3,8 @@ import streamlit as st
 from streamlit import session_state as ss
 import pandas as pd
 import pydeck as pdk
-from geopy.distance import geodesic
+from catalogue import shared_catalogue
+from spatial import PoiSpatialIndex
 from userprof import Profile
 
 DIST_DEFAULT = 50
@@ -28,18 +29,20 @@ def renderHeader():
 
 def renderMap(coords: pd.DataFrame,
               user_loc: Union[None, Tuple[float,float]]=None,
-              radius: Union[None, float]=None):
-  coords['distance_km'] = coords.apply(
-    lambda row: geodesic(user_loc, (row['lat'], row['lon'])).km,
-    axis=1
-  )
+              radius: Union[None, float]=None,
+              index: Union[None, PoiSpatialIndex]=None,
+              exact: bool=True):
+  # index is built once per dataset; fall back to a throwaway one
+  if index is None:
+    index = PoiSpatialIndex.from_frame(coords)
   # User has not entered loc
   if user_loc is None or radius is None:
-    coords['color'] = coords.apply(lambda row: [0x2F, 0xE8, 0x8d, 200], axis=1)
+    coords['color'] = [[0x2F, 0xE8, 0x8d, 200]] * len(coords)
   else:
-    coords['color'] = coords['distance_km'].apply(
-      lambda d: [0x2F, 0xE8, 0x8d, 200] if d <= radius else [0xFF, 0x84, 0x7C, 100]
-    )
+    coords['distance_km'] = index.distances(*user_loc)
+    inside = coords.index.isin(index.query(*user_loc, radius, exact=exact).index)
+    coords['color'] = [[0x2F, 0xE8, 0x8d, 200] if ok else [0xFF, 0x84, 0x7C, 100]
+                       for ok in inside]
     user_df = pd.DataFrame([{
       'name': 'You',
       'lat': user_loc[0],
@@ -116,7 +119,7 @@ def renderTabs():
       # Mobility constraints
       ss.profiles[n].mobility_constr = st.checkbox("This user has mobility constraints", key=f"mob_constr_{n}")
       # Types of activities selector
-      ss.profiles[n].avoid = st.multiselect("Which of these would you rather avoid?", options=ss.dest_types, key=f"city_ms_{n}")
+      ss.profiles[n].avoid = st.multiselect("Which of these would you rather avoid?", options=shared_catalogue().categories, key=f"city_ms_{n}")
       # Preferences slider
       # def changePrefs(name):
       #   sum_all = ss[f"cult_{n}"]+ss[f"nat_{n}"]+ss[f"nl_{n}"]+ss[f"li_{n}"]+ss[f"co2_{n}"]
@@ -143,10 +146,11 @@ def renderTabs():
       with cols_loc[2]:
         def changeLocNumberInps():
           location = ss[f"sel_{n}"]
-          lat, lon = ss.city_locs[location]["lat"], ss.city_locs[location]["lon"]
+          loc = shared_catalogue().city_locs[location]
+          lat, lon = loc["lat"], loc["lon"]
           ss[f"latitude_{n}"] = lat
           ss[f"longitude_{n}"] = lon
-        st.selectbox("Get coords. of a city", list(ss.city_locs), key=f"sel_{n}", on_change=changeLocNumberInps)
+        st.selectbox("Get coords. of a city", list(shared_catalogue().city_locs), key=f"sel_{n}", on_change=changeLocNumberInps)
       ss.profiles[n].location = (lat, lon)
       # Maximum disp.
       cols_dist = st.columns(4)
@@ -163,9 +167,11 @@ def renderTabs():
       if dist:
         ss.profiles[n].max_disp = int(dist)
       # Map
-      renderMap(pd.DataFrame(ss.data, columns=["lat","lon"]),
+      cat = shared_catalogue()
+      renderMap(cat.data[["lat","lon"]],
                 user_loc=ss.profiles[n].location,
-                radius=ss.profiles[n].max_disp)
+                radius=ss.profiles[n].max_disp,
+                index=cat.poi_index)
 
 
 def handleProfiles():
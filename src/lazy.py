@@ -0,0 +1,59 @@
+from __future__ import annotations
+import importlib, threading
+from types import ModuleType
+from typing import Callable, Generic, TypeVar
+
+# ─────────────────────────────────────────────────────────────
+# Deferred imports and clients (cold-start helpers)
+#   lazy_module("requests") – stand-in that imports on first attribute
+#   Lazy(factory)           – value built once, on first .get(), under a lock
+# ─────────────────────────────────────────────────────────────
+T = TypeVar("T")
+_UNSET = object()
+
+
+class lazy_module:
+    """Module proxy: `requests = lazy_module("requests")` costs nothing
+    until `requests.<attr>` is first read (the import lock makes this
+    thread-safe)."""
+    __slots__ = ("_name", "_mod")
+
+    def __init__(self, name: str):
+        self._name, self._mod = name, None
+
+    def _load(self) -> ModuleType:
+        if self._mod is None:
+            self._mod = importlib.import_module(self._name)
+        return self._mod
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._mod is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+class Lazy(Generic[T]):
+    """Thread-safe once-only construction of an expensive object."""
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._value = _UNSET
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        value = self._value
+        if value is _UNSET:
+            with self._lock:
+                if self._value is _UNSET:
+                    self._value = self._factory()
+                value = self._value
+        return value
+
+    def ready(self) -> bool:
+        return self._value is not _UNSET
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value = _UNSET
@@ -0,0 +1,100 @@
+from __future__ import annotations
+import argparse, json, time, urllib.error, urllib.request
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Any, Dict, List
+
+from bench import synth_group
+
+# ─────────────────────────────────────────────────────────────
+# Load test for service.py
+#   Fires `--requests` POST /recommend calls from `--concurrency` client
+#   threads; groups are synthetic (bench.synth_group) and drawn from
+#   `--distinct` seeds, so repeats exercise the workers' result cache.
+#   Reports latency percentiles, throughput and errors.
+#
+#   python src/loadtest.py --url http://127.0.0.1:8000 --requests 500 \
+#                          --concurrency 16 --group-size 5
+# ─────────────────────────────────────────────────────────────
+URL         = "http://127.0.0.1:8000"
+REQUESTS    = 200
+CONCURRENCY = 8
+GROUP_SIZE  = 3
+DISTINCT    = 50
+TIMEOUT_S   = 60
+
+
+def _call(url: str, method: str = "GET", payload: Any = None):
+    data = None if payload is None else json.dumps(payload).encode()
+    req = urllib.request.Request(url, data=data, method=method,
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=TIMEOUT_S) as r:
+        return r.status, json.loads(r.read())
+
+
+def make_payloads(categories: List[str], n: int, group_size: int,
+                  seed: int = 0) -> List[Dict[str, Any]]:
+    return [{"profiles": [asdict(p) for p in
+                          synth_group(group_size, categories, seed + i).values()]}
+            for i in range(n)]
+
+
+def run(url: str = URL, requests: int = REQUESTS,
+        concurrency: int = CONCURRENCY, group_size: int = GROUP_SIZE,
+        distinct: int = DISTINCT, seed: int = 0) -> Dict[str, Any]:
+    _, health = _call(f"{url}/health")
+    payloads = make_payloads(health["categories"], distinct, group_size, seed)
+
+    def one(i: int):
+        t0 = time.perf_counter()
+        try:
+            status, _ = _call(f"{url}/recommend", "POST",
+                              payloads[i % len(payloads)])
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except OSError:
+            status = 0
+        return status, time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        out = list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - t0
+
+    lat = np.array([dt for s, dt in out if s == 200]) * 1e3
+    statuses: Dict[str, int] = {}
+    for s, _ in out:
+        statuses[str(s)] = statuses.get(str(s), 0) + 1
+    pct = ({f"p{q}_ms": float(np.percentile(lat, q)) for q in (50, 90, 99)}
+           if len(lat) else {})
+    return {"url": url, "requests": requests, "concurrency": concurrency,
+            "group_size": group_size, "distinct_groups": distinct,
+            "server_workers": health.get("workers"), "pois": health["pois"],
+            "wall_s": wall, "throughput_rps": requests / wall,
+            "statuses": statuses,
+            "mean_ms": float(lat.mean()) if len(lat) else None,
+            "max_ms": float(lat.max()) if len(lat) else None, **pct}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Load-test the recommendation API")
+    ap.add_argument("--url", default=URL)
+    ap.add_argument("--requests", type=int, default=REQUESTS)
+    ap.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    ap.add_argument("--group-size", type=int, default=GROUP_SIZE)
+    ap.add_argument("--distinct", type=int, default=DISTINCT,
+                    help="distinct groups cycled through")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="also write the report as JSON")
+    a = ap.parse_args()
+    rep = run(a.url, a.requests, a.concurrency, a.group_size, a.distinct,
+              a.seed)
+    print(f"{rep['requests']} requests @ {rep['concurrency']} clients: "
+          f"{rep['throughput_rps']:.1f} req/s  "
+          + "  ".join(f"{q}={rep[q]:.1f}ms" for q in
+                      ("p50_ms", "p90_ms", "p99_ms", "max_ms") if q in rep)
+          + f"  statuses={rep['statuses']}")
+    if a.out:
+        with open(a.out, "w") as fh:
+            json.dump(rep, fh, indent=2)
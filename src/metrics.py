@@ -0,0 +1,322 @@
+from __future__ import annotations
+import contextvars, functools, json, os, threading, time, uuid
+from collections import deque
+from typing import Any, Callable, Dict, List, Tuple
+
+# ─────────────────────────────────────────────────────────────
+# Lightweight instrumentation
+#   timer()  – context manager / decorator around a stage or call
+#   count()  – counters (cache hits, API calls, …)
+#   trace()  – groups the timers of one request into a span list
+#   Aggregates live in a process registry; finished traces go to the
+#   enabled sinks (memory, JSON lines, Prometheus text file).  While
+#   disabled, `timer()` hands back a shared no-op and `count()` returns
+#   after one flag check – except inside a `trace(…, sink=…)`, which
+#   records its own spans for that one sink and leaves the process
+#   registry alone (per-session debugging).
+# ─────────────────────────────────────────────────────────────
+ENV_FLAG = "GREENEXPLORER_METRICS"            # "1" → MemorySink at import
+ENV_LOG  = "GREENEXPLORER_METRICS_LOG"        # path → JsonLogSink
+ENV_PROM = "GREENEXPLORER_METRICS_PROM"       # path → PrometheusSink
+
+_enabled = False
+_sinks: List["Sink"] = []
+_lock = threading.Lock()
+_trace: contextvars.ContextVar["Trace | None"] = contextvars.ContextVar(
+    "metrics_trace", default=None)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(kw: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in kw.items()))
+
+
+# ── registry ─────────────────────────────────────────────────
+class Registry:
+    """Process-wide counters and timer summaries (count / sum / max)."""
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.timers: Dict[Tuple[str, Labels], List[float]] = {}
+
+    def inc(self, name: str, labels: Labels, n: float) -> None:
+        with _lock:
+            k = (name, labels)
+            self.counters[k] = self.counters.get(k, 0) + n
+
+    def observe(self, name: str, labels: Labels, seconds: float) -> None:
+        with _lock:
+            s = self.timers.setdefault((name, labels), [0, 0.0, 0.0])
+            s[0] += 1
+            s[1] += seconds
+            s[2] = max(s[2], seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with _lock:
+            return {
+                "counters": [{"name": n, "labels": dict(l), "value": v}
+                             for (n, l), v in sorted(self.counters.items())],
+                "timers": [{"name": n, "labels": dict(l), "count": c,
+                            "sum_s": s, "max_s": m}
+                           for (n, l), (c, s, m) in sorted(self.timers.items())],
+            }
+
+    def clear(self) -> None:
+        with _lock:
+            self.counters.clear()
+            self.timers.clear()
+
+    def drain(self) -> Dict[str, Any]:
+        """Everything recorded since the last drain, then start afresh –
+        a worker process ships this to the parent's `merge`."""
+        with _lock:
+            delta = {"counters": self.counters, "timers": self.timers}
+            self.counters, self.timers = {}, {}
+            return delta
+
+    def merge(self, delta: Dict[str, Any]) -> None:
+        with _lock:
+            for k, n in delta["counters"].items():
+                self.counters[k] = self.counters.get(k, 0) + n
+            for k, (c, total, m) in delta["timers"].items():
+                s = self.timers.setdefault(k, [0, 0.0, 0.0])
+                s[0] += c
+                s[1] += total
+                s[2] = max(s[2], m)
+
+
+registry = Registry()
+
+
+# ── traces ───────────────────────────────────────────────────
+class Trace:
+    """Spans (name, labels, start offset, duration) of one request."""
+
+    def __init__(self, name: str, **labels):
+        self.id = uuid.uuid4().hex[:12]
+        self.name, self.labels = name, {k: str(v) for k, v in labels.items()}
+        self.t0 = time.perf_counter()
+        self.started = time.time()
+        self.spans: List[Dict[str, Any]] = []
+        self.duration_s: float | None = None
+
+    def add(self, name: str, labels: Labels, start: float, seconds: float):
+        self.spans.append({"name": name, "labels": dict(labels),
+                           "start_s": start - self.t0, "duration_s": seconds})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "name": self.name, "labels": self.labels,
+                "started": self.started, "duration_s": self.duration_s,
+                "spans": list(self.spans)}
+
+
+class trace:
+    """`with trace("results", session=…) as t:` – no-op while disabled,
+    unless a `sink` is given: the trace is then always recorded and also
+    goes to that sink (and only there while disabled)."""
+
+    def __init__(self, name: str, sink: "Sink | None" = None, **labels):
+        self.name, self.sink, self.labels = name, sink, labels
+        self._t: Trace | None = None
+        self._token = None
+
+    def __enter__(self) -> "Trace | None":
+        if _enabled or self.sink is not None:
+            self._t = Trace(self.name, **self.labels)
+            self._token = _trace.set(self._t)
+        return self._t
+
+    def __exit__(self, *exc) -> None:
+        if self._t is None:
+            return
+        _trace.reset(self._token)
+        self._t.duration_s = time.perf_counter() - self._t.t0
+        if self.sink is not None:
+            self.sink.emit(self._t)
+        if _enabled:
+            registry.observe(f"trace.{self.name}", (), self._t.duration_s)
+            for s in list(_sinks):
+                if s is not self.sink:
+                    s.emit(self._t)
+
+
+def current_trace() -> Trace | None:
+    return _trace.get()
+
+
+# ── timers / counters ────────────────────────────────────────
+class _NoTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+_NO_TIMER = _NoTimer()
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "t0")
+
+    def __init__(self, name: str, labels: Labels):
+        self.name, self.labels = name, labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        dt = time.perf_counter() - self.t0
+        labels = self.labels + ((("error", exc_type.__name__),) if exc_type else ())
+        if _enabled:
+            registry.observe(self.name, labels, dt)
+        t = _trace.get()
+        if t is not None:
+            t.add(self.name, labels, self.t0, dt)
+
+
+def timer(name: str, **labels):
+    """Time a block: `with timer("electre", n=…):`."""
+    if not _enabled and _trace.get() is None:
+        return _NO_TIMER
+    return _Timer(name, _labels(labels))
+
+
+def timed(name: str | None = None, **labels) -> Callable:
+    """Decorator form of `timer`; the flag is checked per call."""
+    def deco(fn):
+        stage = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            if not _enabled and _trace.get() is None:
+                return fn(*a, **kw)
+            with _Timer(stage, _labels(labels)):
+                return fn(*a, **kw)
+        return wrapper
+    return deco
+
+
+def count(name: str, n: float = 1, **labels) -> None:
+    if _enabled:
+        registry.inc(name, _labels(labels), n)
+
+
+# ── sinks ────────────────────────────────────────────────────
+class Sink:
+    def emit(self, trace: Trace) -> None:
+        raise NotImplementedError
+
+
+class MemorySink(Sink):
+    """Keeps the last `maxlen` traces (for the debug panel / tests)."""
+
+    def __init__(self, maxlen: int = 50):
+        self.traces: deque = deque(maxlen=maxlen)
+
+    def emit(self, trace: Trace) -> None:
+        self.traces.append(trace.as_dict())
+
+
+class JsonLogSink(Sink):
+    """One JSON line per finished trace, appended to `path`."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def emit(self, trace: Trace) -> None:
+        line = json.dumps(trace.as_dict())
+        with _lock, open(self.path, "a") as fh:
+            fh.write(line + "\n")
+
+
+class PrometheusSink(Sink):
+    """Rewrites a Prometheus text-format file (node-exporter textfile
+    collector style) at most every `min_interval_s` seconds."""
+
+    def __init__(self, path: str, min_interval_s: float = 5.0):
+        self.path, self.min_interval_s = path, min_interval_s
+        self._last = 0.0
+
+    def emit(self, trace: Trace) -> None:
+        now = time.monotonic()
+        if now - self._last < self.min_interval_s:
+            return
+        self._last = now
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as fh:
+            fh.write(prometheus_text())
+        os.replace(tmp, self.path)
+
+
+def _prom_name(name: str) -> str:
+    return "greenexplorer_" + "".join(c if c.isalnum() else "_" for c in name)
+
+
+def _prom_labels(labels: Dict[str, str], **extra) -> str:
+    items = {**labels, **extra}
+    if not items:
+        return ""
+    esc = {k: str(v).replace("\\", "\\\\").replace('"', '\\"')
+           for k, v in items.items()}
+    return "{" + ",".join(f'{k}="{v}"' for k, v in esc.items()) + "}"
+
+
+def prometheus_text() -> str:
+    """The registry in Prometheus text exposition format."""
+    snap = registry.snapshot()
+    lines, typed = [], set()
+    for c in snap["counters"]:
+        n = _prom_name(c["name"]) + "_total"
+        if n not in typed:
+            lines.append(f"# TYPE {n} counter")
+            typed.add(n)
+        lines.append(f"{n}{_prom_labels(c['labels'])} {c['value']}")
+    for t in snap["timers"]:
+        n = _prom_name(t["name"]) + "_seconds"
+        if n not in typed:
+            lines.append(f"# TYPE {n} summary")
+            typed.add(n)
+        lines.append(f"{n}_count{_prom_labels(t['labels'])} {t['count']}")
+        lines.append(f"{n}_sum{_prom_labels(t['labels'])} {t['sum_s']:.6f}")
+    return "\n".join(lines) + "\n"
+
+
+# ── switch ───────────────────────────────────────────────────
+def enable(*sinks: Sink) -> None:
+    """Turn instrumentation on and add `sinks` (none → keep existing)."""
+    global _enabled
+    with _lock:
+        _sinks.extend(s for s in sinks if s not in _sinks)
+        _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def sinks() -> List[Sink]:
+    return list(_sinks)
+
+
+def configure_from_env() -> None:
+    """Enable the sinks requested through the GREENEXPLORER_METRICS* vars."""
+    found = []
+    if os.getenv(ENV_FLAG) == "1":
+        found.append(MemorySink())
+    if os.getenv(ENV_LOG):
+        found.append(JsonLogSink(os.environ[ENV_LOG]))
+    if os.getenv(ENV_PROM):
+        found.append(PrometheusSink(os.environ[ENV_PROM]))
+    if found:
+        enable(*found)
+
+
+configure_from_env()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+import argparse, os, time
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable
+from tqdm import tqdm
+
+from dataloader import PLACE_COLS, PLACE_META_FILE, readTourismData
+
+# ─────────────────────────────────────────────────────────────
+# Offline Google Places metadata
+#   Resolves address / rating / reviews / maps URI / photo name for
+#   every POI in data/ and keeps them in `place_meta.csv`, which
+#   `readTourismData` joins in – cards then render without any network
+#   call.  Photo *names* are stored, not signed URLs: the API key is
+#   added at render time and never written to disk.
+#
+#   python src/place_meta.py [--data data] [--force]
+# ─────────────────────────────────────────────────────────────
+REFRESH_DAYS       = 30      # re-resolve places found this long ago
+MISSING_RETRY_DAYS = 7       # retry "not found" after this long
+CONCURRENCY        = 8
+
+_KEY = ["municipality", "name"]
+_DAY = 24 * 3600
+
+
+def _record(name: str, town: str, place: dict | None, now: float) -> dict:
+    place = place or {}
+    photos = place.get("photos") or [{}]
+    return {"municipality": town, "name": name,
+            "place_id": place.get("id"),
+            "place_address": place.get("formattedAddress"),
+            "place_rating": place.get("rating"),
+            "place_reviews": place.get("userRatingCount"),
+            "place_maps_uri": place.get("googleMapsUri"),
+            "place_photo": photos[0].get("name"),
+            "place_fetched": now}
+
+
+def load_place_meta(data_dir: str = "./data") -> pd.DataFrame:
+    path = os.path.join(data_dir, PLACE_META_FILE)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=_KEY + PLACE_COLS)
+    return pd.read_csv(path, dtype={"municipality": str, "name": str})
+
+
+def due(pois: pd.DataFrame, side: pd.DataFrame, now: float,
+        refresh_days: float = REFRESH_DAYS,
+        missing_retry_days: float = MISSING_RETRY_DAYS) -> pd.DataFrame:
+    """The (municipality, name) pairs that are unresolved or stale."""
+    side = side.drop_duplicates(_KEY, keep="last")     # as join_place_meta
+    m = pois[_KEY].merge(side[_KEY + ["place_id", "place_fetched"]],
+                         on=_KEY, how="left")
+    age = now - m["place_fetched"].astype(float)
+    found = m["place_id"].notna()
+    stale = (m["place_fetched"].isna()
+             | (found & (age > refresh_days * _DAY))
+             | (~found & (age > missing_retry_days * _DAY)))
+    return pois.loc[stale.to_numpy(), _KEY]
+
+
+def build_place_meta(data_dir: str = "./data", force: bool = False,
+                     refresh_days: float = REFRESH_DAYS,
+                     missing_retry_days: float = MISSING_RETRY_DAYS,
+                     concurrency: int = CONCURRENCY,
+                     fetch: Callable[[str, str], dict | None] | None = None
+                     ) -> pd.DataFrame:
+    """
+    Refresh `place_meta.csv` in `data_dir` and return it.
+
+    • only POIs that are new, older than `refresh_days` (found) or
+      `missing_retry_days` (not found) are looked up – all with `force`
+    • a failed request leaves the POI's previous entry untouched
+    • `fetch(name, town)` defaults to the Places text search; found
+      places are also written to the shared place cache
+    """
+    cache = None
+    if fetch is None:
+        from ranking_recommender import GOOGLE_KEY, fetch_text_search
+        from placecache import place_cache
+        if not GOOGLE_KEY:
+            raise RuntimeError("set GOOGLE_MAPS_KEY to resolve place metadata")
+        cache = place_cache()
+        fetch = lambda n, t: fetch_text_search(n, t, strict=True)
+
+    pois = readTourismData(data_dir, place_meta=False)[_KEY].astype(str)
+    side = load_place_meta(data_dir)
+    now = time.time()
+    todo = pois if force else due(pois, side, now, refresh_days,
+                                  missing_retry_days)
+
+    fresh, failed = [], 0
+    with ThreadPoolExecutor(concurrency) as pool:
+        futs = {pool.submit(fetch, n, t): (n, t)
+                for t, n in todo.itertuples(index=False)}
+        for f in tqdm(as_completed(futs), total=len(futs),
+                      desc="Place metadata"):
+            name, town = futs[f]
+            try:
+                place = f.result()
+            except Exception as e:
+                print("PLACE ✗", f"{name}|{town}", repr(e))
+                failed += 1
+                continue
+            fresh.append(_record(name, town, place, now))
+            if cache is not None:
+                cache.put("text", f"{name}|{town}", place)
+
+    side = (pd.concat([side, pd.DataFrame(fresh, columns=_KEY + PLACE_COLS)],
+                      ignore_index=True)
+              .drop_duplicates(_KEY, keep="last")
+              .merge(pois, on=_KEY))                  # drop vanished POIs
+    path = os.path.join(data_dir, PLACE_META_FILE)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    side.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    print(f"place metadata: {len(fresh)} refreshed, {failed} failed, "
+          f"{len(pois) - len(todo)} up to date")
+    return side
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(
+        description="Resolve Google Places metadata for every POI in data/")
+    ap.add_argument("--data", default="./data")
+    ap.add_argument("--force", action="store_true",
+                    help="re-resolve every POI regardless of age")
+    ap.add_argument("--refresh-days", type=float, default=REFRESH_DAYS)
+    ap.add_argument("--missing-retry-days", type=float,
+                    default=MISSING_RETRY_DAYS)
+    ap.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    a = ap.parse_args()
+    build_place_meta(a.data, a.force, a.refresh_days, a.missing_retry_days,
+                     a.concurrency)
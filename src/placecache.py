@@ -0,0 +1,181 @@
+from __future__ import annotations
+import json, os, sqlite3, threading, time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+from metrics import count, timer
+
+# ─────────────────────────────────────────────────────────────
+# Shared Google-Places metadata cache
+#   Small in-process LRU in front of an SQLite file that every worker
+#   process opens, so a POI is looked up once per TTL – not once per
+#   process or restart.  "Not found" answers are cached too, with a
+#   shorter expiry; failed requests only for a minute, so an outage is
+#   neither hammered nor remembered as "no such place".  Values must be JSON-serialisable and must not embed
+#   the API key (callers cache place ids / photo names, not signed URLs).
+# ─────────────────────────────────────────────────────────────
+CACHE_FILE      = os.path.join("data", "places_cache.sqlite")
+TTL_S           = 30 * 24 * 3600       # found
+NEGATIVE_TTL_S  = 6 * 3600             # not found
+ERROR_TTL_S     = 60                   # request failed
+MAX_ENTRIES     = 50_000               # on disk
+MEM_ENTRIES     = 2_048                # in-process front
+PRUNE_EVERY     = 500                  # puts between size checks
+
+MISS = object()
+
+
+class PlaceCache:
+    """Namespaced key → JSON value cache with TTL, size bound and metrics."""
+
+    def __init__(self, path: str = CACHE_FILE, ttl_s: float = TTL_S,
+                 negative_ttl_s: float = NEGATIVE_TTL_S,
+                 error_ttl_s: float = ERROR_TTL_S,
+                 max_entries: int = MAX_ENTRIES,
+                 mem_entries: int = MEM_ENTRIES):
+        self.path = path
+        self.ttl_s, self.negative_ttl_s = ttl_s, negative_ttl_s
+        self.error_ttl_s = error_ttl_s
+        self.max_entries, self.mem_entries = max_entries, mem_entries
+        self._mem: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.counts = dict(mem_hits=0, disk_hits=0, negative_hits=0,
+                           misses=0, expired=0, fetches=0, errors=0,
+                           evicted=0)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS places ("
+                         "key TEXT PRIMARY KEY, value TEXT, "
+                         "ts REAL NOT NULL, expires REAL NOT NULL)")
+        self._db.commit()
+
+    @staticmethod
+    def _key(ns: str, key: str) -> str:
+        return f"{ns}:{key}"
+
+    def _remember(self, k: str, value: Any, expires: float) -> None:
+        self._mem[k] = (value, expires)
+        self._mem.move_to_end(k)
+        while len(self._mem) > self.mem_entries:
+            self._mem.popitem(last=False)
+
+    # ── lookups ──────────────────────────────────────────────
+    def get(self, ns: str, key: str) -> Any:
+        """Cached value (None = cached "not found") or `MISS`."""
+        k, now = self._key(ns, key), time.time()
+        with self._lock:
+            if k in self._mem:
+                value, expires = self._mem[k]
+                if expires > now:
+                    self._mem.move_to_end(k)
+                    self.counts["mem_hits"] += 1
+                    self.counts["negative_hits"] += value is None
+                    count("place_cache.lookups", ns=ns, result="mem_hit")
+                    return value
+                del self._mem[k]
+            row = self._db.execute(
+                "SELECT value, expires FROM places WHERE key = ?", (k,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self.counts["expired" if row else "misses"] += 1
+                count("place_cache.lookups", ns=ns,
+                      result="expired" if row else "miss")
+                return MISS
+            value = None if row[0] is None else json.loads(row[0])
+            self._remember(k, value, row[1])
+            self.counts["disk_hits"] += 1
+            self.counts["negative_hits"] += value is None
+            count("place_cache.lookups", ns=ns, result="disk_hit")
+            return value
+
+    def put(self, ns: str, key: str, value: Any,
+            ttl_s: float | None = None) -> None:
+        k, now = self._key(ns, key), time.time()
+        if ttl_s is None:
+            ttl_s = self.negative_ttl_s if value is None else self.ttl_s
+        expires = now + ttl_s
+        blob = None if value is None else json.dumps(value)
+        with self._lock:
+            self._remember(k, value, expires)
+            self._db.execute("INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?)",
+                             (k, blob, now, expires))
+            self._db.commit()               # visible to the other workers now
+            self._puts += 1
+            if self._puts % PRUNE_EVERY == 0:
+                self._prune(now)
+
+    def get_or_fetch(self, ns: str, key: str, fetch: Callable[[], Any],
+                     errors: Tuple[type, ...] = ()) -> Any:
+        """Cached value, or `fetch()` (None = not found) stored and returned.
+        `errors` raised by `fetch` give None, remembered for `error_ttl_s`
+        only; anything else propagates and is not cached."""
+        value = self.get(ns, key)
+        if value is MISS:
+            with self._lock:
+                self.counts["fetches"] += 1
+            try:
+                with timer("place_cache.fetch", ns=ns):
+                    value = fetch()
+            except errors:
+                with self._lock:
+                    self.counts["errors"] += 1
+                count("place_cache.errors", ns=ns)
+                self.put(ns, key, None, self.error_ttl_s)
+                return None
+            self.put(ns, key, value)
+        return value
+
+    # ── maintenance ──────────────────────────────────────────
+    def _prune(self, now: float) -> None:
+        cur = self._db.execute("DELETE FROM places WHERE expires <= ?", (now,))
+        evicted = cur.rowcount
+        n = self._db.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+        if n > self.max_entries:
+            cur = self._db.execute(
+                "DELETE FROM places WHERE key IN "
+                "(SELECT key FROM places ORDER BY ts LIMIT ?)",
+                (n - self.max_entries,))
+            evicted += cur.rowcount
+        self._db.commit()
+        self.counts["evicted"] += evicted
+
+    def prune(self) -> None:
+        """Drop expired entries and trim the file to `max_entries`."""
+        with self._lock:
+            self._prune(time.time())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._db.execute("DELETE FROM places")
+            self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            c = dict(self.counts)
+        hits = c["mem_hits"] + c["disk_hits"]
+        lookups = hits + c["misses"] + c["expired"]
+        return dict(c, hits=hits, lookups=lookups,
+                    hit_rate=hits / lookups if lookups else 0.0)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_shared: PlaceCache | None = None
+_shared_lock = threading.Lock()
+
+
+def place_cache() -> PlaceCache:
+    """The process-wide cache on `CACHE_FILE`, opened on first use."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = PlaceCache()
+        return _shared
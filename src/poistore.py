@@ -0,0 +1,146 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+# ─────────────────────────────────────────────────────────────
+# Array-backed POI store
+#   Column arrays instead of a DataFrame: a float32 criteria matrix,
+#   float64 coordinates, interned category / municipality codes and a
+#   UTF-8 name table.  Saved as plain .npy files, so `open()` can
+#   memory-map a region- or country-scale catalogue and callers slice it
+#   with position arrays – only the rows actually touched get paged in.
+#
+#   python src/poistore.py data data/poi_store      (build from the CSVs)
+# ─────────────────────────────────────────────────────────────
+STORE_VERSION = 1
+CRITERIA = [f"z{i}" for i in range(1, 8)]
+_ARRAYS = ("Z", "lat", "lon", "category_codes", "municipality_codes",
+           "name_offsets", "name_blob", "categories", "municipalities")
+
+
+def _intern(values) -> tuple[np.ndarray, np.ndarray]:
+    """int32 codes (-1 = missing) + the string table they point into."""
+    codes, uniq = pd.factorize(pd.Series(values, dtype=object))
+    return codes.astype(np.int32), np.array([str(u) for u in uniq], dtype=str)
+
+
+def _name_table(names) -> tuple[np.ndarray, np.ndarray]:
+    enc = [("" if pd.isna(s) else str(s)).encode() for s in names]
+    offsets = np.zeros(len(enc) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in enc], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(enc), dtype=np.uint8)
+
+
+class PoiStore:
+    """
+    Read-only POI catalogue as column arrays.
+
+    Rows are addressed by position (0 … n-1), which doubles as the row
+    label of every frame the store hands out.
+    """
+
+    def __init__(self, Z, lat, lon, category_codes, categories,
+                 municipality_codes, municipalities, name_offsets, name_blob):
+        self.Z = Z                              # (n × 7) float32, NaN = unknown
+        self.lat, self.lon = lat, lon
+        self.category_codes, self.categories = category_codes, categories
+        self.municipality_codes = municipality_codes
+        self.municipalities = municipalities
+        self.name_offsets, self.name_blob = name_offsets, name_blob
+
+    # ── build / persist ──────────────────────────────────────
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "PoiStore":
+        Z = np.full((len(df), len(CRITERIA)), np.nan, dtype=np.float32)
+        for k, z in enumerate(CRITERIA):
+            if z in df:
+                Z[:, k] = df[z].to_numpy(dtype=np.float32, na_value=np.nan)
+        cat_codes, cats = _intern(df["category"])
+        mun_codes, muns = _intern(df["municipality"])
+        offsets, blob = _name_table(df["name"])
+        return cls(Z, df["lat"].to_numpy(dtype=float, copy=True),
+                   df["lon"].to_numpy(dtype=float, copy=True),
+                   cat_codes, cats, mun_codes, muns, offsets, blob)
+
+    def save(self, path: str) -> None:
+        """Write one `.npy` per array (plus `meta.json`) into `path`."""
+        os.makedirs(path, exist_ok=True)
+        for a in _ARRAYS:
+            np.save(os.path.join(path, f"{a}.npy"), getattr(self, a),
+                    allow_pickle=False)
+        with open(os.path.join(path, "meta.json"), "w") as fh:
+            json.dump({"version": STORE_VERSION, "n": len(self)}, fh)
+
+    @classmethod
+    def open(cls, path: str, mmap: bool = True) -> "PoiStore":
+        """Load a saved store; with `mmap` the arrays stay on disk."""
+        with open(os.path.join(path, "meta.json")) as fh:
+            meta = json.load(fh)
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"unsupported POI store version: {meta!r}")
+        arr: Dict[str, np.ndarray] = {
+            a: np.load(os.path.join(path, f"{a}.npy"), allow_pickle=False,
+                       mmap_mode="r" if mmap else None)
+            for a in _ARRAYS
+        }
+        return cls(**arr)
+
+    # ── access ───────────────────────────────────────────────
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, a).nbytes for a in _ARRAYS)
+
+    def names(self, pos) -> np.ndarray:
+        o, b = self.name_offsets, self.name_blob
+        return np.array([bytes(b[o[i]:o[i + 1]]).decode()
+                         for i in np.asarray(pos)], dtype=object)
+
+    def criteria(self, pos, z7=None) -> np.ndarray:
+        """float64 (len(pos) × 7) copy of the criteria rows, z7 optionally
+        replaced; unknown values stay NaN."""
+        X = self.Z[pos].astype(float)
+        if z7 is not None:
+            X[:, 6] = z7
+        return X
+
+    def frame(self, pos, columns: List[str] | None = None) -> pd.DataFrame:
+        """Materialise the given rows as a DataFrame labelled by position."""
+        pos = np.asarray(pos, dtype=np.int64)
+        cc, mc = self.category_codes[pos], self.municipality_codes[pos]
+        cols = {
+            "name": self.names(pos),
+            "category": pd.Categorical.from_codes(cc, self.categories),
+            "municipality": pd.Categorical.from_codes(mc, self.municipalities),
+            "lat": self.lat[pos],
+            "lon": self.lon[pos],
+        }
+        for k, z in enumerate(CRITERIA):
+            cols[z] = self.Z[pos, k]
+        df = pd.DataFrame(cols, index=pd.Index(pos))
+        return df if columns is None else df[columns]
+
+
+def build_store(data_dir: str = "data", path: str | None = None) -> PoiStore:
+    """Store of `data_dir`'s catalogue (the rows `readTourismData` gives),
+    saved to `path` (default `<data_dir>/poi_store`)."""
+    from dataloader import readTourismData
+    store = PoiStore.from_frame(readTourismData(data_dir, place_meta=False))
+    store.save(path or os.path.join(data_dir, "poi_store"))
+    return store
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Build a POI store from CSVs")
+    ap.add_argument("data", nargs="?", default="data")
+    ap.add_argument("out", nargs="?", help="default: <data>/poi_store")
+    a = ap.parse_args()
+    st = build_store(a.data, a.out)
+    print(f"{len(st)} POIs, {st.nbytes / 2**20:.1f} MiB "
+          f"→ {a.out or os.path.join(a.data, 'poi_store')}")
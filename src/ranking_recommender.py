@@ -1,44 +1,120 @@
 from __future__ import annotations
-import re, numpy as np, pandas as pd
-from typing import Dict, List
-from geopy.distance import geodesic
-import streamlit as st
-from pyDecision.algorithm import electre_iii
+import re, hashlib, threading, numpy as np, pandas as pd
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Tuple
+from electre import ElectrePartials, electre_iii_ranks
+from filter_index import PrefilterIndex
+from lazy import lazy_module
+from metrics import count, timed, timer
+from poistore import PoiStore
+from placecache import place_cache
+from reccache import params_key
+from taxonomy import (CLASSES, FLAGS_COL, CategoryTaxonomy, category_codes,
+                      decode, load_taxonomy)
 from userprof import Profile
 
+# heavy / UI-only dependencies load on first use (headless callers –
+# service, batch, bench – never touch them)
+st       = lazy_module("streamlit")
+requests = lazy_module("requests")
+
 # ─────────────────────────────────────────────────────────────
 # 0 ▸ Regex helpers
 # ─────────────────────────────────────────────────────────────
-_CAT_RX = {
-    "culture":   re.compile(r"(culture|museum|heritage|art|history)",  re.I),
-    "nature":    re.compile(r"(nature|park|beach|forest|garden|trail)", re.I),
-    "nightlife": re.compile(r"(night|club|bar|pub|music)",             re.I),
-}
 _DIGITS = re.compile(r"\d+")
 
 # ─────────────────────────────────────────────────────────────
 # 1 ▸ z7 – individual & group
 # ─────────────────────────────────────────────────────────────
+_CAT_CLASSES = CLASSES
+_PREF_KEYS   = _CAT_CLASSES + ("local", "co2")
+
 def _pref_score(row, p: Profile) -> float:
     w = dict(culture=p.culture, nature=p.nature, nightlife=p.nlife,
              local=p.local_imp, co2=p.co2)
     denom = sum(w.values()) or 1
+    cls = (decode(row[FLAGS_COL])[0] if FLAGS_COL in row
+           else load_taxonomy().table([row["category"]])[0])
     s = {
-        "culture":   bool(_CAT_RX["culture"].search(str(row["category"]))),
-        "nature":    bool(_CAT_RX["nature"].search(str(row["category"]))),
-        "nightlife": bool(_CAT_RX["nightlife"].search(str(row["category"]))),
+        "culture":   bool(cls[0]),
+        "nature":    bool(cls[1]),
+        "nightlife": bool(cls[2]),
         "local":     0.5 * (row.get("z4", .5) + (1 - row.get("z5", .5))),
         "co2":       1 - row.get("z1", .5),
     }
     return sum(w[k] * s[k] for k in w) / denom
 
+def category_matrix(df: pd.DataFrame) -> np.ndarray:
+    """Boolean (POIs × 3) culture/nature/nightlife membership.
+
+    Read off the `category_flags` column set by `CategoryTaxonomy.annotate`;
+    un-annotated frames are classified once per *distinct* category, with
+    the same overrides (`load_taxonomy`).
+    """
+    if FLAGS_COL in df:
+        return decode(df[FLAGS_COL].to_numpy())
+    codes, cats = category_codes(df)
+    table = np.vstack([load_taxonomy().table(cats),
+                       np.zeros((1, 3), dtype=bool)])    # code -1 → no class
+    return table[codes]
+
+def _pref_matrix(cat: np.ndarray, z1, z4, z5) -> np.ndarray:
+    S = np.empty((len(cat), len(_PREF_KEYS)))
+    S[:, :3] = cat
+    S[:, 3]  = 0.5 * (z4 + (1 - z5))
+    S[:, 4]  = 1 - z1
+    return S
+
+def pref_features(df: pd.DataFrame) -> np.ndarray:
+    """(POIs × 5) feature matrix in `_PREF_KEYS` order – build once per dataset."""
+    def col(z):
+        return np.broadcast_to(np.asarray(df.get(z, .5), dtype=float), len(df))
+    return _pref_matrix(category_matrix(df), col("z1"), col("z4"), col("z5"))
+
+def store_features(store: PoiStore, pos: np.ndarray,
+                   taxonomy: CategoryTaxonomy | None = None) -> np.ndarray:
+    """`pref_features` for the store rows at `pos` (no frame involved)."""
+    taxonomy = taxonomy or load_taxonomy()
+    table = np.vstack([taxonomy.table(store.categories),
+                       np.zeros((1, 3), dtype=bool)])    # code -1 → no class
+    X = store.criteria(pos)
+    return _pref_matrix(table[store.category_codes[pos]],
+                        X[:, 0], X[:, 3], X[:, 4])
+
+def z7_batch(df: pd.DataFrame, profiles: List[Profile],
+             feats: np.ndarray | None = None) -> np.ndarray:
+    """z7 for every profile × POI in one batched product → (profiles × POIs)."""
+    if feats is None:
+        feats = pref_features(df)
+    Wp = np.array([[p.culture, p.nature, p.nlife, p.local_imp, p.co2]
+                   for p in profiles], dtype=float).reshape(-1, len(_PREF_KEYS))
+    denom = Wp.sum(1)
+    denom[denom == 0] = 1
+    # rank-1 updates in `_PREF_KEYS` order == Wp @ feats.T, but with the
+    # same summation order as `_pref_score`, so scores match bit-for-bit
+    acc = np.zeros((len(Wp), len(feats)))
+    for k in range(len(_PREF_KEYS)):
+        acc += np.outer(Wp[:, k], feats[:, k])
+    return acc / denom[:, None]
+
 def z7_individual(df: pd.DataFrame, p: Profile) -> pd.Series:
-    return df.apply(lambda r: _pref_score(r, p), axis=1).rename("z7")
+    return pd.Series(z7_batch(df, [p])[0], index=df.index, name="z7")
 
-def z7_group(indiv: List[pd.Series], eta: float = .3) -> pd.Series:
-    mat = np.vstack([s.values for s in indiv])
+def z7_group(indiv, eta: float = .3, index=None) -> pd.Series:
+    """Soft-min aggregation of per-member z7.
+
+    `indiv` is either a list of Series or the (profiles × POIs) array
+    returned by `z7_batch` (then `index` labels the POIs).
+    """
+    if isinstance(indiv, np.ndarray):
+        mat = indiv
+    else:
+        mat = np.vstack([s.values for s in indiv])
+        index = indiv[0].index if index is None else index
     return pd.Series(eta * mat.min(0) + (1 - eta) * mat.mean(0),
-                     index=indiv[0].index, name="z7")
+                     index=index, name="z7")
 
 # ─────────────────────────────────────────────────────────────
 # 2 ▸ ELECTRE-III-H + 9-item kernel + LSP
@@ -48,105 +124,467 @@ CRIT_NAMES = ["CO₂", "Overtourism", "Seasonality",
               "Local-eco", "Cultural fragility",
               "Accessibility", "Pref-fit"]
 
-# default global weight vector – overwritten from main.py via set_mcda_weights
+# default parameters – sessions pass their own `RankingConfig` instead
+# of mutating these
 W = np.array([0.08, 0.12, 0.05, 0.10, 0.10, 0.05, 0.50])
 Q = np.full(7, .05);  P = np.full(7, .20);  V = np.full(7, .50)
 RHO        = 0.5
 KERNEL_SZ  = 9
 
-def _electre_rank(df: pd.DataFrame) -> pd.Series:
-    M = df[CRITERIA].astype(float).to_numpy()
+@dataclass(frozen=True, eq=False)
+class RankingConfig:
+    """Immutable ELECTRE/LSP parameters, safe to share across threads."""
+    W: np.ndarray = field(default_factory=lambda: W.copy())
+    Q: np.ndarray = field(default_factory=lambda: Q.copy())
+    P: np.ndarray = field(default_factory=lambda: P.copy())
+    V: np.ndarray = field(default_factory=lambda: V.copy())
+    RHO: float = RHO
+    KERNEL_SZ: int = KERNEL_SZ
+
+    def __post_init__(self):
+        for name in ("W", "Q", "P", "V"):
+            arr = np.array(getattr(self, name), dtype=float)
+            arr.setflags(write=False)
+            object.__setattr__(self, name, arr)
+
+    def with_weights(self, W) -> "RankingConfig":
+        return replace(self, W=W)
+
+    def key(self) -> tuple:
+        return params_key(self.W, self.Q, self.P, self.V,
+                          RHO=self.RHO, KERNEL_SZ=self.KERNEL_SZ)
+
+DEFAULT_CONFIG = RankingConfig()
+
+# "numpy" → in-project vectorised engine; "pydecision" → reference implementation
+ELECTRE_BACKEND = "numpy"
+
+def _benefit(X: np.ndarray) -> np.ndarray:
+    M = np.array(X, dtype=float)
     M[:, [0, 1, 4]] = 1 - M[:, [0, 1, 4]]          # cost → benefit
-    _, _, rank_D, *_ = electre_iii(M, P=P, Q=Q, V=V, W=W, graph=False)
+    return M
+
+def _benefit_matrix(df: pd.DataFrame) -> np.ndarray:
+    return _benefit(df[CRITERIA].to_numpy(dtype=float))
+
+def _lsp_terms(X: np.ndarray, cfg: RankingConfig) -> np.ndarray:
+    """Per-criterion LSP terms (W/ΣW)·x^ρ of every row of X."""
+    return (cfg.W / cfg.W.sum()) * (X ** cfg.RHO)
 
-    rmap: Dict[int, int] = {}
+@timed("lsp")
+def _lsp_utility(X, cfg: RankingConfig):
+    return _lsp_terms(X, cfg).sum(1) ** (1 / cfg.RHO)
+
+def _electre_rank_pydecision(M: np.ndarray, cfg: RankingConfig) -> np.ndarray:
+    from pyDecision.algorithm import electre_iii     # ≈ 3 s to import
+    _, _, rank_D, *_ = electre_iii(M, P=cfg.P, Q=cfg.Q, V=cfg.V, W=cfg.W,
+                                   graph=False)
+    ranks = np.zeros(len(M), dtype=int)
     for pos, block in enumerate(rank_D, 1):         # descending
         for tok in block.split(";"):
             if (m := _DIGITS.search(tok)):
-                rmap[df.index[int(m.group()) - 1]] = pos
-    return pd.Series(rmap, name="electre_rank", dtype=float)
+                ranks[int(m.group()) - 1] = pos
+    return ranks
+
+# W-independent pairwise tensors of recent candidate sets, so a weight-
+# slider move only redoes aggregation + distillation.  Opt-in
+# (`reuse_partials=True`): building them costs more than a plain ELECTRE
+# run, which is all one-shot callers (API, batch, top-k) ever need.
+# 2 × 7 × n² float64 each – ≈ 250 MB at n = 1500; the cache holds at
+# most PARTIALS_MAX_BYTES in total, larger sets are never cached.
+PARTIALS_MAX_BYTES = 256 * 2**20
+_partials: "OrderedDict[str, Tuple[Future, int]]" = OrderedDict()
+_partials_lock = threading.Lock()
+
+def _partials_nbytes(M: np.ndarray) -> int:
+    n, m = M.shape
+    return 2 * m * n * n * 8
+
+def _electre_partials(M: np.ndarray, cfg: RankingConfig) -> ElectrePartials | None:
+    size = _partials_nbytes(M)
+    if size > PARTIALS_MAX_BYTES:
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    for a in (np.ascontiguousarray(M), cfg.Q, cfg.P, cfg.V):
+        h.update(np.asarray(a, dtype=float).tobytes())
+    h.update(str(M.shape).encode())
+    key = h.hexdigest()
+    # one Future per key: concurrent configs on one candidate set wait
+    # for the first build, other candidate sets build in parallel
+    with _partials_lock:
+        entry = _partials.get(key)
+        if entry is not None:
+            _partials.move_to_end(key)
+            return entry[0].result()
+        fut: Future = Future()
+        _partials[key] = (fut, size)
+        total = sum(sz for _, sz in _partials.values())
+        while total > PARTIALS_MAX_BYTES:           # LRU, never the new key
+            _, (_, sz) = _partials.popitem(last=False)
+            total -= sz
+    try:
+        fut.set_result(ElectrePartials(M, cfg.Q, cfg.P, cfg.V))
+    except BaseException as e:
+        fut.set_exception(e)
+        with _partials_lock:
+            _partials.pop(key, None)
+        raise
+    return fut.result()
+
+def _electre_ranks(M: np.ndarray, backend: str | None = None,
+                   cfg: RankingConfig = DEFAULT_CONFIG,
+                   k: int | None = None, groups=None,
+                   reuse_partials: bool = False) -> np.ndarray:
+    """1-based ELECTRE classes; with `k`, only the leading classes that
+    cover `k` distinct `groups` (0 elsewhere – numpy backend only).
+    `reuse_partials` caches the W-independent tensors for later calls
+    with other weights on the same candidates."""
+    backend = backend or ELECTRE_BACKEND
+    if backend not in ("numpy", "pydecision"):
+        raise ValueError(f"unknown ELECTRE backend: {backend!r}")
+    with timer("electre", backend=backend, top_k=k is not None):
+        if backend == "pydecision":
+            return _electre_rank_pydecision(M, cfg)
+        part = _electre_partials(M, cfg) if reuse_partials else None
+        return (part.ranks(cfg.W, k=k, groups=groups) if part is not None
+                else electre_iii_ranks(M, P=cfg.P, Q=cfg.Q, V=cfg.V, W=cfg.W,
+                                       k=k, groups=groups))
+
+def _electre_rank(df: pd.DataFrame, backend: str | None = None,
+                  cfg: RankingConfig = DEFAULT_CONFIG) -> pd.Series:
+    return pd.Series(_electre_ranks(_benefit_matrix(df), backend, cfg),
+                     index=df.index, name="electre_rank", dtype=float)
+
+# ─────────────────────────────────────────────────────────────
+# 2b ▸ Candidate pruning (optional, before the quadratic ELECTRE step)
+# ─────────────────────────────────────────────────────────────
+# keep at least PRUNE_FACTOR × KERNEL_SZ candidates.  ELECTRE ranks are
+# relative to the candidate set, so the screen is not exact: at 20 the
+# kernel recall is 1.0 on data/ and ≈ 0.97 (min 0.89) on synthetic
+# catalogues, at 5 only ≈ 0.89 (min 0.67) – see tests/test_prune.py
+PRUNE_FACTOR = 20
+
+def _nondominated(M: np.ndarray, chunk: int = 512) -> np.ndarray:
+    """Mask of rows of M not Pareto-dominated by any other row (benefit)."""
+    dominated = np.zeros(len(M), dtype=bool)
+    for r0 in range(0, len(M), chunk):
+        blk = M[r0:r0 + chunk, None, :]              # candidates b
+        geq = (M[None, :, :] >= blk).all(2)          # a ≥ b everywhere
+        gt  = (M[None, :, :] >  blk).any(2)          # … and better once
+        dominated[r0:r0 + chunk] = (geq & gt).any(1)
+    return ~dominated
+
+def pareto_layers(M: np.ndarray, min_keep: int) -> np.ndarray:
+    """Peel non-dominated fronts until ≥ `min_keep` rows are kept."""
+    keep = np.zeros(len(M), dtype=bool)
+    rest = np.arange(len(M))
+    while rest.size and keep.sum() < min_keep:
+        front = _nondominated(M[rest])
+        keep[rest[front]] = True
+        rest = rest[~front]
+    return keep
+
+@timed("prune")
+def _prune(X: np.ndarray, mode: str, factor: int,
+           cfg: RankingConfig = DEFAULT_CONFIG) -> np.ndarray:
+    """Positions of the rows of X (z1…z7, no NaN) that go on to ELECTRE."""
+    target = factor * cfg.KERNEL_SZ
+    if len(X) <= target:
+        return np.arange(len(X))
+    if mode == "pareto":
+        return np.flatnonzero(pareto_layers(_benefit(X), target))
+    raise ValueError(f"unknown prune mode: {mode!r}")
+
+def _kernel_index(rank: np.ndarray, names, k: int) -> np.ndarray:
+    """Rows of the k best ranks with distinct names (ties and unranked
+    rows in dataset order).  `names(rows)` is asked for a few rows at a
+    time, so only the leading ranks are ever decoded."""
+    order = np.argsort(rank, kind="stable")         # NaN (pruned) last
+    keep, seen = [], set()
+    for s in range(0, len(order), 4 * k):
+        rows = order[s:s + 4 * k]
+        for i, name in zip(rows, names(rows)):
+            if name not in seen:
+                seen.add(name)
+                keep.append(i)
+                if len(keep) == k:
+                    return np.array(keep)
+    return np.array(keep, dtype=int)
+
+def _rank_arrays(X: np.ndarray, names, prune: str | None,
+                 prune_factor: int, cfg: RankingConfig,
+                 reuse_partials: bool = False):
+    """
+    ELECTRE rank (NaN where pruned) and LSP utility (NaN outside the
+    kernel) for every row of the criteria matrix X (z1…z7, no NaN).
+    `names` maps row numbers to POI names (see `_kernel_index`).
+    """
+    cand = (np.arange(len(X)) if prune is None
+            else _prune(X, prune, prune_factor, cfg))
+    rank = np.full(len(X), np.nan)
+    rank[cand] = _electre_ranks(_benefit(X[cand]), cfg=cfg,
+                                reuse_partials=reuse_partials)
 
-def compute_ranking(df: pd.DataFrame) -> pd.DataFrame:
+    # ELECTRE kernel (9 best ranks)
+    kernel = _kernel_index(rank, names, cfg.KERNEL_SZ)
+    U = np.full(len(X), np.nan)
+    U[kernel] = _lsp_utility(X[kernel], cfg)
+    return rank, U
+
+@timed("compute_ranking")
+def compute_ranking(df: pd.DataFrame, prune: str | None = None,
+                    prune_factor: int = PRUNE_FACTOR,
+                    cfg: RankingConfig = DEFAULT_CONFIG,
+                    reuse_partials: bool = False) -> pd.DataFrame:
+    """
+    ELECTRE rank + LSP utility on the 9-item kernel.
+
+    `prune="pareto"` keeps whole non-dominated fronts over z1…z7 (at least
+    prune_factor × KERNEL_SZ rows) before ELECTRE.  Pruned rows get no
+    ELECTRE rank – use `prune_recall` to check how much of the kernel
+    survives.
+    `reuse_partials` is for callers that re-rank the same rows under
+    other weights (see `_electre_ranks`).
+    """
     df = df.copy()
     # guarantee full  z1…z7  coverage
     for z in CRITERIA:
         df[z] = df.get(z, .5).fillna(.5)
 
-    df["electre_rank"] = _electre_rank(df)
-
-    # ELECTRE kernel (9 best ranks)
-    kernel_idx = (
-        df.sort_values("electre_rank")
-          .drop_duplicates(subset="name", keep="first")
-          .head(KERNEL_SZ)
-          .index
-    )
-    util = ((W / W.sum()) * (df.loc[kernel_idx, CRITERIA] ** RHO)).sum(1) ** (1 / RHO)
-    df["U_LSP"] = np.nan
-    df.loc[kernel_idx, "U_LSP"] = util
-
+    names = df["name"].to_numpy()
+    df["electre_rank"], df["U_LSP"] = _rank_arrays(
+        df[CRITERIA].to_numpy(dtype=float), lambda rows: names[rows],
+        prune, prune_factor, cfg, reuse_partials)
     return df.drop_duplicates("name", keep="first")
 
+def prune_recall(df: pd.DataFrame, prune: str = "pareto",
+                 prune_factor: int = PRUNE_FACTOR,
+                 cfg: RankingConfig = DEFAULT_CONFIG) -> float:
+    """Share of the unpruned kernel that the pruned run still returns."""
+    def kernel(r):
+        return set(r.loc[r["U_LSP"].notna(), "name"])
+    full = kernel(compute_ranking(df, cfg=cfg))
+    pruned = kernel(compute_ranking(df, prune, prune_factor, cfg))
+    return len(full & pruned) / (len(full) or 1)
+
 # ─────────────────────────────────────────────────────────────
 # 3 ▸ Pre-filters
 # ─────────────────────────────────────────────────────────────
-def _prefilter(df: pd.DataFrame, p: Profile) -> pd.DataFrame:
-    sub = df.copy()
-    if p.avoid:
-        sub = sub[~sub["category"].isin(p.avoid)]
-    if p.location and p.max_disp:
-        sub["distance_km"] = sub.apply(
-            lambda r: geodesic(p.location, (r["lat"], r["lon"])).km, axis=1)
-        sub = sub[sub["distance_km"] <= p.max_disp]
-    if p.mobility_constr:
-        sub = sub[sub["z6"] >= .5]
+# "intersection" → every member's constraints; "union" → anyone's
+GROUP_MODE = "intersection"
+
+def group_prefilter(df: pd.DataFrame, profiles: List[Profile],
+                    index: PrefilterIndex | None = None,
+                    mode: str = GROUP_MODE, exact: bool = True) -> pd.DataFrame:
+    """
+    Apply every member's `avoid`, radius and mobility constraints in one
+    pass over the bitmask index.  `distance_km` is the farthest member's.
+    `index` must be built from `df` (or a frame `df` is a row subset of).
+    """
+    with timer("prefilter", mode=mode):
+        index = index or PrefilterIndex(df)
+        keep, far = index.mask(profiles, mode, exact)
+        sub = df[df.index.isin(index.labels[keep])].copy()
+        if far is not None:
+            sub["distance_km"] = pd.Series(far, index=index.labels).reindex(sub.index)
     return sub
 
+def _prefilter(df: pd.DataFrame, p: Profile,
+               index: PrefilterIndex | None = None,
+               exact: bool = True) -> pd.DataFrame:
+    return group_prefilter(df, [p], index, exact=exact)
+
 # ─────────────────────────────────────────────────────────────
 # 4 ▸ API – group only (spec requirement)
 # ─────────────────────────────────────────────────────────────
-def runRecommender(df0: pd.DataFrame,
-                   profiles: Dict[int, Profile]) -> Dict[str, pd.DataFrame]:
-    base = _prefilter(df0, next(iter(profiles.values()))).copy()
-    if len(profiles) == 1:
-        base["z7"] = z7_individual(base, next(iter(profiles.values())))
-    else:
-        indiv = [z7_individual(base, p) for p in profiles.values()]
-        base["z7"] = z7_group(indiv)
-    ranked = compute_ranking(base)
+def ranking_key(cfg: RankingConfig = DEFAULT_CONFIG,
+                mode: str = GROUP_MODE) -> tuple:
+    """Every knob besides data and profiles that shapes `runRecommender`."""
+    return cfg.key() + (("GROUP_MODE", mode),)
+
+def _candidates(df0: pd.DataFrame, profiles: Dict[int, Profile],
+                index: PrefilterIndex | None, mode: str) -> pd.DataFrame:
+    """Prefiltered rows + group z7 – everything that ignores the config."""
+    base = group_prefilter(df0, list(profiles.values()), index, mode)
+    with timer("z7"):
+        Z = z7_batch(base, list(profiles.values()))
+        if len(profiles) == 1:
+            base["z7"] = Z[0]
+        else:
+            base["z7"] = z7_group(Z, index=base.index)
+    return base
+
+def _kernel_rows(ranked: pd.DataFrame) -> pd.DataFrame:
     # keep only the 9-item kernel for display
-    kernel = ranked.loc[ranked["U_LSP"].notna()].sort_values(
+    return ranked.loc[ranked["U_LSP"].notna()].sort_values(
         ["U_LSP", "electre_rank"], ascending=[False, True])
-    return {"Group": kernel}
+
+def _kernel(base: pd.DataFrame, cfg: RankingConfig,
+            reuse_partials: bool = False) -> Dict[str, pd.DataFrame]:
+    return {"Group": _kernel_rows(compute_ranking(
+        base, cfg=cfg, reuse_partials=reuse_partials))}
+
+@timed("run_recommender")
+def runRecommender(df0: pd.DataFrame,
+                   profiles: Dict[int, Profile],
+                   index: PrefilterIndex | None = None,
+                   mode: str = GROUP_MODE,
+                   cfg: RankingConfig = DEFAULT_CONFIG) -> Dict[str, pd.DataFrame]:
+    return _kernel(_candidates(df0, profiles, index, mode), cfg)
+
+@timed("rank_store")
+def rank_store(store: PoiStore, profiles: Dict[int, Profile],
+               index: PrefilterIndex | None = None,
+               mode: str = GROUP_MODE, cfg: RankingConfig = DEFAULT_CONFIG,
+               prune: str | None = None,
+               prune_factor: int = PRUNE_FACTOR,
+               taxonomy: CategoryTaxonomy | None = None
+               ) -> Dict[str, pd.DataFrame]:
+    """
+    `runRecommender` over a `PoiStore`.  Prefilter, z7 and ELECTRE run on
+    position arrays into the (possibly memory-mapped) store; only the
+    candidates' criteria are copied and only the kernel becomes a frame.
+    `index` must be `PrefilterIndex.from_store(store)`; `taxonomy`
+    defaults to `load_taxonomy()`, like un-annotated frames.
+    """
+    members = list(profiles.values())
+    index = index or PrefilterIndex.from_store(store)
+    with timer("prefilter", mode=mode):
+        keep, far = index.mask(members, mode)
+        pos = np.flatnonzero(keep)
+    with timer("z7"):
+        Z = z7_batch(None, members, store_features(store, pos, taxonomy))
+        z7 = Z[0] if len(members) == 1 else z7_group(Z).to_numpy()
+
+    X = store.criteria(pos, z7)
+    X[np.isnan(X)] = .5                             # full z1…z7 coverage
+    # names are decoded for the leading ranks only, not every candidate
+    rank, U = _rank_arrays(X, lambda rows: store.names(pos[rows]), prune,
+                           prune_factor, cfg)
+
+    k = np.flatnonzero(~np.isnan(U))
+    ranked = store.frame(pos[k])
+    ranked[CRITERIA] = X[k]
+    if far is not None:
+        ranked["distance_km"] = far[pos[k]]
+    ranked["electre_rank"], ranked["U_LSP"] = rank[k], U[k]
+    return {"Group": _kernel_rows(ranked)}
+
+@timed("rank_top_k")
+def rank_top_k(df0: pd.DataFrame, profiles: Dict[int, Profile],
+               k: int | None = None, index: PrefilterIndex | None = None,
+               mode: str = GROUP_MODE, cfg: RankingConfig = DEFAULT_CONFIG,
+               prune: str | None = None,
+               prune_factor: int = PRUNE_FACTOR,
+               reuse_partials: bool = False) -> Dict[str, pd.DataFrame]:
+    """
+    Only the k best POIs (default `cfg.KERNEL_SZ`), ordered like
+    `runRecommender`'s kernel.
+
+    ELECTRE distillation stops once its leading classes hold k distinct
+    names, and only those rows are sorted; nothing else gets a rank.
+    `prune="pareto"` screens the candidates as in `compute_ranking`.
+    POIs tied in the last class are taken in dataset order.
+    `reuse_partials=True` suits the weight sliders (see `_electre_ranks`).
+    """
+    k = k or cfg.KERNEL_SZ
+    cfg_k = replace(cfg, KERNEL_SZ=k)
+    base = _candidates(df0, profiles, index, mode)
+    X = base.reindex(columns=CRITERIA).to_numpy(dtype=float)
+    X[np.isnan(X)] = .5                             # full z1…z7 coverage
+    names = base["name"].to_numpy()
+
+    cand = (np.arange(len(X)) if prune is None
+            else np.sort(_prune(X, prune, prune_factor, cfg_k)))
+    groups = pd.factorize(names[cand])[0]
+    rank = _electre_ranks(_benefit(X[cand]), cfg=cfg, k=k, groups=groups,
+                          reuse_partials=reuse_partials)
+    hit = np.flatnonzero(rank > 0)
+    order = hit[np.argsort(rank[hit], kind="stable")]
+    order = order[~pd.Series(names[cand][order]).duplicated().to_numpy()][:k]
+
+    pos = cand[order]
+    top = base.iloc[pos].copy()
+    top[CRITERIA] = X[pos]
+    top["electre_rank"] = rank[order].astype(float)
+    top["U_LSP"] = _lsp_utility(X[pos], cfg)
+    return {"Group": _kernel_rows(top)}
+
+_worker_base: pd.DataFrame | None = None
+
+def _init_worker(base: pd.DataFrame) -> None:
+    global _worker_base
+    _worker_base = base
+
+def _worker_kernel(cfg: RankingConfig) -> Dict[str, pd.DataFrame]:
+    return _kernel(_worker_base, cfg)
+
+def rank_many(df0: pd.DataFrame, profiles: Dict[int, Profile],
+              configs: List[RankingConfig],
+              index: PrefilterIndex | None = None,
+              mode: str = GROUP_MODE, executor: str = "thread",
+              max_workers: int | None = None) -> List[Dict[str, pd.DataFrame]]:
+    """
+    Rank one group under many weight/threshold scenarios concurrently.
+
+    Prefilter and z7 run once; each config only redoes ELECTRE + LSP, on a
+    thread pool (shares the W-independent ELECTRE tensors) or a process
+    pool (`executor="process"`, candidates shipped once per worker).
+    """
+    base = _candidates(df0, profiles, index, mode)
+    if executor == "thread":
+        with ThreadPoolExecutor(max_workers) as pool:
+            return list(pool.map(lambda c: _kernel(base, c, True), configs))
+    if executor == "process":
+        with ProcessPoolExecutor(max_workers, initializer=_init_worker,
+                                 initargs=(base,)) as pool:
+            return list(pool.map(_worker_kernel, configs))
+    raise ValueError(f"unknown executor: {executor!r}")
 
 # ─────────────────────────────────────────────────────────────
 # 5 ▸ Streamlit presenter – card grid (no filters here)
 # ─────────────────────────────────────────────────────────────
 
 # ─────────  add these imports  ─────────
-import os, requests, json, re, numpy as np, pandas as pd   # ← keep existing
+import os, json, re, numpy as np, pandas as pd   # ← keep existing
 from typing import Dict, List
 
 # ─── Google Places v1 constants ─────────────────────────────────────────────
 GOOGLE_KEY   = os.getenv("GOOGLE_MAPS_KEY")
-TXT_ENDPOINT   = "https://places.googleapis.com/v1/places:searchText"
+TXT_ENDPOINT   = os.getenv("PLACES_TEXT_ENDPOINT",
+                           "https://places.googleapis.com/v1/places:searchText")
 DETAILS_V1     = "https://places.googleapis.com/v1"
 PHOTO_V1       = "https://places.googleapis.com/v1"
-_photo_cache:   dict[str | None]        = {}
-_place_cache:   dict[str, dict]         = {}      # id  -> minimal details
-_text_cache:    dict[str, dict]         = {}      # "name|town" -> textSearch
-
-def _text_search(name: str, town: str) -> dict | None:
-    """1-shot text search → returns the *first* place dict (cacheable)."""
-    key = f"{name}|{town}"
-    if key in _text_cache:
-        return _text_cache[key]
-
-    if not GOOGLE_KEY:
-        print("NO-KEY : set GOOGLE_MAPS_KEY")
-        _text_cache[key] = None
-        return None
 
+# card metadata prefetch: lookups run on a shared pool over one pooled
+# keep-alive session; whatever misses the page deadline is drawn with the
+# placeholder and lands in the place cache for the next render
+PREFETCH_WORKERS    = 8
+PREFETCH_DEADLINE_S = 2.5
+_NO_META = dict(address=None, rating=None, reviews=None,
+                maps_uri=None, photo=None)
+_http_session: requests.Session | None = None
+_prefetch_pool: ThreadPoolExecutor | None = None
+_inflight: Dict[tuple, Future] = {}
+_http_lock = threading.Lock()
+
+def _http() -> requests.Session:
+    global _http_session
+    with _http_lock:
+        if _http_session is None:
+            _http_session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=PREFETCH_WORKERS)
+            _http_session.mount("https://", adapter)
+            _http_session.mount("http://", adapter)
+        return _http_session
+
+def fetch_text_search(name: str, town: str,
+                      strict: bool = False) -> dict | None:
+    """Uncached text search.  None = not found; request failures also give
+    None unless `strict`, which re-raises them (bulk jobs must not record
+    an outage as "no such place")."""
+    key  = f"{name}|{town}"
     body = {"textQuery": f"{name} {town}", "maxResultCount": 1,
             "languageCode": "en"}
     hdr  = {"Content-Type": "application/json",
@@ -155,103 +593,129 @@ def _text_search(name: str, town: str) -> dict | None:
                 "places.id,places.displayName,places.formattedAddress,"
                 "places.location,places.googleMapsUri,places.rating,"
                 "places.userRatingCount,places.photos"}
-    r = requests.post(TXT_ENDPOINT, headers=hdr, json=body, timeout=6)
+    try:
+        with timer("google.text_search"):
+            r = _http().post(TXT_ENDPOINT, headers=hdr, json=body, timeout=6)
+    except requests.RequestException as e:
+        count("google.api_calls", api="text_search", status="error")
+        print("SEARCH ✗", key, repr(e))
+        if strict:
+            raise
+        return None
+    count("google.api_calls", api="text_search", status=r.status_code)
     if r.status_code != 200:
         print("SEARCH ✗", key, r.status_code, r.text[:120])
-        _text_cache[key] = None
+        if strict:
+            r.raise_for_status()
         return None
 
-    place = r.json().get("places", [{}])[0]
-    _text_cache[key] = place or None
+    place = (r.json().get("places") or [{}])[0]
     print("SEARCH ✓", key)
     return place or None
 
+def _text_search(name: str, town: str) -> dict | None:
+    """1-shot text search → the *first* place dict, via the shared cache."""
+    if not GOOGLE_KEY:
+        print("NO-KEY : set GOOGLE_MAPS_KEY")
+        return None
+    # failures raise, so the cache keeps them for a minute, not 6 h
+    return place_cache().get_or_fetch(
+        "text", f"{name}|{town}", lambda: fetch_text_search(name, town, True),
+        errors=(requests.RequestException,))
+
+def _photo_url(place: dict) -> str | None:
+    """Signed /media URL (≤ 400 px) of the place's first photo."""
+    if not place.get("photos"):
+        return None
+    photo_name = place["photos"][0]["name"]          # places/…/photos/…
+    return (f"{PHOTO_V1}/{photo_name}/media"
+            f"?maxHeightPx=400&maxWidthPx=400&key={GOOGLE_KEY}")
+
 
 def get_place_meta(name: str, town: str) -> dict:
     """
     Return a minimal dict with:
-        id, address, rating, reviews, maps_uri, photo_url (≤ 400 px).
+        address, rating, reviews, maps_uri, photo (≤ 400 px URL).
     Any missing field is set to None.
     """
     place = _text_search(name, town)
     if not place:                         # graceful fallback
-        return dict(address=None, rating=None, reviews=None,
-                    maps_uri=None, photo=None)
-
-    pid        = place["id"]
-    maps_uri   = place.get("googleMapsUri")
-    rating     = place.get("rating")
-    reviews    = place.get("userRatingCount")
-    address    = place.get("formattedAddress")
-
-    # ---- photo (first one) -------------------------------------------------
-    photo_url = None
-    if place.get("photos"):
-        photo_name = place["photos"][0]["name"]          # places/…/photos/…
-        photo_url  = (
-            f"{PHOTO_V1}/{photo_name}/media"
-            f"?maxHeightPx=400&maxWidthPx=400&key={GOOGLE_KEY}"
-        )
-
-    _place_cache[pid] = dict(address=address, rating=rating, reviews=reviews,
-                             maps_uri=maps_uri, photo=photo_url)
-    return _place_cache[pid]
+        return dict(_NO_META)
+
+    return dict(address=place.get("formattedAddress"),
+                rating=place.get("rating"),
+                reviews=place.get("userRatingCount"),
+                maps_uri=place.get("googleMapsUri"),
+                photo=_photo_url(place))
 
 def get_photo_url(name: str, town: str) -> str | None:
     """
     Return a signed /media photo URL (≤400 px) or None.
 
-    • uses *text search v1*  → places[0].photos[0].name
+    • uses *text search v1*  → places[0].photos[0].name (shared cache)
     • builds the /media URL exactly as the Google “Place Photos (New)” guide
     """
-    if not GOOGLE_KEY:
-        print("NO-KEY        – set GOOGLE_MAPS_KEY env-var")
-        return None
-
-    cache_key = f"{name}|{town}"
-    if cache_key in _photo_cache:
-        return _photo_cache[cache_key]
+    place = _text_search(name, town)
+    return _photo_url(place) if place else None
 
-    # 1️⃣   v1 text-search  ---------------------------------------------------
-    body = {
-        "textQuery": f"{name} {town}",
-        "maxResultCount": 1,
-        "languageCode": "en"
-    }
-    hdr  = {
-        "Content-Type":      "application/json",
-        "X-Goog-Api-Key":    GOOGLE_KEY,
-        # field mask MUST include 'places.photos' or the array is omitted
-        "X-Goog-FieldMask":  "places.id,places.displayName,places.photos"
-    }
 
-    try:
-        r = requests.post(TXT_ENDPOINT, headers=hdr, json=body, timeout=6)
-        if r.status_code != 200:
-            print("TEXT HTTP✗  ", cache_key, r.status_code, r.text)
-            _photo_cache[cache_key] = None
-            return None
-        data = r.json()
-        photos = data["places"][0]["photos"]
-        photo_name = photos[0]["name"]         # places/…/photos/…
-    except Exception as e:
-        print("TEXT PARSE✗ ", cache_key, repr(e))
-        _photo_cache[cache_key] = None
+def local_place_meta(poi: pd.Series) -> dict | None:
+    """Card metadata from the offline `place_*` columns (see place_meta.py);
+    None when the POI was never resolved offline."""
+    if pd.isna(poi.get("place_fetched", np.nan)):
         return None
+    def val(c):
+        v = poi.get(c)
+        return None if pd.isna(v) else v
+    if val("place_id") is None:
+        return dict(_NO_META)
+    reviews, photo = val("place_reviews"), val("place_photo")
+    return dict(address=val("place_address"), rating=val("place_rating"),
+                reviews=None if reviews is None else int(reviews),
+                maps_uri=val("place_maps_uri"),
+                photo=(_photo_url({"photos": [{"name": photo}]})
+                       if photo and GOOGLE_KEY else None))
+
+def prefetch_place_meta(pois, deadline_s: float = PREFETCH_DEADLINE_S
+                        ) -> Dict[tuple, dict]:
+    """
+    `get_place_meta` for every (name, town) pair concurrently.
 
-    # 2️⃣   build /media URL  -------------------------------------------------
-    url = (
-        f"{PHOTO_V1}/{photo_name}/media"
-        f"?maxHeightPx=400&maxWidthPx=400&key={GOOGLE_KEY}"
-    )
-    print("PHOTO✓       ", cache_key)          # success
-    _photo_cache[cache_key] = url
-    return url
-
+    Returns within `deadline_s`; pairs still pending (or failed) map to
+    the no-photo placeholder while their lookup finishes in the
+    background.  A pair already in flight is never requested twice.
+    """
+    global _prefetch_pool
+    pairs = list(dict.fromkeys((str(n), str(t)) for n, t in pois))
+    if not GOOGLE_KEY:
+        return {k: get_place_meta(*k) for k in pairs}
+
+    futs = {}
+    with _http_lock:
+        if _prefetch_pool is None:
+            _prefetch_pool = ThreadPoolExecutor(
+                PREFETCH_WORKERS, thread_name_prefix="place-meta")
+        for k in pairs:
+            f = _inflight.get(k)
+            if f is None:
+                f = _inflight[k] = _prefetch_pool.submit(get_place_meta, *k)
+                f.add_done_callback(lambda _, k=k: _inflight.pop(k, None))
+            futs[k] = f
+    with timer("place_meta.prefetch"):
+        wait(futs.values(), timeout=deadline_s)
+
+    out = {}
+    for k, f in futs.items():
+        ok = f.done() and f.exception() is None
+        if f.done() and not ok:
+            print("META ✗", "|".join(k), repr(f.exception()))
+        out[k] = f.result() if ok else dict(_NO_META)
+    count("place_meta.deadline_missed", sum(not f.done() for f in futs.values()))
+    return out
 
 
 # ─────────  card renderer  ─────────
-def _card(poi: pd.Series):
+def _card(poi: pd.Series, meta: dict | None = None):
     """
     Render a single POI card (photo + key meta + direct links)
     ----------------------------------------------------------
@@ -265,7 +729,11 @@ def _card(poi: pd.Series):
       │  📍 Map • 🚗 Navigate         │
       └──────────────────────────────┘
     """
-    meta = get_place_meta(poi["name"], poi["municipality"])
+    if meta is None:
+        meta = local_place_meta(poi)
+        if meta is None:
+            with timer("place_meta.card_lookup"):
+                meta = get_place_meta(poi["name"], poi["municipality"])
 
     # ── photo (or grey placeholder) ───────────────────────────
     photo_html = (
@@ -325,7 +793,8 @@ def _card(poi: pd.Series):
 # ─────────────────────────────────────────────────────────────
 # 5 ▸ Streamlit presenter – card grid + explanations
 # ─────────────────────────────────────────────────────────────
-def displayResults(group_df: pd.DataFrame, top_n: int = 9) -> None:
+def displayResults(group_df: pd.DataFrame, top_n: int = 9,
+                   cfg: RankingConfig = DEFAULT_CONFIG) -> None:
     """
     Show the TOP-N *unique* POIs (after ELECTRE → LSP) as:
       • global “why this order” summary  (TOP)
@@ -342,28 +811,44 @@ def displayResults(group_df: pd.DataFrame, top_n: int = 9) -> None:
     )
 
     # ── CARD GRID ─────────────────────────────────────────────
+    # offline metadata first; only POIs it doesn't cover go to the network
+    metas, missing = {}, []
+    for _, poi in uniq_df.iterrows():
+        k = (str(poi["name"]), str(poi["municipality"]))
+        metas[k] = local_place_meta(poi)
+        if metas[k] is None:
+            missing.append(k)
+    count("place_meta.source", len(metas) - len(missing), source="offline")
+    count("place_meta.source", len(missing), source="network")
+    metas.update(prefetch_place_meta(missing))
     st.subheader(f"Top {len(uniq_df)} recommendations")
     cols = st.columns(3)
-    for i, (_, poi) in enumerate(uniq_df.iterrows()):
-        with cols[i % 3]:
-            _card(poi)
+    with timer("render.cards"):
+        for i, (_, poi) in enumerate(uniq_df.iterrows()):
+            with cols[i % 3]:
+                _card(poi, metas[str(poi["name"]), str(poi["municipality"])])
 
     st.divider()
 
     # ── PER-ITEM EXPLANATIONS ────────────────────────────────
     st.subheader("ℹ️  Individual utility break-downs")
-    for _, r in uniq_df.iterrows():
-        st.markdown("• " + explain_row(r))
+    with timer("explain"):
+        bd = lsp_breakdown(uniq_df, cfg)
+        for _, r in uniq_df.iterrows():
+            st.markdown("• " + explain_row(r, cfg, bd))
 
     # ── PAIR-WISE EXPLAINER ──────────────────────────────────
     with st.expander("🔍  Compare two POIs", expanded=False):
-        _interactive_pairwise(uniq_df, "pair_global")
+        _interactive_pairwise(uniq_df, "pair_global", cfg, bd)
 
 
 
 
 
-def _interactive_pairwise(df: pd.DataFrame, key_prefix: str):
+def _interactive_pairwise(df: pd.DataFrame, key_prefix: str,
+                          cfg: RankingConfig = DEFAULT_CONFIG,
+                          bd: LspBreakdown | None = None):
+    bd = bd or lsp_breakdown(df, cfg)
     cols = st.columns(2)
     with cols[0]:
         left = st.selectbox(
@@ -375,22 +860,85 @@ def _interactive_pairwise(df: pd.DataFrame, key_prefix: str):
             key=f"{key_prefix}_right")
 
     if left != right:
-        a = df.loc[df["name"] == left].iloc[0]
-        b = df.loc[df["name"] == right].iloc[0]
-        st.markdown(pairwise_explain(a, b))
-
+        i = int(np.flatnonzero(bd.names == left)[0])
+        j = int(np.flatnonzero(bd.names == right)[0])
+        st.markdown(bd.pair_text(i, j))        # only the pair on screen
 
-def _lsp_parts(row: pd.Series) -> tuple[float, np.ndarray]:
-    vec = row[CRITERIA].to_numpy(float)
-    pieces = (W / W.sum()) * (vec ** RHO)
-    U = pieces.sum() ** (1 / RHO)
-    return U, pieces
 
-
-def explain_row(row: pd.Series) -> str:
+# ─────────────────────────────────────────────────────────────
+# 6 ▸ LSP explanations – one batched pass per result frame
+# ─────────────────────────────────────────────────────────────
+@dataclass(frozen=True, eq=False)
+class LspBreakdown:
+    """
+    LSP utility and per-criterion contribution shares of every row of a
+    result frame, from one NumPy pass.  All explanation texts read from
+    here; `pair_text` builds (and keeps) one pair's text on demand,
+    `pair_diff` / `pair_texts` cover every ordered pair at once.
+    """
+    index: pd.Index
+    names: np.ndarray
+    U: np.ndarray                    # (n,)
+    parts: np.ndarray                # (n × 7)  (W/ΣW)·x^ρ
+    pct: np.ndarray                  # (n × 7)  share of U's base, in %
+    _memo: dict = field(default_factory=dict, repr=False)
+
+    def pos(self, label) -> int:
+        return int(self.index.get_loc(label))
+
+    @property
+    def pair_diff(self) -> np.ndarray:
+        """(n × n × 7) pct[i] − pct[j]."""
+        if "diff" not in self._memo:
+            self._memo["diff"] = self.pct[:, None, :] - self.pct[None, :, :]
+        return self._memo["diff"]
+
+    def pair_text(self, i: int, j: int, eps: float = 0.5,
+                  n_terms: int = 3) -> str:
+        """Why row i outranks row j."""
+        key = ("text", i, j, eps, n_terms)
+        if key not in self._memo:
+            self._memo[key] = _pair_text(self, i, j, eps, n_terms)
+        return self._memo[key]
+
+    def pair_texts(self, eps: float = 0.5, n_terms: int = 3) -> np.ndarray:
+        """(n × n) object array: [i, j] = why row i outranks row j."""
+        key = ("texts", eps, n_terms)
+        if key not in self._memo:
+            n = len(self.names)
+            out = np.full((n, n), "", dtype=object)
+            for i in range(n):
+                for j in range(n):
+                    if i != j:
+                        out[i, j] = self.pair_text(i, j, eps, n_terms)
+            self._memo[key] = out
+        return self._memo[key]
+
+def lsp_breakdown(df: pd.DataFrame,
+                  cfg: RankingConfig = DEFAULT_CONFIG) -> LspBreakdown:
+    parts = _lsp_terms(df[CRITERIA].to_numpy(float), cfg)
+    base = parts.sum(1)
+    return LspBreakdown(df.index, df["name"].to_numpy(),
+                        base ** (1 / cfg.RHO), parts,
+                        parts / base[:, None] * 100)
+
+def _row_breakdown(row: pd.Series, cfg: RankingConfig,
+                   bd: LspBreakdown | None) -> tuple[LspBreakdown, int]:
+    if bd is not None and row.name in bd.index:
+        return bd, bd.pos(row.name)
+    return lsp_breakdown(row.to_frame().T, cfg), 0
+
+def _lsp_parts(row: pd.Series,
+               cfg: RankingConfig = DEFAULT_CONFIG) -> tuple[float, np.ndarray]:
+    bd, i = _row_breakdown(row, cfg, None)
+    return bd.U[i], bd.parts[i]
+
+
+def explain_row(row: pd.Series, cfg: RankingConfig = DEFAULT_CONFIG,
+                bd: LspBreakdown | None = None) -> str:
     """One-liner describing main positive & weak drivers of utility U."""
-    U, parts = _lsp_parts(row)
-    pct = parts / parts.sum() * 100
+    bd, i = _row_breakdown(row, cfg, bd)
+    U, pct = bd.U[i], bd.pct[i]
     best = CRIT_NAMES[int(pct.argmax())]
     worst = CRIT_NAMES[int(pct.argmin())]
     return (f"{row['name']} scores **{U:.3f}**. "
@@ -398,48 +946,59 @@ def explain_row(row: pd.Series) -> str:
             f"Least: *{worst}* ({pct.min():.1f} %).")
 
 
-def pairwise_explain(a: pd.Series, b: pd.Series,
-                     eps: float = 0.5, n_terms: int = 3) -> str:
-    """Why POI *a* outranks *b* (± gap >= eps pp)."""
-    _, pa = _lsp_parts(a);  pct_a = pa / pa.sum() * 100
-    _, pb = _lsp_parts(b);  pct_b = pb / pb.sum() * 100
+def _pair_text(bd: LspBreakdown, i: int, j: int,
+               eps: float, n_terms: int) -> str:
+    pct_a, pct_b = bd.pct[i], bd.pct[j]
     diff = pct_a - pct_b
-    adv = [j for j in diff.argsort()[::-1] if diff[j] >  eps][:n_terms]
-    lag = [j for j in diff.argsort()       if diff[j] < -eps][:n_terms]
-
-    lines = [f"#### Why **{a['name']}** outranks **{b['name']}**:"]
-    for j in adv:
-        lines.append(f"• higher *{CRIT_NAMES[j]}* "
-                     f"({pct_a[j]:.1f}% vs {pct_b[j]:.1f}%).")
-    for j in lag:
-        lines.append(f"• trades off lower *{CRIT_NAMES[j]}* "
-                     f"({pct_a[j]:.1f}% vs {pct_b[j]:.1f}%).")
+    adv = [k for k in diff.argsort()[::-1] if diff[k] >  eps][:n_terms]
+    lag = [k for k in diff.argsort()       if diff[k] < -eps][:n_terms]
+
+    lines = [f"#### Why **{bd.names[i]}** outranks **{bd.names[j]}**:"]
+    for k in adv:
+        lines.append(f"• higher *{CRIT_NAMES[k]}* "
+                     f"({pct_a[k]:.1f}% vs {pct_b[k]:.1f}%).")
+    for k in lag:
+        lines.append(f"• trades off lower *{CRIT_NAMES[k]}* "
+                     f"({pct_a[k]:.1f}% vs {pct_b[k]:.1f}%).")
     if len(lines) == 1:
         lines.append(f"• practically tied on every criterion "
                      f"(gaps ≤ {eps} pp).")
     return "\n".join(lines)
 
 
-def global_summary(df: pd.DataFrame, top_k: int = 10) -> list[str]:
+def pairwise_explain(a: pd.Series, b: pd.Series,
+                     eps: float = 0.5, n_terms: int = 3,
+                     cfg: RankingConfig = DEFAULT_CONFIG,
+                     bd: LspBreakdown | None = None) -> str:
+    """Why POI *a* outranks *b* (± gap >= eps pp)."""
+    if bd is None or a.name not in bd.index or b.name not in bd.index:
+        bd = lsp_breakdown(pd.DataFrame([a, b]), cfg)
+        return _pair_text(bd, 0, 1, eps, n_terms)
+    return _pair_text(bd, bd.pos(a.name), bd.pos(b.name), eps, n_terms)
+
+
+def global_summary(df: pd.DataFrame, top_k: int = 10,
+                   cfg: RankingConfig = DEFAULT_CONFIG) -> list[str]:
     """One sentence per consecutive pair in the top-k ranking."""
     top = df.nsmallest(top_k, "electre_rank")
+    if len(top) < 2:
+        return []
+    bd = lsp_breakdown(top, cfg)
+    gap = bd.pct[:-1] - bd.pct[1:]                  # every consecutive pair
+    J = np.abs(gap).argmax(1)
     msgs = []
-    for i in range(len(top) - 1):
-        a, b = top.iloc[i], top.iloc[i + 1]
-        _, pac = _lsp_parts(a);  pct_a = pac / pac.sum() * 100
-        _, pbc = _lsp_parts(b);  pct_b = pbc / pbc.sum() * 100
-        gap = pct_a - pct_b
-        j = np.argmax(np.abs(gap))
-        direction = "higher" if gap[j] > 0 else "lower"
-        msgs.append(f"{i+1}>{i+2}: {a['name']} beats {b['name']} "
+    for i, j in enumerate(J):
+        direction = "higher" if gap[i, j] > 0 else "lower"
+        msgs.append(f"{i+1}>{i+2}: {bd.names[i]} beats {bd.names[i+1]} "
                     f"via {direction} *{CRIT_NAMES[j]}* "
-                    f"({pct_a[j]:.1f}% vs {pct_b[j]:.1f}%).")
+                    f"({bd.pct[i, j]:.1f}% vs {bd.pct[i+1, j]:.1f}%).")
     return msgs
 
 
-def quick_explain(row: pd.Series) -> str:
-    U, part = _lsp_parts(row)
-    pct = part / part.sum() * 100
+def quick_explain(row: pd.Series, cfg: RankingConfig = DEFAULT_CONFIG,
+                  bd: LspBreakdown | None = None) -> str:
+    bd, i = _row_breakdown(row, cfg, bd)
+    U, pct = bd.U[i], bd.pct[i]
     return (f"**{row['name']}** – U={U:.3f}.  "
             f"↑ *{CRIT_NAMES[pct.argmax()]}* {pct.max():.1f} %, "
             f"↓ *{CRIT_NAMES[pct.argmin()]}* {pct.min():.1f} %.")
@@ -0,0 +1,84 @@
+from __future__ import annotations
+import hashlib, threading, numpy as np, pandas as pd
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable
+from metrics import count
+from userprof import Profile
+
+# ─────────────────────────────────────────────────────────────
+# Content-keyed LRU cache for runRecommender results
+# ─────────────────────────────────────────────────────────────
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """Cheap content hash of a catalogue – compute once per load."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(list(df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def group_key(profiles: Iterable[Profile]) -> tuple:
+    """Order-free key of a traveller group (z7 and filters are symmetric)."""
+    return tuple(sorted((p.key() for p in profiles), key=repr))
+
+
+def params_key(*arrays, **scalars) -> tuple:
+    """Rounded, hashable snapshot of the ranking parameters."""
+    return (tuple(tuple(np.round(np.asarray(a, dtype=float), 6)) for a in arrays)
+            + tuple(sorted(scalars.items())))
+
+
+class RecommendationCache:
+    """Thread-safe LRU keyed by (dataset fingerprint, group, parameters)."""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._data: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(fingerprint: str, profiles: Iterable[Profile],
+            params: Hashable) -> tuple:
+        return (fingerprint, group_key(profiles), params)
+
+    def get(self, key: tuple, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                count("rec_cache.lookups", result="hit")
+                return self._data[key]
+            self.misses += 1
+            count("rec_cache.lookups", result="miss")
+            return default
+
+    def put(self, key: tuple, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key: tuple, fn: Callable[[], Any]) -> Any:
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = fn()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, fingerprint: str | None = None) -> int:
+        """Drop every entry (or only those of one dataset); returns count."""
+        with self._lock:
+            stale = [k for k in self._data
+                     if fingerprint is None or k[0] == fingerprint]
+            for k in stale:
+                del self._data[k]
+            return len(stale)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return dict(size=len(self._data), maxsize=self.maxsize,
+                        hits=self.hits, misses=self.misses,
+                        hit_rate=self.hits / total if total else 0.0)
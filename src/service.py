@@ -0,0 +1,289 @@
+from __future__ import annotations
+import argparse, asyncio, json, math, os, time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from typing import Any, Dict, List, Tuple
+
+import metrics
+from catalogue import init_worker, shared_catalogue
+from reccache import RecommendationCache
+from userprof import Profile
+import ranking_recommender as rr
+
+# ─────────────────────────────────────────────────────────────
+# Headless recommendation service (plain ASGI, no framework)
+#   GET  /health      catalogue size + categories
+#   GET  /metrics     Prometheus text (service and ranking workers)
+#   POST /recommend   {"profiles": [{Profile fields}, …],
+#                      "weights": [7 floats]?, "k": 9?, "mode": "intersection"?}
+#                     → {"results": [kernel rows], "elapsed_ms": …}
+#   The shared catalogue is loaded once per process; ranking runs on a
+#   process pool so ELECTRE never blocks the event loop.  Workers forked
+#   after the load share the parent's pages, others load the NPZ cache.
+#   Each result carries the worker's metrics since its last one; the
+#   parent merges them, so /metrics covers the ranking stages too.
+#
+#   python src/service.py --port 8000 --workers 4
+#   uvicorn service:app --app-dir src          (env: GREENEXPLORER_DATA,
+#                                               GREENEXPLORER_WORKERS)
+# ─────────────────────────────────────────────────────────────
+WORKERS      = os.cpu_count() or 2
+MAX_PENDING  = 64            # queued + running requests before 503
+MAX_BODY     = 1 << 20
+MAX_K        = 50
+RESULT_COLS  = ["name", "municipality", "category", "lat", "lon",
+                "distance_km", "electre_rank", "U_LSP"] + rr.CRITERIA
+
+_PROFILE_FIELDS = {f.name for f in fields(Profile)}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# ── pool workers ─────────────────────────────────────────────
+_results = RecommendationCache(maxsize=256)          # per worker process
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _init_worker(data_dir: str, metrics_on: bool) -> None:
+    """`init_worker`, plus the parent's metrics switch (lost on spawn); a
+    forked registry copy is the parent's and would be counted twice."""
+    metrics.registry.clear()
+    if metrics_on:
+        metrics.enable()
+    init_worker(data_dir)
+
+
+def recommend(profiles: Dict[int, Profile], weights: Tuple[float, ...] | None,
+              k: int, mode: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Ranked kernel as JSON-ready records, with this worker's metrics
+    since its last result (runs in a pool worker)."""
+    cat = shared_catalogue()
+    cfg = rr.DEFAULT_CONFIG if weights is None else \
+        rr.DEFAULT_CONFIG.with_weights(weights)
+    key = _results.key(cat.fingerprint, profiles.values(),
+                       rr.ranking_key(cfg, mode) + (("k", k),))
+    kernel = _results.get_or_compute(key, lambda: rr.rank_top_k(
+        cat.data, profiles, k=k, index=cat.filter_index, mode=mode,
+        cfg=cfg)["Group"])
+    cols = [c for c in RESULT_COLS if c in kernel]
+    rows = json.loads(kernel[cols].to_json(orient="records", double_precision=6))
+    return rows, metrics.registry.drain()
+
+
+# ── request parsing ──────────────────────────────────────────
+def _number(v: Any, what: str) -> float:
+    if isinstance(v, bool) or not isinstance(v, (int, float)) \
+            or not math.isfinite(v):
+        raise BadRequest(f"{what} must be a finite number")
+    return float(v)
+
+
+def _unit(v: Any, what: str) -> float:
+    v = _number(v, what)
+    if not 0 <= v <= 1:
+        raise BadRequest(f"{what} must be between 0 and 1")
+    return v
+
+
+def parse_profile(obj: Any) -> Profile:
+    if not isinstance(obj, dict):
+        raise BadRequest("each profile must be an object")
+    unknown = set(obj) - _PROFILE_FIELDS
+    if unknown:
+        raise BadRequest(f"unknown profile fields: {sorted(unknown)}")
+    p = dict(obj)
+    if p.get("name") is not None and not isinstance(p["name"], str):
+        raise BadRequest("name must be a string or null")
+    if p.get("location") is not None:
+        loc = p["location"]
+        if not isinstance(loc, (list, tuple)) or len(loc) != 2:
+            raise BadRequest("location must be [lat, lon]")
+        p["location"] = (_number(loc[0], "lat"), _number(loc[1], "lon"))
+    if p.get("max_disp") is not None:
+        p["max_disp"] = _number(p["max_disp"], "max_disp")
+        if p["max_disp"] <= 0:
+            raise BadRequest("max_disp must be positive")
+    for f in ("culture", "nature", "nlife", "local_imp", "co2"):
+        if f in p:
+            p[f] = _unit(p[f], f)
+    avoid = p.get("avoid", [])
+    if not isinstance(avoid, list) or not all(isinstance(a, str) for a in avoid):
+        raise BadRequest("avoid must be a list of category names")
+    if not isinstance(p.get("mobility_constr", False), bool):
+        raise BadRequest("mobility_constr must be true or false")
+    return Profile(**p)
+
+
+def parse_group(req: Any) -> Tuple[Dict[int, Profile],
+                                   Tuple[float, ...] | None, int, str]:
+    """Validated (profiles, weights, k, mode) of one decoded request –
+    shared by the API and the batch CLI."""
+    if not isinstance(req, dict):
+        raise BadRequest("body must be a JSON object")
+    profs = req.get("profiles")
+    if not isinstance(profs, list) or not profs:
+        raise BadRequest("profiles must be a non-empty list")
+    profiles = {i: parse_profile(p) for i, p in enumerate(profs, 1)}
+
+    weights = req.get("weights")
+    if weights is not None:
+        if not isinstance(weights, list) or len(weights) != len(rr.CRITERIA):
+            raise BadRequest(f"weights must be {len(rr.CRITERIA)} numbers")
+        weights = tuple(_number(w, "weight") for w in weights)
+        if min(weights) < 0 or sum(weights) <= 0:
+            raise BadRequest("weights must be non-negative, not all zero")
+
+    k = req.get("k", rr.KERNEL_SZ)
+    if isinstance(k, bool) or not isinstance(k, int) or not 1 <= k <= MAX_K:
+        raise BadRequest(f"k must be an integer in 1…{MAX_K}")
+    mode = req.get("mode") or rr.GROUP_MODE
+    if mode not in ("intersection", "union"):
+        raise BadRequest("mode must be 'intersection' or 'union'")
+    return profiles, weights, k, mode
+
+
+def parse_request(body: bytes) -> Tuple[Dict[int, Profile],
+                                        Tuple[float, ...] | None, int, str]:
+    try:
+        req = json.loads(body or b"{}")
+    except ValueError:
+        raise BadRequest("body is not valid JSON")
+    return parse_group(req)
+
+
+# ── ASGI app ─────────────────────────────────────────────────
+class RecommenderService:
+    """ASGI callable; catalogue and process pool live for its lifespan."""
+
+    def __init__(self, data_dir: str = "data", workers: int = WORKERS,
+                 max_pending: int = MAX_PENDING):
+        self.data_dir, self.workers = data_dir, workers
+        self.max_pending = max_pending
+        self.pool: ProcessPoolExecutor | None = None
+        self._pending = 0
+
+    # lifecycle
+    async def startup(self) -> None:
+        shared_catalogue(self.data_dir)              # before the fork
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                        initargs=(self.data_dir,
+                                                  metrics.enabled()))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _ping)
+                               for _ in range(self.workers)))
+
+    async def shutdown(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            msg = await receive()
+            if msg["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed",
+                                "message": repr(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif msg["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    # http
+    @staticmethod
+    async def _send(send, status: int, payload: Any,
+                    content_type: str = "application/json") -> None:
+        body = (payload.encode() if isinstance(payload, str)
+                else json.dumps(payload).encode())
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", content_type.encode()),
+                                (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _body(receive) -> bytes:
+        chunks, size = [], 0
+        while True:
+            msg = await receive()
+            chunks.append(msg.get("body", b""))
+            size += len(chunks[-1])
+            if size > MAX_BODY:
+                raise BadRequest("body too large")
+            if not msg.get("more_body"):
+                return b"".join(chunks)
+
+    async def _recommend(self, receive, send) -> None:
+        t0 = time.perf_counter()
+        try:
+            args = parse_request(await self._body(receive))
+        except BadRequest as e:
+            metrics.count("service.requests", status=400)
+            return await self._send(send, 400, {"error": str(e)})
+        if self._pending >= self.max_pending:
+            metrics.count("service.requests", status=503)
+            return await self._send(send, 503, {"error": "busy, retry later"})
+
+        self._pending += 1
+        try:
+            with metrics.timer("service.recommend"):
+                rows, delta = await asyncio.get_running_loop().run_in_executor(
+                    self.pool, recommend, *args)
+            metrics.registry.merge(delta)
+        except Exception as e:
+            metrics.count("service.requests", status=500)
+            return await self._send(send, 500, {"error": repr(e)})
+        finally:
+            self._pending -= 1
+        metrics.count("service.requests", status=200)
+        await self._send(send, 200, {
+            "results": rows,
+            "elapsed_ms": (time.perf_counter() - t0) * 1e3})
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http":
+            return
+        route = (scope["method"], scope["path"].rstrip("/") or "/")
+        if route == ("POST", "/recommend"):
+            return await self._recommend(receive, send)
+        if route == ("GET", "/health"):
+            cat = shared_catalogue(self.data_dir)
+            return await self._send(send, 200, {
+                "status": "ok", "pois": len(cat),
+                "workers": self.workers, "pending": self._pending,
+                "categories": list(cat.categories)})
+        if route == ("GET", "/metrics"):
+            return await self._send(send, 200, metrics.prometheus_text(),
+                                    "text/plain; version=0.0.4")
+        known = {"/recommend", "/health", "/metrics"}
+        await self._send(send, 405 if route[1] in known else 404,
+                         {"error": "method not allowed" if route[1] in known
+                          else "not found"})
+
+
+app = RecommenderService(os.getenv("GREENEXPLORER_DATA", "data"),
+                         int(os.getenv("GREENEXPLORER_WORKERS", WORKERS)))
+
+
+if __name__ == "__main__":
+    import uvicorn
+    ap = argparse.ArgumentParser(description="Headless recommendation API")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--workers", type=int, default=WORKERS,
+                    help="ranking processes")
+    ap.add_argument("--data", default="data")
+    a = ap.parse_args()
+    metrics.enable()
+    uvicorn.run(RecommenderService(a.data, a.workers), host=a.host,
+                port=a.port, log_level="warning")
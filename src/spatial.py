@@ -0,0 +1,100 @@
+from __future__ import annotations
+import numpy as np, pandas as pd
+from typing import Dict, Tuple
+
+# ─────────────────────────────────────────────────────────────
+# POI spatial index – lat/lon grid + vectorised haversine
+# ─────────────────────────────────────────────────────────────
+EARTH_R_KM = 6371.0088
+CELL_DEG   = 0.25              # ≈ 28 km (lat) grid cells
+# haversine vs WGS-84 geodesic differ by < 0.6 %; rows whose spherical
+# distance is that close to the radius get an exact geodesic re-check
+EXACT_BAND = 0.006
+
+
+def haversine_km(lat, lon, lat0: float, lon0: float) -> np.ndarray:
+    """Great-circle distance (km) from (lat0, lon0) to every (lat, lon)."""
+    p1, p2 = np.radians(lat0), np.radians(lat)
+    dphi = p2 - p1
+    dlmb = np.radians(lon) - np.radians(lon0)
+    a = np.sin(dphi / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_R_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class PoiSpatialIndex:
+    """
+    Build once per dataset, then answer "POIs within R km of (lat, lon)".
+
+    Results are labelled with the dataset's index, so the same index can
+    serve any row subset of the frame it was built from.
+    """
+
+    def __init__(self, lat, lon, labels=None, cell_deg: float = CELL_DEG):
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self.labels = (pd.RangeIndex(len(self.lat)) if labels is None
+                       else pd.Index(labels))
+        self.cell_deg = cell_deg
+
+        ok = np.isfinite(self.lat) & np.isfinite(self.lon)
+        pos = np.flatnonzero(ok)
+        ci = np.floor(self.lat[pos] / cell_deg).astype(np.int64)
+        cj = np.floor(self.lon[pos] / cell_deg).astype(np.int64)
+        order = np.lexsort((cj, ci))
+        keys = np.stack([ci[order], cj[order]], 1)
+        cells, starts = np.unique(keys, axis=0, return_index=True)
+        bounds = np.append(starts, len(order))
+        self._cells: Dict[Tuple[int, int], np.ndarray] = {
+            (int(i), int(j)): pos[order[bounds[c]:bounds[c + 1]]]
+            for c, (i, j) in enumerate(cells)
+        }
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **kw) -> "PoiSpatialIndex":
+        return cls(df["lat"], df["lon"], labels=df.index, **kw)
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    # ── queries ──────────────────────────────────────────────
+    def distances(self, lat: float, lon: float) -> pd.Series:
+        """Haversine km from (lat, lon) to every indexed POI."""
+        return pd.Series(haversine_km(self.lat, self.lon, lat, lon),
+                         index=self.labels, name="distance_km")
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        c = self.cell_deg
+        dlat = np.degrees(radius_km / EARTH_R_KM)
+        coslat = np.cos(np.radians(min(abs(lat) + dlat, 90.0)))
+        dlon = 360.0 if coslat < 1e-6 else np.degrees(radius_km / EARTH_R_KM) / coslat
+        i0, i1 = np.floor((lat - dlat) / c), np.floor((lat + dlat) / c)
+        if dlon >= 180:
+            spans = [(-np.inf, np.inf)]
+        else:                                       # may wrap across ±180°
+            spans = [(np.floor((lon - dlon + s) / c),
+                      np.floor((lon + dlon + s) / c)) for s in (-360, 0, 360)]
+        hits = [p for (i, j), p in self._cells.items()
+                if i0 <= i <= i1 and any(j0 <= j <= j1 for j0, j1 in spans)]
+        return np.concatenate(hits) if hits else np.empty(0, dtype=np.int64)
+
+    def query(self, lat: float, lon: float, radius_km: float,
+              exact: bool = False) -> pd.Series:
+        """
+        Distances (km) of the POIs within `radius_km`, labelled by dataset
+        index.  With `exact=True`, POIs in the haversine error band around
+        the radius are re-measured with `geopy`'s geodesic.
+        """
+        reach = radius_km * (1 + EXACT_BAND) if exact else radius_km
+        pos = self._candidates(lat, lon, reach)
+        d = haversine_km(self.lat[pos], self.lon[pos], lat, lon)
+        if exact:
+            band = np.flatnonzero(np.abs(d - radius_km) <= EXACT_BAND * radius_km)
+            if len(band):
+                from geopy.distance import geodesic
+            for b in band:
+                d[b] = geodesic((lat, lon), (self.lat[pos[b]], self.lon[pos[b]])).km
+        keep = d <= radius_km
+        pos, d = pos[keep], d[keep]
+        order = np.argsort(pos)                     # dataset order
+        return pd.Series(d[order], index=self.labels[pos[order]],
+                         name="distance_km")
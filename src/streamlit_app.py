@@ -1,44 +1,107 @@
 import streamlit as st
 from streamlit import session_state as ss
 from typing import List
+import os
 import numpy as np
+import pandas as pd
 
-from dataloader import readTourismData
+import metrics
+
+from catalogue import Catalogue, shared_catalogue
 from userprof import Profile
 from introscreen import handleProfiles, renderHeader, renderTabs
+from placecache import place_cache
+from reccache import RecommendationCache
 from ranking_recommender import (
-    compute_ranking, runRecommender, displayResults, W as MCDA_W
+    rank_top_k, displayResults, ranking_key,
+    RankingConfig, DEFAULT_CONFIG
 )
 
 # ────────────────────────── helpers ──────────────────────────
-@st.cache_data(show_spinner=False)
-def cached_recomm(df, profiles, w_key):
+@st.cache_resource
+def recomm_cache() -> RecommendationCache:
+    """One LRU per server process, keyed by content – safe to share."""
+    return RecommendationCache(maxsize=128)
+
+def cached_recomm() -> dict:
     """Avoid re-running MCDA unless data / profiles / weights change."""
-    return runRecommender(df, profiles)
+    cfg, cat = ss.rank_cfg, catalogue()
+    key = recomm_cache().key(cat.fingerprint, ss.profiles.values(),
+                             ranking_key(cfg))
+    return recomm_cache().get_or_compute(
+        key, lambda: rank_top_k(cat.data, ss.profiles,
+                                index=cat.filter_index, cfg=cfg,
+                                reuse_partials=True))   # weight sliders
+
+@st.cache_resource
+def catalogue() -> Catalogue:
+    """Data + derived indexes, built once per server process and shared
+    read-only by every session (sessions hold profiles and results only)."""
+    return shared_catalogue()
+
+def debug_sink() -> metrics.MemorySink:
+    """This session's trace buffer behind the debug panel."""
+    if "debug_sink" not in ss:
+        ss.debug_sink = metrics.MemorySink(maxlen=1)
+    return ss.debug_sink
 
-def set_mcda_weights(p1, p2, p3, p4):
-    """Map 4 pillar sliders → 7-dim weight vector used inside ranking."""
-    MCDA_W[:] = [
+def debug_panel() -> None:
+    """Stage timings of this session's last results render, plus the
+    process-wide counters when instrumentation is on for the process."""
+    traces = debug_sink().traces
+    with st.expander("🛠  Debug – stage timings", expanded=False):
+        if traces:
+            t = traces[-1]
+            st.caption(f"trace {t['id']} · {t['duration_s'] * 1e3:.1f} ms")
+            st.dataframe(pd.DataFrame(
+                [{"stage": s["name"],
+                  "labels": ", ".join(f"{k}={v}" for k, v in s["labels"].items()),
+                  "start_ms": s["start_s"] * 1e3,
+                  "ms": s["duration_s"] * 1e3} for s in t["spans"]]),
+                hide_index=True)
+        st.json({"rec_cache": recomm_cache().stats(),
+                 "place_cache": place_cache().stats()}, expanded=False)
+        if metrics.enabled():
+            st.code(metrics.prometheus_text(), language="text")
+
+def fresh_catalogue() -> Catalogue:
+    """The shared catalogue – re-read first, for every session, when the
+    files under data/ changed (e.g. after re-enrichment), dropping the
+    results cached for the old one."""
+    cat = catalogue()
+    if not cat.stale():
+        return cat
+    recomm_cache().invalidate(cat.fingerprint)
+    shared_catalogue(cat.data_dir, reload=True)
+    catalogue.clear()
+    return catalogue()
+
+def mcda_config(p1, p2, p3, p4) -> RankingConfig:
+    """Map 4 pillar sliders → 7-dim weight vector, as this session's config."""
+    return DEFAULT_CONFIG.with_weights([
         0.32 * p1, 0.48 * p1, 0.20 * p1,   # P1 → z1,z2,z3
         p2,                                # P2 → z4
         p3,                                # P3 → z5
         0.09 * p4, 0.91 * p4               # P4 → z6,z7
-    ]
+    ])
 
 # ───────────────────────── first run ─────────────────────────
 if "page" not in ss:
-    ss.data            = readTourismData()
-    ss.city_locs       = ss.data.groupby("municipality")[["lat", "lon"]].first().to_dict("index")
-    ss.dest_types      = set(ss.data["category"])
+    catalogue()                          # warm the shared catalogue
     ss.profiles        = {1: Profile()}
     ss.profiles_to_del: List[int] = []
     ss.proc_counter    = 2
     ss.rank_ready      = False
     ss.page            = "input"
     ss.cached_res      = None
-    ss.cached_res_key  = None
 
 st.set_page_config(layout="wide", page_title="GreenExplorer")
+fresh_catalogue()                        # a few stat() calls per rerun
+
+# debug panel: GREENEXPLORER_METRICS=1 (process-wide metrics, enabled at
+# import) or ?debug=1 (this session's traces only)
+debug = (os.getenv(metrics.ENV_FLAG) == "1"
+         or st.query_params.get("debug") == "1")
 
 # ───────────────────────── sidebar ───────────────────────────
 with st.sidebar:
@@ -47,8 +110,7 @@ with st.sidebar:
     if st.button("🧠  LLM enrich dataset"):
         st.warning("API calls are expensive so we do not provide this, but all our data points are already enriched. Check out the code to see how we did so, functionality is commented.")
         # from enrich import enrich_dataset
-        # ss.data = enrich_dataset("data", spinner_callback=st.spinner)
-        # ss.city_locs = ss.data.groupby("municipality")[["lat", "lon"]].first().to_dict("index")
+        # enrich_dataset("data", spinner_callback=st.spinner)
         # st.success("Dataset enriched.")
 
     with st.expander("⚖️  MCDA pillar weights", expanded=False):
@@ -56,13 +118,11 @@ with st.sidebar:
         w_soc = st.slider("Socio-economic  (P2)", 0.05, 0.25, 0.10, 0.01)
         w_cul = st.slider("Cultural  (P3)", 0.05, 0.25, 0.10, 0.01)
         w_usr = st.slider("User-experience  (P4)", 0.30, 0.70, 0.55, 0.01)
-    set_mcda_weights(w_env, w_soc, w_cul, w_usr)
+    ss.rank_cfg = mcda_config(w_env, w_soc, w_cul, w_usr)
 
     # Compute ranking
     if st.button("📊  Compute ranking"):
-        if "z7" not in ss.data:
-            ss.data["z7"] = .5
-        ss.data = compute_ranking(ss.data)
+        # the group's ranking itself runs (cached) on the results page
         ss.rank_ready   = True
         ss.cached_res   = None          # invalidate cache
         st.success("MCDA ranking ready.")
@@ -89,12 +149,15 @@ else:
         st.warning("Please compute the ranking first.")
         st.stop()
 
-    # cache key = (rounded weight vector, tuple of profile prefs)
-    w_key = tuple(MCDA_W.round(4))
-    if ss.cached_res is None or ss.cached_res_key != w_key:
-        with st.spinner("Running ELECTRE → LSP …"):
-            ss.cached_res      = cached_recomm(ss.data, ss.profiles, w_key)["Group"]
-            ss.cached_res_key  = w_key
+    with metrics.trace("results", sink=debug_sink() if debug else None,
+                       group_size=len(ss.profiles)):
+        # cache key = (dataset fingerprint, canonical group, ranking params)
+        with st.spinner("Running ELECTRE → LSP …"), metrics.timer("recommend"):
+            res = cached_recomm()
+        ss.cached_res = res["Group"]
+
+        st.title("Group recommendations")
+        displayResults(ss.cached_res, cfg=ss.rank_cfg)
 
-    st.title("Group recommendations")
-    displayResults(ss.cached_res)
+    if debug:
+        debug_panel()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+import json
+import os
+import re
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Tuple
+
+# ─────────────────────────────────────────────────────────────
+# Category taxonomy
+#   Maps every distinct POI category onto the culture / nature /
+#   nightlife classes the preference score uses.  A category is
+#   classified once (user mapping first, keyword regexes otherwise) and
+#   the result lives on the dataset as an int8 bit set, so per-row code
+#   never looks at the category string again.  Each data dir may carry
+#   its own overrides file; `load_taxonomy` reads it once per process, so
+#   annotated and un-annotated paths classify a category the same way.
+# ─────────────────────────────────────────────────────────────
+CLASSES = ("culture", "nature", "nightlife")
+BITS = {c: np.int8(1 << i) for i, c in enumerate(CLASSES)}
+FLAGS_COL = "category_flags"
+
+# optional  {"Winery": ["culture", "nightlife"], "Harbor": []}  overrides,
+# looked up inside the data dir
+TAXONOMY_FILE = "category_taxonomy.json"
+DATA_DIR      = "data"
+
+_RX = {
+    "culture":   re.compile(r"(culture|museum|heritage|art|history)",  re.I),
+    "nature":    re.compile(r"(nature|park|beach|forest|garden|trail)", re.I),
+    "nightlife": re.compile(r"(night|club|bar|pub|music)",             re.I),
+}
+
+
+class CategoryTaxonomy:
+    """Category → class flags; `mapping` entries win over the regexes."""
+
+    def __init__(self, mapping: Dict[str, Iterable[str]] | None = None):
+        self.mapping: Dict[str, Tuple[str, ...]] = {}
+        for cat, classes in (mapping or {}).items():
+            classes = tuple(classes)
+            unknown = set(classes) - set(CLASSES)
+            if unknown:
+                raise ValueError(f"unknown category class(es) for {cat!r}: "
+                                 f"{sorted(unknown)}")
+            self.mapping[str(cat).casefold()] = classes
+
+    @classmethod
+    def from_file(cls, path: str | None = None) -> "CategoryTaxonomy":
+        """Load overrides from a JSON mapping file (missing file → none)."""
+        path = path or os.path.join(DATA_DIR, TAXONOMY_FILE)
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as fh:
+            return cls(json.load(fh))
+
+    def classes(self, category) -> Tuple[str, ...]:
+        cat = str(category)
+        if cat.casefold() in self.mapping:
+            return self.mapping[cat.casefold()]
+        return tuple(c for c in CLASSES if _RX[c].search(cat))
+
+    def flags(self, category) -> np.int8:
+        return np.int8(sum(BITS[c] for c in self.classes(category)))
+
+    def table(self, cats) -> np.ndarray:
+        """Boolean (categories × 3) class membership."""
+        return decode([self.flags(c) for c in cats])
+
+    def annotate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Copy of `df` with a categorical `category` and its flag column."""
+        df = df.copy()
+        cat = df["category"].astype("category")
+        lut = np.array([self.flags(c) for c in cat.cat.categories] + [0],
+                       dtype=np.int8)                # code -1 → no class
+        df["category"] = cat
+        df[FLAGS_COL] = lut[cat.cat.codes.to_numpy()]
+        return df
+
+
+def decode(flags) -> np.ndarray:
+    """int8 bit sets → boolean (n × 3) matrix in `CLASSES` order."""
+    f = np.asarray(flags, dtype=np.int8).reshape(-1, 1)
+    return (f & np.array([BITS[c] for c in CLASSES])) != 0
+
+
+def category_codes(df: pd.DataFrame) -> Tuple[np.ndarray, List[str]]:
+    """Integer category codes (-1 = missing) + the category list."""
+    cat = df["category"]
+    if not isinstance(cat.dtype, pd.CategoricalDtype):
+        cat = cat.astype("category")
+    return cat.cat.codes.to_numpy(), [str(c) for c in cat.cat.categories]
+
+
+_loaded: Dict[str, CategoryTaxonomy] = {}
+_loaded_lock = threading.Lock()
+
+
+def load_taxonomy(data_dir: str | None = None,
+                  reload: bool = False) -> CategoryTaxonomy:
+    """The taxonomy of `data_dir` (default "data"): its overrides file
+    read once per process, or again with `reload`."""
+    data_dir = data_dir or DATA_DIR
+    key = os.path.abspath(data_dir)
+    with _loaded_lock:
+        if reload or key not in _loaded:
+            _loaded[key] = CategoryTaxonomy.from_file(
+                os.path.join(data_dir, TAXONOMY_FILE))
+        return _loaded[key]
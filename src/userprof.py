@@ -14,3 +14,10 @@ class Profile:
   nlife: float=0.5
   local_imp: float=0.5
   co2: float=0.5
+
+  def key(self) -> tuple:
+    """Canonical, hashable form of everything that affects ranking."""
+    loc = None if self.location is None else tuple(float(c) for c in self.location)
+    return (bool(self.mobility_constr), loc, self.max_disp,
+            tuple(sorted(self.avoid)), self.culture, self.nature,
+            self.nlife, self.local_imp, self.co2)
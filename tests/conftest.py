@@ -0,0 +1,4 @@
+import os, sys
+
+# modules live flat in src/ and import each other directly
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
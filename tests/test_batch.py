@@ -0,0 +1,61 @@
+import json
+import pytest
+
+from batch import done_ids, read_csv, read_jsonl
+from service import BadRequest
+
+
+def _read(tmp_path, *lines):
+    path = tmp_path / "groups.jsonl"
+    path.write_text("\n".join(json.dumps(l) for l in lines) + "\n")
+    return list(read_jsonl(str(path)))
+
+
+def test_jsonl_groups_are_parsed(tmp_path):
+    [(gid, profiles, weights, mode)] = _read(
+        tmp_path, {"id": "g1", "profiles": [{"culture": .9}, {}],
+                   "weights": [1] * 7, "mode": "union"})
+    assert gid == "g1" and len(profiles) == 2 and profiles[1].culture == .9
+    assert weights == (1.0,) * 7 and mode == "union"
+
+
+@pytest.mark.parametrize("group", [
+    {"profiles": []},
+    {"profiles": [{"culture": 2}]},
+    {"profiles": [{}], "weights": [0] * 7},
+    {"profiles": [{}], "weights": [-1] + [1] * 6},
+    {"profiles": [{}], "mode": "any"},
+])
+def test_invalid_groups_fail_like_the_api(tmp_path, group):
+    [(gid, err)] = _read(tmp_path, dict(group, id="bad"))
+    assert gid == "bad" and isinstance(err, BadRequest)
+
+
+def test_csv_rows_are_grouped(tmp_path):
+    path = tmp_path / "groups.csv"
+    path.write_text("group_id,name,lat,lon,max_disp,mobility_constr,avoid\n"
+                    "a,Ana,41.4,2.2,80,yes,Museum;Park\n"
+                    "b,Ben,,,,no,\n"
+                    "a,Cat,41.5,2.1,0,no,\n")
+    got = {g[0]: g[1:] for g in read_csv(str(path))}
+    assert got["b"][0][1].name == "Ben" and not got["b"][0][1].mobility_constr
+    assert isinstance(got["a"][0], BadRequest) and "max_disp" in str(got["a"][0])
+
+
+def test_csv_without_group_id_is_reported(tmp_path):
+    path = tmp_path / "groups.csv"
+    path.write_text("name,lat,lon\nAna,41.4,2.2\n")
+    with pytest.raises(ValueError, match="group_id"):
+        list(read_csv(str(path)))
+
+
+def test_resume_skips_failed_ids_unless_retried(tmp_path):
+    out = tmp_path / "out.jsonl"
+    out.write_text('{"id": "a", "status": "ok"}\n'
+                   '{"id": "b", "status": "error", "error": "x"}\n'
+                   '{"id": "c", "status": "error", "error": "x"}\n'
+                   '{"id": "c", "status": "ok"}\n'
+                   '{"id": "d", "sta')
+    assert done_ids(str(out)) == {"a", "b", "c"}
+    assert done_ids(str(out), retry_failed=True) == {"a", "c"}
+    assert out.read_text().endswith('"ok"}\n')
@@ -0,0 +1,40 @@
+import json, os, shutil
+
+from catalogue import Catalogue, shared_catalogue
+from reccache import RecommendationCache
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, "data")
+
+
+def test_taxonomy_is_read_from_the_catalogue_dir(tmp_path):
+    shutil.copy(os.path.join(DATA, "poi_vic_30.csv"), tmp_path)
+    cat = Catalogue.load(str(tmp_path))
+    assert len(cat) == 30 and not cat.taxonomy.mapping
+
+    first = cat.categories[0]
+    (tmp_path / "category_taxonomy.json").write_text(
+        json.dumps({first: ["nightlife"]}))
+    cat = Catalogue.load(str(tmp_path))
+    assert cat.taxonomy.classes(first) == ("nightlife",)
+
+
+def test_changed_dataset_is_stale_and_misses_the_cache(tmp_path):
+    shutil.copy(os.path.join(DATA, "poi_vic_30.csv"), tmp_path)
+    cat = shared_catalogue(str(tmp_path))
+    assert not cat.stale()
+    cache = RecommendationCache()
+    key = cache.key(cat.fingerprint, [], ())
+    cache.put(key, "old")
+
+    csv = tmp_path / "poi_vic_30.csv"
+    lines = csv.read_text().splitlines(keepends=True)
+    csv.write_text("".join(lines[:-1]))                # drop the last POI
+    assert cat.stale()
+    new = shared_catalogue(str(tmp_path), reload=True)
+    assert len(new) == 29 and not new.stale()
+    assert shared_catalogue(str(tmp_path)) is new
+    assert cache.get(cache.key(new.fingerprint, [], ())) is None
+    assert cache.invalidate(cat.fingerprint) == 1 and cache.get(key) is None
+
+    (tmp_path / "category_taxonomy.json").write_text("{}")
+    assert new.stale()
@@ -0,0 +1,96 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+import dataloader
+from dataloader import CACHE_FILE, readTourismData, source_manifest
+
+POI = "name,category,lat,lon,sustainability,popularity"
+Z = ",z1,z2,z3,z4,z5,z6"
+
+
+def _write(folder, name, text):
+    (folder / name).write_text(text)
+
+
+@pytest.mark.parametrize("name,muni,enriched", [
+    ("poi_vic_30.csv", "vic", False),
+    ("poi_vic_30_enriched.csv", "vic", True),
+    ("poi_vic_enriched.csv", "vic", True),
+    ("poi_girona.csv", "girona", False),
+    ("poi_all_enriched.csv", "all", True),
+])
+def test_manifest_parses_source_names(tmp_path, name, muni, enriched):
+    _write(tmp_path, name, POI + "\n")
+    [src] = source_manifest(str(tmp_path))
+    assert (src.municipality, src.enriched) == (muni, enriched)
+
+
+@pytest.mark.parametrize("name", [
+    "pois.csv", "poi_vic_30.csv.bak", "poi_vic_30.txt", "poi_.csv",
+    "place_meta.csv", CACHE_FILE, "poi_vic_30_enriched_old.csv",
+])
+def test_manifest_skips_other_files(tmp_path, name):
+    _write(tmp_path, name, POI + "\n")
+    assert source_manifest(str(tmp_path)) == []
+
+
+def test_most_enriched_row_wins(tmp_path):
+    _write(tmp_path, "poi_vic_30.csv", POI + "\n"
+           "A,Museum,41.9,2.2,.1,.1\n"
+           "B,Park,41.8,2.3,.2,.2\n"
+           "C,Bar,41.7,2.4,.3,.3\n")
+    _write(tmp_path, "poi_vic_30_enriched.csv", POI + Z + "\n"
+           "A,Museum,41.9,2.2,.1,.1,.1,.2,.3,.4,.5,.6\n"
+           "B,Park,41.8,2.3,.2,.2,,,,,,\n")
+    _write(tmp_path, "poi_all_enriched.csv", POI + Z + ",municipality\n"
+           "B,Park,41.8,2.3,.2,.2,.9,,,,,,vic\n"
+           "C,Bar,41.7,2.4,.3,.3,,,,,,,\n"
+           "A,Museum,40.0,3.0,.1,.1,.1,.2,.3,.4,.5,.6,olot\n")
+    df = readTourismData(str(tmp_path), cache=False, place_meta=False)
+    got = df.set_index(["municipality", "name"])
+    assert len(df) == 5 and not got.index.duplicated().any()
+    assert got.loc[("vic", "A"), "z6"] == pytest.approx(.6)  # enriched twin
+    assert got.loc[("vic", "B"), "z1"] == pytest.approx(.9)  # most z filled
+    assert np.isnan(got.loc[("vic", "C"), "z1"])              # first seen
+    assert got.loc[("all", "C"), "popularity"] == pytest.approx(.3)
+    assert got.loc[("olot", "A"), "lat"] == 40.0     # keeps its own town
+    assert df["category"].dtype == "category"
+    assert df["z1"].dtype == np.float32 and df["lat"].dtype == np.float64
+
+
+def test_npz_cache_is_reused_until_a_source_changes(tmp_path, monkeypatch):
+    _write(tmp_path, "poi_vic_30.csv", POI + ",note\n"
+           "A,Museum,41.9,2.2,.1,.1,\n"
+           "B,Park,41.8,2.3,.2,.2,quiet\n")
+    first = readTourismData(str(tmp_path), place_meta=False)
+    assert (tmp_path / CACHE_FILE).exists()
+
+    reads = []
+    real = dataloader._read_source
+    monkeypatch.setattr(dataloader, "_read_source",
+                        lambda *a: reads.append(a) or real(*a))
+    cached = readTourismData(str(tmp_path), place_meta=False)
+    assert not reads
+    pd.testing.assert_frame_equal(cached, first)     # dtypes, NaN strings too
+
+    _write(tmp_path, "poi_vic_30.csv", POI + "\nA,Museum,41.9,2.2,.7,.1\n")
+    assert readTourismData(str(tmp_path), place_meta=False)[
+        "sustainability"].tolist() == [pytest.approx(.7)]
+    _write(tmp_path, "poi_olot_30.csv", POI + "\nZ,Park,42.1,2.5,.1,.1\n")
+    assert len(readTourismData(str(tmp_path), place_meta=False)) == 2
+    assert len(reads) == 3
+
+
+def test_stale_or_foreign_cache_is_ignored(tmp_path):
+    _write(tmp_path, "poi_vic_30.csv", POI + "\nA,Museum,41.9,2.2,.1,.1\n")
+    (tmp_path / CACHE_FILE).write_bytes(b"not an npz")
+    assert len(readTourismData(str(tmp_path), place_meta=False)) == 1
+    with np.load(tmp_path / CACHE_FILE) as z:        # rewritten
+        assert "__signature" in z
+
+    readTourismData(str(tmp_path), cache=False, place_meta=False)
+    os.remove(tmp_path / CACHE_FILE)
+    readTourismData(str(tmp_path), cache=False, place_meta=False)
+    assert not (tmp_path / CACHE_FILE).exists()
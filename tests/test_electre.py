@@ -0,0 +1,54 @@
+import re
+import numpy as np
+import pytest
+
+pytest.importorskip("pyDecision")
+from pyDecision.algorithm import electre_iii
+
+import ranking_recommender as rr
+from electre import electre_iii_ranks
+
+CFG = rr.DEFAULT_CONFIG
+
+
+def _matrix(kind: str, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(3, 30))
+    M = rng.random((n, 7))
+    if kind == "rounded":                   # many ties on every criterion
+        M = M.round(1)
+    elif kind == "duplicates":              # identical alternatives
+        M[n // 2:] = M[:n - n // 2]
+    return M
+
+
+def _parse(blocks, n: int) -> np.ndarray:
+    """pyDecision's ['a2; a6', 'a5', …] → 1-based class per row."""
+    ranks = np.zeros(n, dtype=int)
+    for pos, block in enumerate(blocks, 1):
+        for tok in block.split(";"):
+            ranks[int(re.search(r"\d+", tok).group()) - 1] = pos
+    return ranks
+
+
+CASES = [(kind, seed) for kind in ("random", "rounded", "duplicates")
+         for seed in range(10)]
+
+
+@pytest.mark.parametrize("kind,seed", CASES)
+def test_numpy_backend_matches_pydecision(kind, seed):
+    M = _matrix(kind, seed)
+    np.testing.assert_array_equal(rr._electre_ranks(M, "numpy", CFG),
+                                  rr._electre_ranks(M, "pydecision", CFG))
+
+
+@pytest.mark.parametrize("kind,seed", CASES)
+def test_both_distillations_match_pydecision(kind, seed):
+    M = _matrix(kind, seed)
+    W = np.random.default_rng(seed + 100).random(7)
+    *_, rank_D, rank_A, _, _ = electre_iii(M, P=CFG.P, Q=CFG.Q, V=CFG.V, W=W,
+                                           graph=False)
+    for descending, blocks in ((True, rank_D), (False, rank_A)):
+        ours = electre_iii_ranks(M, P=CFG.P, Q=CFG.Q, V=CFG.V, W=W,
+                                 descending=descending)
+        np.testing.assert_array_equal(ours, _parse(blocks, len(M)))
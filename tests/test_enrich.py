@@ -0,0 +1,151 @@
+import glob, json, os, re, shutil, threading, time
+from types import SimpleNamespace
+import pandas as pd
+import pytest
+
+pytest.importorskip("openai")
+import enrich
+from enrich import TokenBucket, answer_key, enrich_dataset, enrich_rows
+from enrich_store import ResponseStore
+
+Z = {f"z{i}": i / 10 for i in range(1, 7)}
+
+
+class FakeClient:
+    """`chat.completions.create` stand-in: the first `fail_first` calls per
+    POI raise `error`, the next `bad_first` answer `bad`, every call holds
+    a slot for `delay` seconds."""
+
+    def __init__(self, fail_first: int = 0, error=TimeoutError, delay=.02,
+                 bad_first: int = 0, bad: str = '{"z1": 0.3}'):
+        self.fail_first, self.error, self.delay = fail_first, error, delay
+        self.bad_first, self.bad = bad_first, bad
+        self.calls, self.started = {}, []
+        self.inflight = self.max_inflight = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, **kw):
+        name = re.search(r"Name: (.*)", messages[-1]["content"]).group(1)
+        with self._lock:
+            self.calls[name] = n = self.calls.get(name, 0) + 1
+            self.started.append(time.monotonic())
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+        try:
+            time.sleep(self.delay)
+            if n <= self.fail_first:
+                raise self.error("transient")
+            content = (self.bad if n <= self.fail_first + self.bad_first
+                       else json.dumps(Z))
+            return SimpleNamespace(
+                usage=None,
+                choices=[SimpleNamespace(message=SimpleNamespace(
+                    content=content))])
+        finally:
+            with self._lock:
+                self.inflight -= 1
+
+
+def _rows(n: int) -> pd.DataFrame:
+    return pd.DataFrame({"name": [f"poi{i}" for i in range(n)],
+                         "category": "museum", "lat": 40.6, "lon": 22.9,
+                         "sustainability": .5, "popularity": .5})
+
+
+def _run(rows, client, **kw):
+    kw = dict(dict(concurrency=3, rate_per_s=1000, burst=1000, backoff=.001),
+              **kw)
+    return {idx: z for idx, z, _ in enrich_rows(rows, client, **kw)}
+
+
+def test_transient_errors_are_retried():
+    client = FakeClient(fail_first=2)
+    out = _run(_rows(8), client)
+    assert out == {i: Z for i in range(8)}
+    assert all(n == 3 for n in client.calls.values())
+
+
+def test_retries_give_up_and_other_errors_are_not_retried():
+    out = _run(_rows(2), FakeClient(fail_first=9), retries=2)
+    assert all(isinstance(e, TimeoutError) for e in out.values())
+
+    client = FakeClient(fail_first=1, error=ValueError)
+    out = _run(_rows(2), client)
+    assert all(isinstance(e, ValueError) for e in out.values())
+    assert all(n == 1 for n in client.calls.values())
+
+
+@pytest.mark.parametrize("bad", ['{"z1": 0.3}', "not json", "[1, 2]",
+                                 json.dumps(dict(Z, z4=1.5)),
+                                 json.dumps(dict(Z, z2="high"))])
+def test_invalid_single_answers_are_retried_not_stored(bad):
+    client = FakeClient(bad_first=1, bad=bad)
+    assert _run(_rows(3), client) == {i: Z for i in range(3)}
+    assert all(n == 2 for n in client.calls.values())
+
+    out = _run(_rows(2), FakeClient(bad_first=9, bad=bad), retries=1)
+    assert all(isinstance(e, enrich.InvalidAnswer) for e in out.values())
+
+
+def test_in_flight_requests_stay_within_concurrency():
+    client = FakeClient(fail_first=1, delay=.03)
+    _run(_rows(20), client, concurrency=4)
+    assert client.max_inflight == 4
+
+
+def test_bucket_throttles_request_rate():
+    client = FakeClient(delay=0)
+    _run(_rows(8), client, concurrency=8, rate_per_s=20, burst=2)
+    # 2 requests from the burst, the other 6 at 20/s
+    assert client.started[-1] - client.started[0] >= 6 / 20 * .9
+
+
+def test_token_bucket_burst_then_rate():
+    bucket = TokenBucket(rate=50, burst=3)
+    t0 = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - t0 < .05
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - t0 >= 5 / 50 * .9
+
+
+def test_batch_misses_fall_back_to_single_calls(monkeypatch):
+    rows = _rows(4)
+
+    def batch(chunk, client, stats):                # answers only the first
+        return {chunk.index[0]: Z}
+    monkeypatch.setattr(enrich, "_gpt_enrich_batch", batch)
+    client = FakeClient()
+    out = _run(rows, client, batch_size=4)
+    assert out == {i: Z for i in range(4)}
+    assert set(client.calls) == {"poi1", "poi2", "poi3"}
+
+
+def test_answers_are_stored_under_the_prompt_that_produced_them(
+        tmp_path, monkeypatch):
+    data = os.path.join(os.path.dirname(__file__), os.pardir, "data")
+    shutil.copy(os.path.join(data, "poi_vic_30.csv"), tmp_path)
+    store_path = str(tmp_path / "store.sqlite")
+
+    def batch(chunk, client, stats):                # answers all but the first
+        return {idx: Z for idx in chunk.index[1:]}
+    monkeypatch.setattr(enrich, "_gpt_enrich_batch", batch)
+    client = FakeClient(delay=0)
+    df = enrich_dataset(str(tmp_path), client=client, store_path=store_path,
+                        batch_size=10, concurrency=3, rate_per_s=1000)
+    assert len(client.calls) == 3
+
+    with ResponseStore(store_path) as store:
+        kinds = {kind: set(store.get_many(answer_key(kind, r)
+                                          for _, r in df.iterrows()))
+                 for kind in ("single", "batch")}
+    assert (len(kinds["single"]), len(kinds["batch"])) == (3, 27)
+
+    for f in glob.glob(str(tmp_path / "*_enriched.csv")):
+        os.remove(f)
+    client = FakeClient(delay=0)
+    again = enrich_dataset(str(tmp_path), client=client, store_path=store_path)
+    assert not client.calls and again[list(Z)].notna().all().all()
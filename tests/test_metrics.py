@@ -0,0 +1,79 @@
+import threading
+import pytest
+
+import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    was, sinks = metrics.enabled(), metrics.sinks()
+    metrics.disable()
+    metrics._sinks.clear()
+    metrics.registry.clear()
+    yield
+    metrics._sinks[:] = sinks
+    if was:
+        metrics.enable()
+
+
+@metrics.timed("work")
+def work():
+    with metrics.timer("inner"):
+        pass
+
+
+def test_disabled_records_nothing():
+    with metrics.trace("results") as t:
+        work()
+    assert t is None
+    assert metrics.registry.snapshot() == {"counters": [], "timers": []}
+
+
+def test_sink_trace_is_private_while_disabled():
+    mine, other = metrics.MemorySink(), metrics.MemorySink()
+    seen = []
+
+    def session(sink):
+        with metrics.trace("results", sink=sink):
+            work()
+        seen.append(metrics.timer("outside") is metrics._NO_TIMER)
+
+    th = threading.Thread(target=session, args=(other,))
+    th.start()
+    th.join()
+    with metrics.trace("results", sink=mine):
+        work()
+
+    assert [s["name"] for s in mine.traces[-1]["spans"]] == ["inner", "work"]
+    assert len(mine.traces) == len(other.traces) == 1
+    assert mine.traces[-1]["id"] != other.traces[-1]["id"]
+    assert seen == [True]                        # off again after the trace
+    assert not metrics.enabled()
+    assert metrics.registry.snapshot() == {"counters": [], "timers": []}
+
+
+def test_enabled_process_sinks_also_get_session_traces():
+    process, mine = metrics.MemorySink(), metrics.MemorySink()
+    metrics.enable(process)
+    with metrics.trace("results", sink=mine):
+        work()
+    assert len(process.traces) == len(mine.traces) == 1
+    names = {t["name"] for t in metrics.registry.snapshot()["timers"]}
+    assert names == {"inner", "work", "trace.results"}
+
+
+def test_drained_worker_deltas_merge_into_the_parent():
+    metrics.enable()
+    worker = metrics.Registry()
+    metrics.count("hits", 2, result="hit")
+    with metrics.timer("electre"):
+        pass
+    worker.merge(metrics.registry.drain())
+    assert metrics.registry.snapshot() == {"counters": [], "timers": []}
+    metrics.count("hits", result="hit")
+    worker.merge(metrics.registry.drain())
+
+    snap = worker.snapshot()
+    assert snap["counters"] == [{"name": "hits", "labels": {"result": "hit"},
+                                 "value": 3}]
+    assert [(t["name"], t["count"]) for t in snap["timers"]] == [("electre", 1)]
@@ -0,0 +1,64 @@
+import os, shutil
+import pandas as pd
+
+from dataloader import readTourismData
+from place_meta import (MISSING_RETRY_DAYS, PLACE_META_FILE, REFRESH_DAYS,
+                        build_place_meta, due)
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, "data")
+DAY = 24 * 3600
+NOW = 1_000 * DAY
+
+
+def _side(*rows):
+    return pd.DataFrame(rows, columns=["municipality", "name", "place_id",
+                                       "place_fetched"])
+
+
+def test_due_picks_new_stale_and_retryable_pois():
+    pois = pd.DataFrame({"municipality": "vic",
+                         "name": list("ABCDEFG")})
+    side = _side(
+        ("vic", "B", "p1", NOW - (REFRESH_DAYS - 1) * DAY),        # fresh
+        ("vic", "C", "p2", NOW - (REFRESH_DAYS + 1) * DAY),        # stale
+        ("vic", "D", None, NOW - (MISSING_RETRY_DAYS - 1) * DAY),  # miss, recent
+        ("vic", "E", None, NOW - (MISSING_RETRY_DAYS + 1) * DAY),  # miss, old
+        ("vic", "F", "p3", None),                                  # never fetched
+        ("vic", "G", "p4", NOW - (REFRESH_DAYS + 1) * DAY),
+        ("vic", "G", "p4", NOW),                                   # last wins
+        ("olot", "A", "p5", NOW))                                  # other town
+    got = due(pois, side, NOW)
+    assert list(got["name"]) == ["A", "C", "E", "F"]
+    assert list(got.index) == [0, 2, 4, 5]
+
+    assert list(due(pois, side, NOW, refresh_days=1e9,
+                    missing_retry_days=1e9)["name"]) == ["A", "F"]
+    assert due(pois, _side(), NOW).equals(pois)
+
+
+def test_build_refreshes_only_due_pois_and_keeps_failures(tmp_path):
+    shutil.copy(os.path.join(DATA, "poi_vic_30.csv"), tmp_path)
+    names = list(readTourismData(str(tmp_path), place_meta=False)["name"])
+    calls = []
+
+    def fetch(name, town):
+        calls.append(name)
+        if name == names[1]:
+            raise TimeoutError("flaky")
+        return None if name == names[2] else {"id": f"id-{name}",
+                                              "rating": 4.5}
+
+    side = build_place_meta(str(tmp_path), fetch=fetch, concurrency=2)
+    assert sorted(calls) == sorted(names) and len(side) == len(names) - 1
+    assert (tmp_path / PLACE_META_FILE).exists()
+
+    calls.clear()
+    build_place_meta(str(tmp_path), fetch=fetch)
+    assert calls == [names[1]]                       # only the failed one
+    df = readTourismData(str(tmp_path))
+    assert df.loc[df["name"] == names[0], "place_id"].item() == f"id-{names[0]}"
+    assert df.loc[df["name"] == names[2], "place_id"].isna().all()
+
+    calls.clear()
+    build_place_meta(str(tmp_path), fetch=fetch, force=True)
+    assert sorted(calls) == sorted(names)
@@ -0,0 +1,88 @@
+import json, os
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch
+import ranking_recommender as rr
+from bench import synth_catalogue, synth_group
+from catalogue import Catalogue
+from filter_index import PrefilterIndex
+from poistore import PoiStore, build_store
+from userprof import Profile
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, "data")
+
+
+@pytest.fixture(scope="module")
+def catalogue():
+    return Catalogue.load(DATA)
+
+
+@pytest.fixture(scope="module")
+def store_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("store"))
+    build_store(DATA, path)
+    return path
+
+
+GROUPS = [
+    {1: Profile()},
+    {1: Profile(location=(41.39, 2.17), max_disp=80)},
+    {1: Profile(location=(41.98, 2.82), max_disp=150, avoid=["Museum"]),
+     2: Profile(location=(41.39, 2.17), max_disp=200, mobility_constr=True,
+                culture=.9)},
+]
+
+
+def _same_kernel(a: pd.DataFrame, b: pd.DataFrame):
+    assert list(a["name"]) == list(b["name"])
+    for c in ["electre_rank", "U_LSP", "z7", "distance_km"]:
+        if c in a:
+            np.testing.assert_array_equal(a[c].to_numpy(float),
+                                          b[c].to_numpy(float))
+
+
+@pytest.mark.parametrize("group", GROUPS)
+@pytest.mark.parametrize("mode", ["intersection", "union"])
+def test_rank_store_matches_run_recommender(catalogue, store_path, group,
+                                            mode):
+    store = PoiStore.open(store_path)
+    assert len(store) == len(catalogue)
+    want = rr.runRecommender(catalogue.data, group, catalogue.filter_index,
+                             mode)["Group"]
+    got = rr.rank_store(store, group, PrefilterIndex.from_store(store),
+                        mode)["Group"]
+    assert list(got.index) == list(catalogue.data.index.get_indexer(want.index))
+    _same_kernel(want, got)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_rank_store_matches_on_synthetic_catalogues(tmp_path, seed):
+    df = synth_catalogue(1500, seed, DATA)
+    df["z3"] = df["z3"].where(np.random.default_rng(seed).random(len(df)) > .05)
+    PoiStore.from_frame(df).save(str(tmp_path))
+    store = PoiStore.open(str(tmp_path))
+    cats = [str(c) for c in df["category"].unique()]
+    for size in (1, 5):
+        group = synth_group(size, cats, seed)
+        _same_kernel(rr.runRecommender(df, group)["Group"],
+                     rr.rank_store(store, group)["Group"])
+
+
+def test_batch_store_gives_the_same_results(tmp_path, store_path):
+    groups = tmp_path / "groups.jsonl"
+    groups.write_text("\n".join(json.dumps({"id": str(i), "profiles": [
+        {"location": [41.39, 2.17], "max_disp": 60 + 40 * i, "culture": .2 * i}]})
+        for i in range(4)) + "\n")
+    out = {}
+    for name, store in (("frame", None), ("store", store_path)):
+        batch.run(str(groups), str(tmp_path / f"{name}.jsonl"), DATA,
+                  workers=2, store=store)
+        with open(tmp_path / f"{name}.jsonl") as fh:
+            out[name] = sorted((json.loads(l) for l in fh),
+                               key=lambda r: r["id"])
+    for a, b in zip(out["frame"], out["store"]):
+        assert a["status"] == b["status"] == "ok"
+        assert [r["name"] for r in a["results"]] == \
+            [r["name"] for r in b["results"]]
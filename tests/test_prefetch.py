@@ -0,0 +1,108 @@
+import json, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+import pytest
+
+import placecache
+import ranking_recommender as rr
+
+
+class Places(BaseHTTPRequestHandler):
+    """Text-search stub: "slow…" queries take `slow_s`, "down…" ones fail."""
+    protocol_version = "HTTP/1.1"
+    hits, slow_s = [], 4.0
+
+    def do_POST(self):
+        q = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        q = q["textQuery"]
+        type(self).hits.append(q)
+        time.sleep(self.slow_s if q.startswith("slow") else .05)
+        status, body = (500, b"{}") if q.startswith("down") else (200, json.dumps(
+            {"places": [{"id": q, "rating": 4.5, "userRatingCount": 7,
+                         "photos": [{"name": f"places/{q}/photos/1"}]}]}
+        ).encode())
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *a):
+        pass
+
+
+@pytest.fixture
+def places(tmp_path, monkeypatch):
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Places)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    Places.hits = []
+    monkeypatch.setattr(rr, "TXT_ENDPOINT",
+                        f"http://127.0.0.1:{srv.server_port}/search")
+    monkeypatch.setattr(rr, "GOOGLE_KEY", "test-key")
+    monkeypatch.setattr(placecache, "_shared",
+                        placecache.PlaceCache(str(tmp_path / "places.sqlite")))
+    rr._inflight.clear()
+    yield Places
+    srv.shutdown()
+
+
+def test_prefetch_fills_the_cache(places):
+    pois = [(f"poi{i}", "vic") for i in range(6)]
+    meta = rr.prefetch_place_meta(pois + pois[:2])      # duplicates once
+    assert len(places.hits) == 6
+    assert meta[("poi3", "vic")]["rating"] == 4.5
+    assert meta[("poi3", "vic")]["photo"].startswith(rr.PHOTO_V1)
+
+    rr.prefetch_place_meta(pois)
+    assert len(places.hits) == 6                        # served from cache
+
+
+def test_deadline_gives_placeholder_and_dedups_in_flight(places):
+    pois = [("poi", "vic"), ("slow one", "vic")]
+    t0 = time.monotonic()
+    meta = rr.prefetch_place_meta(pois)
+    took = time.monotonic() - t0
+    assert rr.PREFETCH_DEADLINE_S <= took < rr.PREFETCH_DEADLINE_S + .5
+    assert meta[("poi", "vic")]["rating"] == 4.5
+    assert meta[("slow one", "vic")] == rr._NO_META
+
+    # the slow lookup is still running: a rerun waits on it, no new request
+    rr.prefetch_place_meta([("slow one", "vic")], deadline_s=.1)
+    assert places.hits.count("slow one vic") == 1
+
+    time.sleep(places.slow_s - rr.PREFETCH_DEADLINE_S + .3)
+    meta = rr.prefetch_place_meta([("slow one", "vic")], deadline_s=.1)
+    assert meta[("slow one", "vic")]["rating"] == 4.5
+    assert places.hits.count("slow one vic") == 1
+    assert not rr._inflight
+
+
+def test_failed_lookup_gives_placeholder_and_is_not_kept(places):
+    cache = placecache.place_cache()
+    cache.error_ttl_s = .2
+    meta = rr.prefetch_place_meta([("down", "vic")], deadline_s=1)
+    assert meta[("down", "vic")] == rr._NO_META
+    assert cache.stats()["errors"] == 1
+
+    rr.prefetch_place_meta([("down", "vic")], deadline_s=1)
+    assert places.hits.count("down vic") == 1        # briefly remembered
+    time.sleep(.3)
+    rr.prefetch_place_meta([("down", "vic")], deadline_s=1)
+    assert places.hits.count("down vic") == 2        # …then asked again
+
+
+def test_offline_metadata_needs_no_request(monkeypatch):
+    monkeypatch.setattr(rr, "GOOGLE_KEY", "test-key")
+    poi = pd.Series({"name": "poi", "municipality": "vic",
+                     "place_fetched": 1.7e9, "place_id": "abc",
+                     "place_address": "Plaça Major", "place_rating": 4.2,
+                     "place_reviews": 10.0, "place_maps_uri": None,
+                     "place_photo": "places/abc/photos/1"})
+    meta = rr.local_place_meta(poi)
+    assert meta["address"] == "Plaça Major" and meta["reviews"] == 10
+    assert "places/abc/photos/1" in meta["photo"]
+
+    assert rr.local_place_meta(poi.drop("place_fetched")) is None
+    assert rr.local_place_meta(pd.concat(
+        [poi.drop("place_id"), pd.Series({"place_id": np.nan})])) == rr._NO_META
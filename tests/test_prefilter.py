@@ -0,0 +1,90 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from geopy.distance import geodesic
+
+import ranking_recommender as rr
+from bench import synth_catalogue, synth_group
+from catalogue import Catalogue
+from filter_index import PrefilterIndex
+from spatial import EXACT_BAND, haversine_km
+from userprof import Profile
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, "data")
+
+
+def _naive(df, profiles, mode, exact):
+    """Row-by-row prefilter of each member, then ∩ / ∪ and farthest distance."""
+    keeps, dists = [], []
+    for p in profiles:
+        keep = ~df["category"].astype(str).isin(p.avoid).to_numpy()
+        if p.location and p.max_disp:
+            if exact:
+                d = np.array([geodesic(p.location, xy).km if np.isfinite(xy).all()
+                              else np.nan for xy in df[["lat", "lon"]].to_numpy()])
+            else:
+                d = haversine_km(df["lat"].to_numpy(), df["lon"].to_numpy(),
+                                 *p.location)
+            near = d <= p.max_disp
+            keep &= near
+            dists.append(np.where(near, d, np.nan))
+        if p.mobility_constr:
+            keep &= (df["z6"] >= .5).to_numpy()
+        keeps.append(keep)
+    keep = (np.logical_and if mode == "intersection"
+            else np.logical_or).reduce(keeps)
+    far = np.fmax.reduce(dists) if dists else None
+    return keep, far
+
+
+def _check(df, profiles, mode, exact, index=None):
+    keep, far = _naive(df, profiles, mode, exact)
+    got = rr.group_prefilter(df, profiles, index, mode, exact)
+    assert list(got.index) == list(df.index[keep])
+    if far is None:
+        assert "distance_km" not in got
+    else:
+        # exact mode only re-measures rows near a radius (see spatial.py)
+        np.testing.assert_allclose(got["distance_km"].to_numpy(float),
+                                   far[keep], rtol=EXACT_BAND if exact else 0)
+
+
+@pytest.fixture(scope="module")
+def synthetic():
+    df = synth_catalogue(2000, 3, DATA)
+    df.loc[df.index[::11], "z6"] = np.nan                 # unknown access
+    return df, [str(c) for c in df["category"].unique()]
+
+
+@pytest.mark.parametrize("mode", ["intersection", "union"])
+@pytest.mark.parametrize("size", [1, 2, 5, 12])
+@pytest.mark.parametrize("seed", range(3))
+def test_group_prefilter_matches_naive_members(synthetic, mode, size, seed):
+    df, cats = synthetic
+    profiles = list(synth_group(size, cats, seed).values())
+    profiles[0] = Profile(avoid=cats[:2], mobility_constr=True)   # no radius
+    index = PrefilterIndex(df)
+    _check(df, profiles, mode, exact=False, index=index)
+
+    sub = df.iloc[::3]                         # row subset, same index
+    _check(sub, profiles, mode, exact=False, index=index)
+
+
+@pytest.mark.parametrize("mode", ["intersection", "union"])
+def test_exact_prefilter_on_shipped_data(mode):
+    cat = Catalogue.load(DATA)
+    df = cat.data
+    lat, lon = df[["lat", "lon"]].median()
+    profiles = [Profile(location=(lat, lon), max_disp=15,
+                        avoid=[cat.categories[0]]),
+                Profile(location=(lat + .1, lon - .1), max_disp=25,
+                        mobility_constr=True),
+                Profile(avoid=list(cat.categories[1:4]))]
+    _check(df, profiles, mode, exact=True, index=cat.filter_index)
+
+
+def test_without_members_constraints_nothing_is_dropped(synthetic):
+    df, _ = synthetic
+    got = rr.group_prefilter(df, [Profile(), Profile()], mode="union")
+    pd.testing.assert_index_equal(got.index, df.index)
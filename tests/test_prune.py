@@ -0,0 +1,45 @@
+import os
+import numpy as np
+import pytest
+
+import ranking_recommender as rr
+from bench import synth_catalogue, synth_group
+from catalogue import Catalogue
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, "data")
+
+
+def _kernel(ranked):
+    return list(rr._kernel_rows(ranked)["name"])
+
+
+def test_pareto_kernel_equals_full_kernel_on_shipped_data():
+    df = Catalogue.load(DATA).data.assign(z7=.5)
+    assert _kernel(rr.compute_ranking(df, "pareto")) == \
+        _kernel(rr.compute_ranking(df))
+    assert rr.prune_recall(df, "pareto") == 1.0
+
+
+def test_pareto_recall_on_synthetic_catalogues():
+    recall = []
+    for seed in range(6):
+        df = synth_catalogue(1500, seed, DATA)
+        cats = [str(c) for c in df["category"].unique()]
+        for size in (1, 5):
+            base = rr._candidates(df, synth_group(size, cats, seed), None,
+                                  "intersection")
+            recall.append(rr.prune_recall(base, "pareto"))
+    assert np.mean(recall) >= .95 and min(recall) >= .85
+
+
+def test_pruned_rows_are_a_superset_of_the_front():
+    X = np.random.default_rng(0).random((400, 7))
+    keep = rr._prune(X, "pareto", 2)
+    assert len(keep) >= 2 * rr.KERNEL_SZ
+    front = np.flatnonzero(rr._nondominated(rr._benefit(X)))
+    assert set(front) <= set(keep)
+
+
+def test_unknown_prune_mode_is_rejected():
+    with pytest.raises(ValueError):
+        rr._prune(np.random.default_rng(0).random((400, 7)), "lsp", 2)
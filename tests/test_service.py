@@ -0,0 +1,89 @@
+import asyncio, json, os
+import pytest
+
+import metrics
+from service import BadRequest, RecommenderService, parse_profile, parse_request
+
+
+def test_profile_defaults_and_conversion():
+    p = parse_profile({"name": "Ana", "location": [41.4, 2.2], "max_disp": 80,
+                       "culture": 1, "avoid": ["Museum"]})
+    assert p.location == (41.4, 2.2) and p.max_disp == 80.0
+    assert p.culture == 1.0 and p.nature == .5 and not p.mobility_constr
+    assert parse_profile({"name": None}).name is None
+
+
+@pytest.mark.parametrize("obj", [
+    [],
+    {"colour": "red"},
+    {"name": 3},
+    {"location": [41.4]},
+    {"location": [41.4, "east"]},
+    {"max_disp": 0},
+    {"max_disp": -5},
+    {"max_disp": float("inf")},
+    {"culture": 1.2},
+    {"co2": -0.1},
+    {"nature": True},
+    {"avoid": "Museum"},
+    {"mobility_constr": "no"},
+])
+def test_bad_profiles_are_rejected(obj):
+    with pytest.raises(BadRequest):
+        parse_profile(obj)
+
+
+def _req(**kw):
+    return json.dumps(dict({"profiles": [{}]}, **kw)).encode()
+
+
+def test_request_defaults():
+    profiles, weights, k, mode = parse_request(_req())
+    assert list(profiles) == [1] and weights is None
+    assert k == 9 and mode == "intersection"
+
+
+@pytest.mark.parametrize("body", [
+    b"not json", b"[]", _req(profiles=[]),
+    _req(weights=[1] * 6), _req(weights=[0] * 7), _req(weights=[-1] + [1] * 6),
+    _req(k=0), _req(k=51), _req(k=True), _req(mode="any"),
+])
+def test_bad_requests_are_rejected(body):
+    with pytest.raises(BadRequest):
+        parse_request(body)
+
+
+def test_metrics_include_the_ranking_workers():
+    async def call(app, method, path, body=b""):
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(msg):
+            sent.append(msg)
+        await app({"type": "http", "method": method, "path": path},
+                  receive, send)
+        return sent[0]["status"], sent[1]["body"].decode()
+
+    async def session():
+        app = RecommenderService(os.path.join(os.path.dirname(__file__),
+                                              os.pardir, "data"), workers=1)
+        await app.startup()
+        try:
+            status, _ = await call(app, "POST", "/recommend", _req())
+            assert status == 200
+            return await call(app, "GET", "/metrics")
+        finally:
+            await app.shutdown()
+
+    was = metrics.enabled()
+    metrics.enable()
+    try:
+        status, text = asyncio.run(session())
+    finally:
+        if not was:
+            metrics.disable()
+    assert status == 200
+    assert "greenexplorer_service_recommend_seconds_count" in text
+    assert "greenexplorer_electre_seconds_count" in text     # from the worker
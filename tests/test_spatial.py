@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from geopy.distance import geodesic
+
+from spatial import EXACT_BAND, PoiSpatialIndex, haversine_km
+
+
+def _points(n, seed):
+    rng = np.random.default_rng(seed)
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    lon = rng.uniform(-180, 180, n)
+    lat[::97] = np.nan                                   # unknown locations
+    return lat, lon
+
+
+CENTRES = [(41.93, 2.25), (0, 179.9), (-33.9, -179.5), (89.5, 40), (-89, 0)]
+
+
+@pytest.mark.parametrize("radius", [1, 50, 400, 3000])
+@pytest.mark.parametrize("lat0,lon0", CENTRES)
+def test_query_matches_brute_force_haversine(lat0, lon0, radius):
+    lat, lon = _points(4000, 0)
+    rng = np.random.default_rng(1)
+    near = rng.normal(0, radius / 111 / 2, (300, 2))     # dense around centre
+    lat = np.append(lat, np.clip(lat0 + near[:, 0], -90, 90))
+    lon = np.append(lon, (lon0 + near[:, 1] + 180) % 360 - 180)
+    labels = np.arange(len(lat)) * 3 + 7
+    index = PoiSpatialIndex(lat, lon, labels=labels)
+
+    d = haversine_km(lat, lon, lat0, lon0)
+    inside = d <= radius
+    got = index.query(lat0, lon0, radius)
+    assert list(got.index) == list(labels[inside])
+    np.testing.assert_array_equal(got.to_numpy(), d[inside])
+
+
+@pytest.mark.parametrize("radius", [2, 30, 250])
+def test_exact_query_matches_brute_force_geodesic(radius):
+    lat0, lon0 = 41.93, 2.25
+    bearings = np.linspace(0, 360, 90, endpoint=False)
+    # a ring straddling the radius, inside the haversine/geodesic band
+    dists = radius * np.array([.995, .998, .999, 1.001, 1.002, 1.005])
+    pts = [geodesic(kilometers=r).destination((lat0, lon0), b)
+           for b in bearings for r in dists]
+    lat = np.array([p.latitude for p in pts])
+    lon = np.array([p.longitude for p in pts])
+    index = PoiSpatialIndex(lat, lon)
+
+    exact = np.array([geodesic((lat0, lon0), p).km for p in zip(lat, lon)])
+    got = index.query(lat0, lon0, radius, exact=True)
+    assert list(got.index) == list(np.flatnonzero(exact <= radius))
+    # only the band is re-measured; the rest keep their haversine distance
+    np.testing.assert_allclose(got.to_numpy(), exact[exact <= radius],
+                               rtol=EXACT_BAND)
+
+    spherical = set(index.query(lat0, lon0, radius).index)
+    assert spherical != set(got.index)                   # the band matters
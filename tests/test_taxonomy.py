@@ -0,0 +1,51 @@
+import json, os, shutil
+import numpy as np
+import pytest
+
+import ranking_recommender as rr
+import taxonomy
+from catalogue import Catalogue
+from dataloader import readTourismData
+from poistore import PoiStore
+from userprof import Profile
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, "data")
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """A data dir whose overrides flip every category's classes, made
+    the default one."""
+    shutil.copy(os.path.join(DATA, "poi_vic_30.csv"), tmp_path)
+    cats = readTourismData(str(tmp_path), place_meta=False)["category"]
+    mapping = {str(c): (["nightlife"] if taxonomy.CategoryTaxonomy()
+                        .classes(c) != ("nightlife",) else ["nature"])
+               for c in cats.unique()}
+    (tmp_path / taxonomy.TAXONOMY_FILE).write_text(json.dumps(mapping))
+    monkeypatch.setattr(taxonomy, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(taxonomy, "_loaded", {})
+    return str(tmp_path)
+
+
+def test_overrides_are_read_from_the_data_dir(data_dir):
+    assert taxonomy.load_taxonomy(data_dir).mapping
+    assert taxonomy.load_taxonomy() is taxonomy.load_taxonomy(data_dir)
+    assert not taxonomy.load_taxonomy(os.path.join(data_dir, "none")).mapping
+
+
+def test_every_path_classifies_alike(data_dir):
+    annotated = Catalogue.load(data_dir).data
+    plain = readTourismData(data_dir, place_meta=False)
+    expect = rr.category_matrix(annotated)
+    assert not (expect == taxonomy.CategoryTaxonomy().table(
+        plain["category"])).all()                    # overrides do matter
+    np.testing.assert_array_equal(rr.category_matrix(plain), expect)
+
+    p = Profile(culture=.9, nature=.1, nlife=.7)
+    row_scores = [rr._pref_score(r, p) for _, r in plain.iterrows()]
+    np.testing.assert_allclose(rr.z7_batch(annotated, [p])[0], row_scores)
+
+    store = PoiStore.from_frame(plain)
+    np.testing.assert_array_equal(
+        rr.store_features(store, np.arange(len(store.Z))),
+        rr.pref_features(annotated))
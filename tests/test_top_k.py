@@ -0,0 +1,47 @@
+import os
+import numpy as np
+import pytest
+
+import ranking_recommender as rr
+from bench import synth_catalogue, synth_group
+from catalogue import Catalogue
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, "data")
+
+
+@pytest.fixture(scope="module")
+def synthetic():
+    df = synth_catalogue(1200, 7, DATA)
+    return df, [str(c) for c in df["category"].unique()]
+
+
+def _same(full, top):
+    assert len(full)
+    assert list(top.index) == list(full.index)
+    for c in ["electre_rank", "U_LSP", "z7"]:
+        np.testing.assert_array_equal(top[c].to_numpy(float),
+                                      full[c].to_numpy(float))
+
+
+@pytest.mark.parametrize("mode", ["intersection", "union"])
+@pytest.mark.parametrize("size", [1, 2, 5, 20])
+@pytest.mark.parametrize("seed", range(2))
+def test_top_k_matches_run_recommender(synthetic, mode, size, seed):
+    df, cats = synthetic
+    group = synth_group(size, cats, seed)
+    _same(rr.runRecommender(df, group, mode=mode)["Group"],
+          rr.rank_top_k(df, group, mode=mode)["Group"])
+
+
+@pytest.mark.parametrize("mode", ["intersection", "union"])
+def test_top_k_matches_on_shipped_data(mode):
+    cat = Catalogue.load(DATA)
+    cats = list(cat.categories)
+    for size in (1, 3):
+        group = synth_group(size, cats, size)
+        for p in group.values():                 # around Barcelona
+            p.location, p.max_disp = (41.39, 2.17), 150.0
+        _same(rr.runRecommender(cat.data, group, cat.filter_index,
+                                mode)["Group"],
+              rr.rank_top_k(cat.data, group, index=cat.filter_index,
+                            mode=mode)["Group"])
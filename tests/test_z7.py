@@ -0,0 +1,49 @@
+import os
+import numpy as np
+import pytest
+
+import ranking_recommender as rr
+from bench import synth_catalogue
+from catalogue import Catalogue
+from userprof import Profile
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, "data")
+
+
+def _profiles(seed):
+    rng = np.random.default_rng(seed)
+    ps = [Profile(**dict(zip(["culture", "nature", "nlife", "local_imp", "co2"],
+                             rng.choice([0, .25, .5, .8, 1], 5))))
+          for _ in range(6)]
+    return ps + [Profile(culture=0, nature=0, nlife=0, local_imp=0, co2=0)]
+
+
+def _per_row(df, profiles):
+    return np.array([[rr._pref_score(row, p) for _, row in df.iterrows()]
+                     for p in profiles])
+
+
+@pytest.mark.parametrize("annotated", [True, False])
+def test_z7_batch_matches_pref_score_on_shipped_data(annotated):
+    cat = Catalogue.load(DATA)
+    df = cat.data if annotated else cat.data.drop(columns=rr.FLAGS_COL)
+    profiles = _profiles(0)
+    np.testing.assert_array_equal(rr.z7_batch(df, profiles),
+                                  _per_row(df, profiles))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_z7_batch_matches_pref_score_on_synthetic_data(seed):
+    df = synth_catalogue(300, seed, DATA)
+    df.loc[df.index[::7], ["z1", "z4", "z5"]] = np.nan       # unknown z
+    profiles = _profiles(seed)
+    feats = rr.pref_features(df)
+    np.testing.assert_array_equal(rr.z7_batch(df, profiles, feats),
+                                  _per_row(df, profiles))
+
+
+def test_missing_z_columns_count_as_neutral():
+    df = synth_catalogue(50, 0, DATA).drop(columns=["z1", "z4", "z5"])
+    p = Profile()
+    np.testing.assert_array_equal(rr.z7_individual(df, p).to_numpy(),
+                                  _per_row(df, [p])[0])